@@ -39,6 +39,21 @@ class IMemoryStorage(ABC):
         """
         pass
 
+    def retrieve_many(self, memory_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieves several memories by ID.
+
+        Default implementation calls retrieve() per ID; adapters that can
+        batch lookups should override it.
+
+        Args:
+            memory_ids: Memory identifiers
+
+        Returns:
+            Memory data (or None) per ID, in the same order as memory_ids
+        """
+        return [self.retrieve(m_id) for m_id in memory_ids]
+
     @abstractmethod
     def query(
         self,
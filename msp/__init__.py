@@ -19,8 +19,33 @@ Version History:
 - 0.3.0: ChromaDB integration for semantic search (P1-006)
 - 0.4.0: MSPEngine Integration - Phase 1.1 Complete (P1-007)
 - 0.4.1: Crosslink Manager - Automated bidirectional linking (P1-008)
+- 0.4.2: FileMemoryStore ID -> path index (O(1) retrieve/delete)
+- 0.4.3: Batch hydration via retrieve_many
+- 0.5.0: SegmentLogStore append-only backend (ADR-008)
+- 0.5.1: Write-behind queue with group commit
+- 0.5.2: Batched Chroma ingestion (store_many) and bulk reindex
+- 0.5.3: Resumable parallel vector index rebuild
+- 0.5.4: Parallel collection fan-out in semantic_search
+- 0.5.5: Query-embedding LRU/TTL cache
+- 0.5.6: Metadata secondary indexes for FileMemoryStore.query
+- 0.5.7: Time-range episode scan over the year/month layout
+- 0.5.8: Pluggable record codecs (compact JSON, msgpack, CBOR, zstd)
+- 0.5.9: Incremental, batched CrosslinkManager back-links
+- 0.6.0: Persistent bidirectional link index with multi-hop expansion
+- 0.6.1: Content-addressed semantic fact upsert
+- 0.6.2: Ledger-based exactly-once distillation on a background worker
+- 0.6.3: Streaming session distillation with pluggable summarizers
+- 0.6.4: Background DistillScheduler with concurrency limits, metrics and backfill
+- 0.6.5: Tiered retention for distilled sessions (bundle/compress/delete)
+- 0.6.6: Memory access instrumentation (latency histograms, bytes, files)
+- 0.6.7: MSP benchmark suite with synthetic corpora and HashEmbeddingFunction
+- 0.6.8: NumPy vector backend (memory-mapped matrices, exact/IVF top-k)
+- 0.6.9: BM25 lexical index with reciprocal-rank fusion in semantic_search
+- 0.7.0: Recency/salience/E9-resonance re-ranking (recall)
+- 0.7.1: Per-tenant sharding (shard_by) with an LRU of shard handles
+- 0.7.2: Write-through LRU record cache in MSPEngine
 """
 
-__version__ = "0.4.1"
+__version__ = "0.7.2"
 __schema_version__ = "episodic_v3"  # Sensory is SMEM_v1
 
@@ -0,0 +1 @@
+"""MSP benchmarks (run as modules, e.g. python -m msp.benchmarks.bench_codecs)."""
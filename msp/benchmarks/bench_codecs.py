@@ -0,0 +1,117 @@
+"""
+Codec Benchmark - bytes/record and encode/decode throughput per record codec.
+
+Usage:
+    python -m msp.benchmarks.bench_codecs [--records 2000] [--json out.json]
+
+Codecs whose optional dependency (msgpack, cbor2, zstandard) is missing are
+reported as skipped.
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Any
+
+from msp.schema.episodic import EpisodicMemory, SituationContext, StructuredSummary
+from msp.schema.turn import TurnUser, TurnLLM
+from msp.schema.semantic import SemanticMemory
+from msp.storage.codecs import CODECS, RecordCodec, decode_record
+
+
+def sample_records(n: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Deterministic synthetic episodic, turn and semantic records."""
+    episodes, turns, facts = [], [], []
+    for i in range(n):
+        ep_id = f"EP_BENCH_{i:06d}"
+        turns.append(TurnUser(
+            turn_id=f"TU_BENCH_{i:06d}", episode_id=ep_id,
+            text_excerpt=f"Message {i}: how should I structure the project for milestone {i % 17}?",
+            emotion_signal="curious"
+        ).to_dict())
+        turns.append(TurnLLM(
+            turn_id=f"TL_BENCH_{i:06d}", episode_id=ep_id,
+            text_excerpt=f"Reply {i}: split the work into smaller modules and review them one by one.",
+            epistemic_mode="reflect"
+        ).to_dict())
+        episodes.append(EpisodicMemory(
+            episode_id=ep_id,
+            turn_refs=[f"TU_BENCH_{i:06d}", f"TL_BENCH_{i:06d}"],
+            situation_context=SituationContext(
+                context_id=f"ctx_{i}", interaction_mode="deep_discussion",
+                stakes_level="medium", time_pressure="low", domain_area="coding"
+            ),
+            summary=StructuredSummary(
+                content=f"Discussed project structure for milestone {i % 17}.",
+                action_taken="Proposed a modular layout."
+            )
+        ).to_dict())
+        facts.append(SemanticMemory(
+            id=f"SEM_BENCH_{i:06d}", subject="User",
+            predicate="works_on", object=f"project_{i % 53}"
+        ).to_dict())
+    return {"episodic": episodes, "turn": turns, "semantic": facts}
+
+
+def available_codecs():
+    """Returns (codecs that can be built here, labels skipped for missing deps)."""
+    codecs, skipped = [], []
+    for name in CODECS:
+        for compression in (None, "zstd"):
+            try:
+                codecs.append(RecordCodec(name, compression=compression))
+            except ImportError:
+                skipped.append(f"{name}+{compression}" if compression else name)
+    return codecs, skipped
+
+
+def bench_codec(codec: RecordCodec, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    blobs = [codec.encode(r) for r in records]
+    encode_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for blob in blobs:
+        decode_record(blob)
+    decode_s = time.perf_counter() - started
+
+    total = sum(len(b) for b in blobs)
+    return {
+        "bytes_per_record": round(total / len(records), 1),
+        "encode_per_s": round(len(records) / encode_s, 1) if encode_s > 0 else None,
+        "decode_per_s": round(len(records) / decode_s, 1) if decode_s > 0 else None,
+    }
+
+
+def run(n: int = 2000) -> Dict[str, Any]:
+    """Benchmarks every available codec on every record kind."""
+    corpora = sample_records(n)
+    codecs, skipped = available_codecs()
+    results: Dict[str, Any] = {"records_per_kind": n, "skipped": skipped, "results": {}}
+    for codec in codecs:
+        results["results"][codec.label] = {
+            kind: bench_codec(codec, records) for kind, records in corpora.items()
+        }
+    return results
+
+
+def _print_table(report: Dict[str, Any]):
+    print(f"{'codec':<18}{'kind':<10}{'bytes/rec':>12}{'enc/s':>12}{'dec/s':>12}")
+    for label, kinds in report["results"].items():
+        for kind, r in kinds.items():
+            print(f"{label:<18}{kind:<10}{r['bytes_per_record']:>12}{r['encode_per_s']:>12}{r['decode_per_s']:>12}")
+    if report["skipped"]:
+        print(f"\nSkipped (missing optional dependency): {', '.join(report['skipped'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MSP record codecs.")
+    parser.add_argument("--records", type=int, default=2000, help="Records per kind")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.records)
+    _print_table(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
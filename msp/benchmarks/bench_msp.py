@@ -0,0 +1,353 @@
+"""
+MSP Benchmark - end-to-end memory subsystem benchmark on synthetic corpora.
+
+Usage:
+    python -m msp.benchmarks.bench_msp [--scale 1k|100k|1m] [--records N]
+                                       [--storage-backend file|segment]
+                                       [--vector-backend chroma|numpy]
+                                       [--json out.json]
+
+Generates deterministic episodic, turn, sensory and semantic records with
+the MSP schemas, stores them through MSPEngine and measures:
+
+    store            records/s (batched store_many)
+    retrieve         retrieve-by-id latency (record cache off: store reads)
+    retrieve_cached  the same lookups through a warm CachedRecordStore
+    query            filtered query latency (indexed filters)
+    semantic_search  latency with HashEmbeddingFunction (no model download)
+    distillation     8-8-8 session -> core throughput
+
+Latencies are reported as p50/p90/p99/mean/max in milliseconds. The JSON
+report is meant to be committed or diffed between runs for regression
+tracking; the same --seed always yields the same corpus and queries.
+The engine runs with record_cache_bytes=0 so that retrieve and search
+hydration keep measuring the record store, comparable with earlier runs.
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Any
+
+import msp
+from msp.msp_engine import MSPEngine
+from msp.schema.episodic import EpisodicMemory, SituationContext, StructuredSummary
+from msp.schema.semantic import SemanticMemory
+from msp.schema.sensory import Qualia, SensoryMemory
+from msp.schema.turn import TurnLLM, TurnUser
+from msp.storage.hash_embedding import HashEmbeddingFunction
+from msp.storage.record_cache import CachedRecordStore
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+TOPICS = ["python packaging", "sleep schedule", "guitar chords", "monthly budget",
+          "thai cooking", "garden layout", "job interview", "marathon training",
+          "database indexing", "travel plans", "reading habits", "team conflict"]
+VERBS = ["asked about", "planned", "struggled with", "celebrated", "reviewed", "questioned"]
+MOODS = ["curious", "anxious", "calm", "excited", "tired"]
+USERS = [f"user_{i:02d}" for i in range(8)]
+
+# Records per episode: 1 episode + 2 turns + 0.5 semantic + 0.25 sensory
+RECORDS_PER_EPISODE = 3.75
+
+
+# ----------------------------------------------------------------------
+# Corpus
+# ----------------------------------------------------------------------
+
+def generate_corpus(n_records: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    Yields about ``n_records`` records, episode by episode, in the same
+    order for the same seed.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    n_episodes = max(1, int(n_records / RECORDS_PER_EPISODE))
+    for i in range(n_episodes):
+        topic = rng.choice(TOPICS)
+        user_id = rng.choice(USERS)
+        session_id = f"BENCH_S{i // 16:06d}"
+        ep_id = f"EP_BENCH_{i:07d}"
+        created = start + timedelta(minutes=7 * i)
+        tu_id, tl_id = f"TU_BENCH_{i:07d}", f"TL_BENCH_{i:07d}"
+
+        yield TurnUser(
+            turn_id=tu_id, episode_id=ep_id, user_id=user_id,
+            text_excerpt=f"I {rng.choice(VERBS)} {topic} and want to go deeper on {rng.choice(TOPICS)}",
+            emotion_signal=rng.choice(MOODS), intent="discuss", created_at=created
+        ).to_dict()
+        yield TurnLLM(
+            turn_id=tl_id, episode_id=ep_id,
+            text_excerpt=f"Let's break {topic} into small steps and revisit {rng.choice(TOPICS)} later",
+            epistemic_mode="reflect", confidence=round(rng.random(), 3), created_at=created
+        ).to_dict()
+        refs = {"sensory_refs": [], "semantic_refs": []}
+        if i % 4 == 0:
+            s_id = f"SM_BENCH_{i:07d}"
+            refs["sensory_refs"].append(s_id)
+            yield SensoryMemory(
+                sensory_id=s_id, episode_id=ep_id, data_type="text_visual",
+                qualia=Qualia(intensity=round(rng.random(), 3)),
+                extracted_features={"topic": topic}, created_at=created
+            ).to_dict()
+        if i % 2 == 0:
+            fact = SemanticMemory(
+                id=f"SEM_BENCH_{i:07d}", subject=user_id, predicate="interested_in",
+                object=topic, episode_refs=[ep_id], learned_at=created
+            )
+            refs["semantic_refs"].append(fact.id)
+            yield fact.to_dict()
+        yield EpisodicMemory(
+            episode_id=ep_id, created_at=created, user_id=user_id, session_id=session_id,
+            persona_id="EVA", turn_refs=[tu_id, tl_id], tags=[topic.replace(" ", "_")],
+            situation_context=SituationContext(
+                context_id=f"ctx_{i}", interaction_mode="deep_discussion",
+                stakes_level=rng.choice(["low", "medium", "high"]),
+                time_pressure="low", domain_area=topic
+            ),
+            summary=StructuredSummary(
+                content=f"User {rng.choice(VERBS)} {topic}.",
+                action_taken=f"Suggested a plan for {topic}."
+            ),
+            **refs
+        ).to_dict()
+
+
+def _record_id(record: Dict[str, Any]) -> str:
+    return record.get("turn_id") or record.get("sensory_id") or record.get("episode_id") or record.get("id")
+
+
+# ----------------------------------------------------------------------
+# Measurement helpers
+# ----------------------------------------------------------------------
+
+def latency_stats(samples: List[float]) -> Dict[str, Any]:
+    """p50/p90/p99/mean/max in milliseconds."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pct(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 4)
+
+    return {
+        "n": len(ordered),
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def _timed(calls: List[Callable[[], Any]]) -> List[float]:
+    samples = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+# ----------------------------------------------------------------------
+# Phases
+# ----------------------------------------------------------------------
+
+def bench_store(engine: MSPEngine, n_records: int, seed: int, batch_size: int,
+                sample_every: int) -> Dict[str, Any]:
+    by_kind: Dict[str, int] = {}
+    sampled: List[str] = []
+    batch: List[Dict[str, Any]] = []
+    total = 0
+    started = time.perf_counter()
+    for record in generate_corpus(n_records, seed):
+        batch.append(record)
+        by_kind[record["type"]] = by_kind.get(record["type"], 0) + 1
+        if total % sample_every == 0:
+            sampled.append(_record_id(record))
+        total += 1
+        if len(batch) >= batch_size:
+            engine.store_many(batch)
+            batch = []
+    if batch:
+        engine.store_many(batch)
+    engine.flush()
+    elapsed = time.perf_counter() - started
+    return {
+        "records": total,
+        "by_kind": by_kind,
+        "seconds": round(elapsed, 3),
+        "records_per_s": round(total / elapsed, 1) if elapsed > 0 else None,
+        "_sampled_ids": sampled,
+    }
+
+
+def bench_retrieve(engine: MSPEngine, ids: List[str], n: int, rng: random.Random) -> Dict[str, Any]:
+    picks = [rng.choice(ids) for _ in range(n)]
+    return latency_stats(_timed([lambda m=m: engine.retrieve(m) for m in picks]))
+
+
+def bench_retrieve_cached(engine: MSPEngine, ids: List[str], n: int, rng: random.Random,
+                          max_bytes: int = 32 * 1024 * 1024) -> Dict[str, Any]:
+    picks = [rng.choice(ids) for _ in range(n)]
+    cache = CachedRecordStore(engine.record_store, max_bytes=max_bytes)
+    cache.retrieve_many(picks)  # warm-up pass, not counted
+    cache.hits = cache.misses = 0
+    stats = latency_stats(_timed([lambda m=m: cache.retrieve(m) for m in picks]))
+    cache_stats = cache.stats()
+    stats["hit_rate"] = round(cache_stats["hit_rate"], 4)
+    stats["cached_bytes"] = cache_stats["bytes"]
+    return stats
+
+
+def bench_query(engine: MSPEngine, n: int, rng: random.Random, n_records: int) -> Dict[str, Any]:
+    n_sessions = max(1, int(n_records / RECORDS_PER_EPISODE) // 16)
+    cases = {
+        "episodes_by_session": lambda: {"type": "episodic", "session_id": f"BENCH_S{rng.randrange(n_sessions):06d}"},
+        "turns_by_user": lambda: {"type": "turn", "user_id": rng.choice(USERS)},
+        "episodes_by_tag": lambda: {"type": "episodic", "tags": rng.choice(TOPICS).replace(" ", "_")},
+        "facts_since": lambda: {"type": "semantic", "since": "2025-01-02T00:00:00"},
+    }
+    results = {}
+    for name, make_filter in cases.items():
+        filters = [make_filter() for _ in range(n)]
+        results[name] = latency_stats(_timed([lambda f=f: engine.query(f, limit=10) for f in filters]))
+    return results
+
+
+def bench_semantic_search(engine: MSPEngine, n: int, rng: random.Random) -> Dict[str, Any]:
+    queries = [f"{rng.choice(VERBS)} {rng.choice(TOPICS)}" for _ in range(n)]
+    return latency_stats(_timed([lambda q=q: engine.semantic_search(q, limit=10) for q in queries]))
+
+
+def bench_distillation(engine: MSPEngine, n_sessions: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    session_dir = engine.base_dir / "session_memory"
+    session_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(n_sessions):
+        history = [{"role": "user" if t % 2 == 0 else "assistant",
+                    "content": f"{rng.choice(VERBS)} {rng.choice(TOPICS)} (turn {t})",
+                    "timestamp": f"2025-02-01T10:{t:02d}:00"} for t in range(24)]
+        path = session_dir / f"session_BENCH_{i:06d}.json"
+        with open(path, "wb") as f:
+            f.write(engine.codec.encode({"session_id": f"BENCH_{i:06d}", "history": history}))
+        paths.append(path)
+
+    started = time.perf_counter()
+    for path in paths:
+        engine.distiller.record_session(path)
+    engine.distiller.check_and_distill()
+    elapsed = time.perf_counter() - started
+    return {
+        "sessions": n_sessions,
+        "cores": n_sessions // engine.distiller.SESSIONS_PER_CORE,
+        "seconds": round(elapsed, 3),
+        "sessions_per_s": round(n_sessions / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+def run(
+    n_records: int = 1_000,
+    seed: int = 42,
+    storage_backend: str = "file",
+    vector_backend: str = "chroma",
+    samples: int = 200,
+    batch_size: int = 512,
+    base_dir: str = None
+) -> Dict[str, Any]:
+    """Runs every phase on a fresh memory tree and returns the report."""
+    work = Path(base_dir or tempfile.mkdtemp(prefix="msp_bench_"))
+    rng = random.Random(seed)
+    engine = MSPEngine(
+        base_dir=str(work),
+        storage_backend=storage_backend,
+        vector_backend=vector_backend,
+        background_distillation=False,
+        embedding_function=HashEmbeddingFunction(),
+        record_cache_bytes=0,
+    )
+    try:
+        report: Dict[str, Any] = {
+            "meta": {
+                "msp_version": msp.__version__,
+                "records_requested": n_records,
+                "seed": seed,
+                "storage_backend": storage_backend,
+                "vector_backend": vector_backend,
+                "record_cache": "off (see retrieve_cached)",
+                "embedding": engine.vector_store.embedding_function.name(),
+                "samples": samples,
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        }
+        store = bench_store(engine, n_records, seed, batch_size,
+                            sample_every=max(1, n_records // (samples * 10)))
+        sampled = store.pop("_sampled_ids")
+        report["store"] = store
+        report["retrieve"] = bench_retrieve(engine, sampled, samples, rng)
+        report["retrieve_cached"] = bench_retrieve_cached(engine, sampled, samples, rng)
+        report["query"] = bench_query(engine, samples, rng, n_records)
+        report["semantic_search"] = bench_semantic_search(engine, samples, rng)
+        n_sessions = min(2048, max(64, n_records // 100))
+        report["distillation"] = bench_distillation(engine, n_sessions - n_sessions % 8, seed)
+        return report
+    finally:
+        engine.close()
+        if base_dir is None:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+def _print_summary(report: Dict[str, Any]):
+    store = report["store"]
+    print(f"store            {store['records']} records, {store['records_per_s']} rec/s")
+    r = report["retrieve"]
+    print(f"retrieve         p50 {r['p50_ms']} ms  p99 {r['p99_ms']} ms")
+    c = report["retrieve_cached"]
+    print(f"retrieve_cached  p50 {c['p50_ms']} ms  p99 {c['p99_ms']} ms  hit rate {c['hit_rate']}")
+    for name, q in report["query"].items():
+        print(f"query:{name:<22} p50 {q['p50_ms']} ms  p99 {q['p99_ms']} ms")
+    s = report["semantic_search"]
+    print(f"semantic_search  p50 {s['p50_ms']} ms  p99 {s['p99_ms']} ms")
+    d = report["distillation"]
+    print(f"distillation     {d['sessions']} sessions, {d['sessions_per_s']} sessions/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the MSP memory subsystem.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k", help="Corpus size preset")
+    parser.add_argument("--records", type=int, help="Exact record count (overrides --scale)")
+    parser.add_argument("--storage-backend", choices=sorted(MSPEngine.RECORD_BACKENDS), default="file")
+    parser.add_argument("--vector-backend", choices=MSPEngine.VECTOR_BACKENDS, default="chroma")
+    parser.add_argument("--samples", type=int, default=200, help="Timed calls per latency metric")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", help="Build the tree here and keep it (default: temp dir)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(
+        n_records=args.records or SCALES[args.scale],
+        seed=args.seed,
+        storage_backend=args.storage_backend,
+        vector_backend=args.vector_backend,
+        samples=args.samples,
+        base_dir=args.keep,
+    )
+    _print_summary(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,133 @@
+"""
+Retention Benchmark - disk footprint of a session corpus before/after retention.
+
+Usage:
+    python -m msp.benchmarks.bench_retention [--sessions 10000] [--turns 24] [--json out.json]
+
+Builds a synthetic tree of pretty-printed session snapshots (the original
+snapshot_session format), distills it into cores/spheres, then applies each
+retention variant to a copy and reports files, logical bytes and allocated
+disk bytes per tier. Variants whose optional dependency (zstandard) is
+missing are reported as skipped.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any
+
+from msp.modules.distiller import WisdomDistiller
+from msp.modules.retention import RetentionManager, RetentionPolicy
+
+VARIANTS = {
+    "bundle-deflate": RetentionPolicy("bundle", compression="deflate"),
+    "bundle-lzma": RetentionPolicy("bundle", compression="lzma"),
+    "compress-zstd": RetentionPolicy("compress"),
+}
+
+_TOPICS = ["project layout", "sleep schedule", "guitar practice", "budget review",
+           "ภาษาไทย lesson", "garden planning", "job interview", "reading list"]
+
+
+def build_corpus(base_dir: Path, sessions: int, turns: int, seed: int = 7):
+    """Writes ``sessions`` deterministic snapshots and distills them."""
+    rng = random.Random(seed)
+    session_dir = base_dir / "session_memory"
+    session_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(sessions):
+        topic = rng.choice(_TOPICS)
+        history = []
+        for t in range(turns):
+            history.append({
+                "role": "user" if t % 2 == 0 else "assistant",
+                "content": f"[{topic}] turn {t}: " + " ".join(rng.choice(_TOPICS).split()[0] for _ in range(12)),
+                "timestamp": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T{t % 24:02d}:00:00",
+            })
+        snapshot = {
+            "session_id": f"B{i:06d}",
+            "history": history,
+            "state": {"mood": rng.random(), "energy": rng.random(), "topic": topic},
+        }
+        with open(session_dir / f"session_B{i:06d}.json", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+    WisdomDistiller(SimpleNamespace(base_dir=str(base_dir))).check_and_distill()
+
+
+def _totals(footprint: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    return {k: sum(t[k] for t in footprint.values()) for k in ("files", "bytes", "disk_bytes")}
+
+
+def run(sessions: int = 10000, turns: int = 24) -> Dict[str, Any]:
+    """Measures every retention variant on the same distilled corpus."""
+    work = Path(tempfile.mkdtemp(prefix="msp_bench_retention_"))
+    try:
+        corpus = work / "corpus"
+        started = time.perf_counter()
+        build_corpus(corpus, sessions, turns)
+        before = RetentionManager(str(corpus), {"session": RetentionPolicy("keep")}).footprint()
+        report: Dict[str, Any] = {
+            "sessions": sessions,
+            "turns_per_session": turns,
+            "build_s": round(time.perf_counter() - started, 2),
+            "before": {"tiers": before, "total": _totals(before)},
+            "variants": {},
+            "skipped": [],
+        }
+        for name, policy in VARIANTS.items():
+            tree = work / name
+            shutil.copytree(corpus, tree)
+            try:
+                manager = RetentionManager(str(tree), {"session": policy})
+            except ImportError:
+                report["skipped"].append(name)
+                shutil.rmtree(tree, ignore_errors=True)
+                continue
+            started = time.perf_counter()
+            counts = manager.apply()
+            elapsed = time.perf_counter() - started
+            after = manager.footprint()
+            total = _totals(after)
+            report["variants"][name] = {
+                "apply_s": round(elapsed, 2),
+                "counts": counts["session"],
+                "tiers": after,
+                "total": total,
+                "disk_ratio": round(total["disk_bytes"] / report["before"]["total"]["disk_bytes"], 4),
+            }
+            shutil.rmtree(tree, ignore_errors=True)
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _print_table(report: Dict[str, Any]):
+    def row(label, total, ratio=""):
+        print(f"{label:<18}{total['files']:>10}{total['bytes'] / 1e6:>14.2f}{total['disk_bytes'] / 1e6:>14.2f}{ratio:>10}")
+
+    print(f"{report['sessions']} sessions x {report['turns_per_session']} turns")
+    print(f"{'tree':<18}{'files':>10}{'MB':>14}{'disk MB':>14}{'ratio':>10}")
+    row("before", report["before"]["total"])
+    for name, v in report["variants"].items():
+        row(name, v["total"], f"{v['disk_ratio']:.3f}")
+    if report["skipped"]:
+        print(f"\nSkipped (missing optional dependency): {', '.join(report['skipped'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MSP session retention.")
+    parser.add_argument("--sessions", type=int, default=10000, help="Synthetic sessions")
+    parser.add_argument("--turns", type=int, default=24, help="Turns per session")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.sessions, args.turns)
+    _print_table(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -1,67 +1,206 @@
 """Crosslink Manager - Handles bidirectional integrity between memory types."""
 
+import copy
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from contracts.ports.i_memory_storage import IMemoryStorage
 
 logger = logging.getLogger(__name__)
 
+# Back-link field on the episode for each linking record type
+BACKLINK_FIELDS = {
+    "sensory_v1": "sensory_refs",
+    "semantic": "semantic_refs",
+}
+
+
 class CrosslinkManager:
     """
-    Automates the synchronization of bidirectional links between 
+    Automates the synchronization of bidirectional links between
     Episodic, Sensory, and Semantic memories.
+
+    Back-links are patched straight into the record store: only the
+    episode's ``sensory_refs``/``semantic_refs`` change, and those list
+    fields are not part of the vector index, so the episode is neither
+    re-embedded nor re-crosslinked. All back-links to the same episode
+    within a batch are coalesced into one write, and recently patched
+    episodes are kept in a small LRU so repeated fact extraction against
+    the same episode does not re-read it.
+
+    When given a LinkIndex, every synced batch (and the patched episodes)
+    is also folded into that persistent adjacency index.
     """
 
-    def __init__(self, storage: IMemoryStorage):
+    def __init__(
+        self,
+        storage: IMemoryStorage,
+        record_store: Optional[IMemoryStorage] = None,
+        cache_size: int = 256,
+        link_index=None
+    ):
+        """
+        Initialize manager.
+
+        Args:
+            storage: Read path (MSPEngine, so queued writes are visible)
+            record_store: Write path for back-link patches. Defaults to
+                ``storage`` (full store path, kept for standalone use)
+            cache_size: Hot episode cache capacity
+            link_index: Optional LinkIndex kept in step with the records
+        """
         self.storage = storage
+        self.link_index = link_index
+        self.record_store = record_store or storage
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._hot: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.stats = {"batches": 0, "backlinks": 0, "episode_writes": 0, "cache_hits": 0}
 
     def sync_links(self, memory_data: Dict[str, Any]):
         """
         Inspects memory_data and updates the reverse side of any links.
         """
-        m_type = memory_data.get("type")
-        
-        if m_type == "sensory_v1":
-            self._sync_sensory_to_episode(memory_data)
-        elif m_type == "semantic":
-            self._sync_semantic_to_episodes(memory_data)
-        elif m_type.startswith("turn_"):
-            # Future: Link turn to episode if not already handled by episode creation
-            pass
-
-    def _sync_sensory_to_episode(self, sensory_data: Dict[str, Any]):
-        """Sensory (episode_id) -> Episodic (sensory_refs)"""
-        ep_id = sensory_data.get("episode_id")
-        sensory_id = sensory_data.get("sensory_id")
-        
-        if not ep_id or not sensory_id:
+        self.sync_batch([memory_data])
+
+    def sync_batch(self, records: List[Dict[str, Any]]):
+        """
+        Updates the reverse side of every link in a batch of just-stored
+        records, with at most one write per touched episode.
+        """
+        # 1. Collect back-links per episode (ordered, de-duplicated)
+        wanted: Dict[str, Dict[str, List[str]]] = OrderedDict()
+        for memory_data in records:
+            m_type = memory_data.get("type") or ""
+            if m_type == "episodic_v3":
+                # A fresh copy of the episode itself supersedes the cached one
+                self._remember(memory_data.get("episode_id"), memory_data)
+                continue
+            if m_type.startswith("turn_"):
+                # Future: Link turn to episode if not already handled by episode creation
+                continue
+            field = BACKLINK_FIELDS.get(m_type)
+            if field is None:
+                continue
+
+            if m_type == "sensory_v1":
+                # Sensory (episode_id) -> Episodic (sensory_refs)
+                source_id = memory_data.get("sensory_id")
+                episode_ids = [memory_data.get("episode_id")]
+            else:
+                # Semantic (episode_refs) -> Episodic (semantic_refs)
+                source_id = memory_data.get("id")
+                episode_ids = memory_data.get("episode_refs") or []
+            if not source_id:
+                continue
+            for ep_id in episode_ids:
+                if not ep_id:
+                    continue
+                refs = wanted.setdefault(ep_id, {}).setdefault(field, [])
+                if source_id not in refs:
+                    refs.append(source_id)
+
+        if not wanted:
+            self._index_links(records, [])
             return
 
-        episode = self.storage.retrieve(ep_id)
-        if episode:
-            # Add sensory link to episode if missing
-            refs = episode.get("sensory_refs", [])
-            if sensory_id not in refs:
-                refs.append(sensory_id)
-                episode["sensory_refs"] = refs
+        # 2. Load the episodes (hot cache first, one batch read for the rest)
+        episodes = self._load(list(wanted))
+
+        # 3. Apply the coalesced patches; write each changed episode once
+        changed = []
+        for ep_id, fields in wanted.items():
+            episode = episodes.get(ep_id)
+            if not episode:
+                continue
+            dirty = False
+            for field, source_ids in fields.items():
+                refs = list(episode.get(field) or [])
+                for source_id in source_ids:
+                    if source_id not in refs:
+                        refs.append(source_id)
+                        dirty = True
+                        self.stats["backlinks"] += 1
+                        logger.debug(f"Back-linked {source_id} to Episode {ep_id} ({field})")
+                episode[field] = refs
+            if dirty:
+                changed.append(episode)
+
+        self.stats["batches"] += 1
+        if changed:
+            self._write(changed)
+        self._index_links(records, changed)
+
+    def remove(self, memory_id: str):
+        """Forgets a deleted record (hot cache and link index)."""
+        self.invalidate(memory_id)
+        if self.link_index is not None:
+            self.link_index.remove(memory_id)
+
+    def invalidate(self, memory_id: Optional[str] = None):
+        """Drops one episode (or everything) from the hot cache."""
+        with self._lock:
+            if memory_id is None:
+                self._hot.clear()
+            else:
+                self._hot.pop(memory_id, None)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _index_links(self, records: List[Dict[str, Any]], patched: List[Dict[str, Any]]):
+        if self.link_index is not None:
+            # Patched episodes last: their ref lists are the reconciled ones
+            self.link_index.index_records(list(records) + patched)
+
+    def _load(self, episode_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        has_pending = getattr(self.storage, "has_pending", None)
+        with self._lock:
+            for ep_id in episode_ids:
+                # A queued newer copy makes the cached one stale
+                cached = None if has_pending and has_pending(ep_id) else self._hot.get(ep_id)
+                if cached is not None:
+                    self._hot.move_to_end(ep_id)
+                    found[ep_id] = copy.deepcopy(cached)
+                    self.stats["cache_hits"] += 1
+                else:
+                    missing.append(ep_id)
+
+        if missing:
+            for ep_id, episode in zip(missing, self.storage.retrieve_many(missing)):
+                if episode and episode.get("type") == "episodic_v3":
+                    found[ep_id] = episode
+        return found
+
+    def _write(self, episodes: List[Dict[str, Any]]):
+        has_pending = getattr(self.storage, "has_pending", None)
+        direct = []
+        for episode in episodes:
+            if has_pending and has_pending(episode["episode_id"]):
+                # A newer queued copy would overwrite a direct patch; go through the queue
                 self.storage.store(episode)
-                logger.debug(f"Back-linked Sensory {sensory_id} to Episode {ep_id}")
-
-    def _sync_semantic_to_episodes(self, semantic_data: Dict[str, Any]):
-        """Semantic (episode_refs) -> Episodic (semantic_refs)"""
-        episode_refs = semantic_data.get("episode_refs", [])
-        semantic_id = semantic_data.get("id")
-        
-        if not episode_refs or not semantic_id:
-            return
+            else:
+                direct.append(episode)
+        if direct:
+            store_many = getattr(self.record_store, "store_many", None)
+            if store_many:
+                store_many(direct)
+            else:
+                for episode in direct:
+                    self.record_store.store(episode)
+        self.stats["episode_writes"] += len(episodes)
+        for episode in episodes:
+            self._remember(episode["episode_id"], episode)
 
-        for ep_id in episode_refs:
-            episode = self.storage.retrieve(ep_id)
-            if episode:
-                # Add semantic link to episode if missing
-                refs = episode.get("semantic_refs", [])
-                if semantic_id not in refs:
-                    refs.append(semantic_id)
-                    episode["semantic_refs"] = refs
-                    self.storage.store(episode)
-                    logger.debug(f"Back-linked Semantic {semantic_id} to Episode {ep_id}")
+    def _remember(self, episode_id: Optional[str], episode: Dict[str, Any]):
+        if not episode_id or self.cache_size <= 0:
+            return
+        with self._lock:
+            self._hot[episode_id] = copy.deepcopy(episode)
+            self._hot.move_to_end(episode_id)
+            while len(self._hot) > self.cache_size:
+                self._hot.popitem(last=False)
@@ -0,0 +1,248 @@
+"""Instrumentation - Per-operation latency histograms and I/O counters for MSP."""
+
+import bisect
+import threading
+import time
+from typing import Dict, Any, Optional, Sequence
+
+# Latency bucket upper bounds in seconds (Prometheus-style, +Inf implied)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class _OpStats:
+    """Histogram and I/O counters of one operation."""
+
+    __slots__ = ("buckets", "count", "sum", "errors", "bytes_read", "bytes_written", "files",
+                 "cache_hits", "bytes_cached")
+
+    def __init__(self, n_buckets: int):
+        self.buckets = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files = 0
+        self.cache_hits = 0
+        self.bytes_cached = 0
+
+
+class _Span:
+    """Times one operation; I/O seen inside it is attributed to the same op."""
+
+    __slots__ = ("_owner", "_op", "_started", "bytes_read", "bytes_written", "files",
+                 "cache_hits", "bytes_cached")
+
+    def __init__(self, owner: "Instrumentation", op: str):
+        self._owner = owner
+        self._op = op
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files = 0
+        self.cache_hits = 0
+        self.bytes_cached = 0
+
+    def add(self, bytes_read: int = 0, bytes_written: int = 0, files: int = 0,
+            cache_hits: int = 0, bytes_cached: int = 0):
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+        self.files += files
+        self.cache_hits += cache_hits
+        self.bytes_cached += bytes_cached
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._owner.record(
+            self._op, time.perf_counter() - self._started,
+            bytes_read=self.bytes_read, bytes_written=self.bytes_written,
+            files=self.files, cache_hits=self.cache_hits, bytes_cached=self.bytes_cached,
+            error=exc_type is not None
+        )
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span handed out while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def add(self, bytes_read: int = 0, bytes_written: int = 0, files: int = 0,
+            cache_hits: int = 0, bytes_cached: int = 0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """
+    Registry of per-operation metrics shared by MSPEngine and its stores.
+
+    Usage:
+        with instrumentation.span("file.read") as span:
+            data = f.read()
+            span.add(bytes_read=len(data), files=1)
+
+    Each operation name gets a latency histogram (count, sum, buckets), an
+    error count, bytes read/written and files touched (disk I/O only), and
+    the records and bytes served from the record cache. While disabled,
+    ``span()`` returns a shared no-op object, so the cost on the hot path is
+    one attribute check.
+
+    Operation names used by MSP:
+        engine.*  MSPEngine entry points and the phases of a commit/search
+        file.*    FileMemoryStore reads/writes/deletes/queries
+        cache.*   CachedRecordStore lookups (cache_hits / bytes_cached)
+        chroma.*  ChromaMemoryStore embedding, upserts, searches, deletes
+        numpy.*   NumpyVectorStore embedding, upserts, searches, deletes
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize registry.
+
+        Args:
+            enabled: Record metrics (False makes every span a no-op)
+            buckets: Latency bucket upper bounds in seconds, ascending
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._ops: Dict[str, _OpStats] = {}
+        self._lock = threading.Lock()
+
+    def span(self, op: str):
+        """Context manager timing ``op`` (a no-op while disabled)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, op)
+
+    def record(
+        self,
+        op: str,
+        seconds: float,
+        bytes_read: int = 0,
+        bytes_written: int = 0,
+        files: int = 0,
+        cache_hits: int = 0,
+        bytes_cached: int = 0,
+        error: bool = False
+    ):
+        """Adds one observation of ``op``."""
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats = self._ops.get(op)
+            if stats is None:
+                stats = self._ops[op] = _OpStats(len(self.buckets))
+            stats.buckets[slot] += 1
+            stats.count += 1
+            stats.sum += seconds
+            stats.errors += error
+            stats.bytes_read += bytes_read
+            stats.bytes_written += bytes_written
+            stats.files += files
+            stats.cache_hits += cache_hits
+            stats.bytes_cached += bytes_cached
+
+    def reset(self):
+        """Drops every recorded observation."""
+        with self._lock:
+            self._ops.clear()
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current metrics as a dict.
+
+        Returns:
+            {op: {"count", "errors", "sum_s", "mean_s", "p50_s", "p95_s",
+                  "p99_s", "buckets" ({le: cumulative count}),
+                  "bytes_read", "bytes_written", "files", "cache_hits",
+                  "bytes_cached"}}
+            Percentiles are bucket upper bounds (histogram estimates).
+        """
+        with self._lock:
+            ops = {op: (list(s.buckets), s.count, s.sum, s.errors, s.bytes_read, s.bytes_written, s.files,
+                        s.cache_hits, s.bytes_cached)
+                   for op, s in self._ops.items()}
+
+        result = {}
+        for op, (buckets, count, total, errors, bytes_read, bytes_written, files,
+                 cache_hits, bytes_cached) in sorted(ops.items()):
+            cumulative, running = {}, 0
+            for bound, n in zip(self._labels(), buckets):
+                running += n
+                cumulative[bound] = running
+            result[op] = {
+                "count": count,
+                "errors": errors,
+                "sum_s": round(total, 6),
+                "mean_s": round(total / count, 6) if count else 0.0,
+                "p50_s": self._quantile(buckets, count, 0.50),
+                "p95_s": self._quantile(buckets, count, 0.95),
+                "p99_s": self._quantile(buckets, count, 0.99),
+                "buckets": cumulative,
+                "bytes_read": bytes_read,
+                "bytes_written": bytes_written,
+                "files": files,
+                "cache_hits": cache_hits,
+                "bytes_cached": bytes_cached,
+            }
+        return result
+
+    def to_prometheus(self, prefix: str = "msp") -> str:
+        """Current metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_op_latency_seconds Latency of MSP memory operations.",
+            f"# TYPE {prefix}_op_latency_seconds histogram",
+        ]
+        for op, m in snapshot.items():
+            for bound, n in m["buckets"].items():
+                lines.append(f'{prefix}_op_latency_seconds_bucket{{op="{op}",le="{bound}"}} {n}')
+            lines.append(f'{prefix}_op_latency_seconds_sum{{op="{op}"}} {m["sum_s"]}')
+            lines.append(f'{prefix}_op_latency_seconds_count{{op="{op}"}} {m["count"]}')
+
+        counters = (
+            ("errors", "op_errors_total", "Failed MSP memory operations."),
+            ("bytes_read", "op_bytes_read_total", "Bytes read by MSP memory operations."),
+            ("bytes_written", "op_bytes_written_total", "Bytes written by MSP memory operations."),
+            ("files", "op_files_total", "Files touched by MSP memory operations."),
+            ("cache_hits", "op_cache_hits_total", "Records served from the MSP record cache."),
+            ("bytes_cached", "op_bytes_cached_total", "Bytes served from the MSP record cache (no I/O)."),
+        )
+        for key, name, help_text in counters:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for op, m in snapshot.items():
+                lines.append(f'{prefix}_{name}{{op="{op}"}} {m[key]}')
+        return "\n".join(lines) + "\n"
+
+    def _labels(self):
+        return [repr(float(b)) for b in self.buckets] + ["+Inf"]
+
+    def _quantile(self, buckets, count: int, q: float) -> Optional[float]:
+        if not count:
+            return None
+        target = q * count
+        running = 0
+        for i, n in enumerate(buckets):
+            running += n
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
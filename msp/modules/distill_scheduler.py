@@ -0,0 +1,207 @@
+"""
+Distill Scheduler - Runs 8-8-8 distillation off the request path.
+Owns the Session -> Core -> Sphere cascade on a bounded worker pool.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, Set
+
+from msp.modules.distiller import WisdomDistiller
+
+logger = logging.getLogger(__name__)
+
+
+class DistillScheduler:
+    """
+    Background scheduler for a WisdomDistiller.
+
+    ``kick()`` claims every complete group from the ledger and submits each
+    as a job to a pool of at most ``max_workers`` threads, so independent
+    cores are distilled in parallel. When a core job finishes the scheduler
+    kicks itself again, which is how full sets of cores cascade into a
+    sphere without another snapshot arriving.
+
+    A failed job stays reserved in the ledger and is retried on the next
+    kick (or on restart) under the same output ID.
+    """
+
+    def __init__(self, distiller: WisdomDistiller, max_workers: int = 2):
+        """
+        Initialize scheduler.
+
+        Args:
+            distiller: Distiller whose jobs are run
+            max_workers: Max groups distilled concurrently
+        """
+        self.distiller = distiller
+        self.max_workers = max(1, max_workers)
+        # Re-entrant: a job finishing instantly runs _forget inside kick()
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Set[Future] = set()
+        self._closed = False
+        self.stats = {
+            "kicks": 0,
+            "submitted": 0,
+            "completed": {"core": 0, "sphere": 0},
+            "failed": 0,
+            "last_job_s": 0.0,
+            "max_job_s": 0.0,
+        }
+
+    def kick(self) -> int:
+        """
+        Submits every ready group. Never blocks on distillation.
+
+        Returns:
+            Number of jobs submitted
+        """
+        with self._lock:
+            if self._closed:
+                return 0
+            self.stats["kicks"] += 1
+            jobs = self.distiller.claim_jobs()
+            if jobs and self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="msp-distill"
+                )
+            for job in jobs:
+                future = self._executor.submit(self._run, job)
+                self._futures.add(future)
+                future.add_done_callback(self._forget)
+            self.stats["submitted"] += len(jobs)
+            return len(jobs)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until no job is queued or running, including jobs cascaded
+        from ones that finish while waiting. False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = set(self._futures)
+            if not pending:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            wait(pending, timeout=remaining)
+
+    def close(self):
+        """Finishes queued and cascaded work, then stops the workers."""
+        self.wait_idle()
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth and lag.
+
+        Returns:
+            Dict with pending units per tier, jobs queued/running, queue
+            depth (pending units + active jobs), the age in seconds of the
+            oldest pending unit per tier, and job counters/durations
+        """
+        backlog = self.distiller.backlog()
+        with self._lock:
+            active = len(self._futures)
+            stats = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self.stats.items()}
+        return {
+            "pending": backlog["pending"],
+            "in_flight": backlog["in_flight"],
+            "active_jobs": active,
+            "queue_depth": sum(backlog["pending"].values()) + backlog["in_flight"],
+            "lag_s": backlog["oldest_pending_s"],
+            "max_workers": self.max_workers,
+            **stats,
+        }
+
+    def _run(self, job):
+        out_id, tier, _ = job
+        started = time.perf_counter()
+        try:
+            self.distiller.run_job(job)
+        except Exception as e:
+            logger.error(f"[8-8-8] Background distillation of {out_id} failed: {e}")
+            with self._lock:
+                self.stats["failed"] += 1
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats["completed"]["core" if tier == "session" else "sphere"] += 1
+            self.stats["last_job_s"] = round(elapsed, 6)
+            self.stats["max_job_s"] = max(self.stats["max_job_s"], round(elapsed, 6))
+        if tier == "session":
+            # A new core may complete a sphere group
+            self.kick()
+
+    def _forget(self, future: Future):
+        with self._lock:
+            self._futures.discard(future)
+
+
+def backfill(
+    base_dir: str,
+    dry_run: bool = True,
+    max_workers: int = 2,
+    summarizer=None,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Distills an existing 8-8-8 tree (e.g. ``memory_888_test``).
+
+    Sessions and cores on disk that the ledger has not seen are queued
+    first. With ``dry_run`` nothing is written, not even the ledger, and
+    only the plan is returned.
+
+    Args:
+        base_dir: Directory holding session_memory/core_memory/sphere_memory
+        dry_run: Only report what would be distilled
+        max_workers: Concurrent jobs when actually distilling
+        summarizer: Optional SessionSummarizer
+        timeout: Max seconds to wait for the run
+
+    Returns:
+        {"dry_run", "registered", "plan", "metrics"} (metrics only after a run)
+    """
+    distiller = WisdomDistiller(
+        SimpleNamespace(base_dir=str(Path(base_dir))), summarizer=summarizer, dry_run=dry_run
+    )
+    result: Dict[str, Any] = {
+        "dry_run": dry_run,
+        "registered": distiller.register_existing(),
+        "plan": distiller.plan(),
+    }
+    if dry_run:
+        return result
+
+    scheduler = DistillScheduler(distiller, max_workers=max_workers)
+    scheduler.kick()
+    finished = scheduler.wait_idle(timeout)
+    result["metrics"] = scheduler.metrics()
+    if finished:
+        scheduler.close()
+    else:
+        logger.warning(f"[8-8-8] Backfill of {base_dir} still running after {timeout}s")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Backfill 8-8-8 distillation over a memory tree")
+    parser.add_argument("base_dir")
+    parser.add_argument("--run", action="store_true", help="Distill (default is a dry run)")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    print(json.dumps(backfill(args.base_dir, dry_run=not args.run, max_workers=args.workers), indent=2))
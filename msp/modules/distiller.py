@@ -3,101 +3,535 @@ Wisdom Distiller - Memory Compression Engine (Canonical 8-8-8 Protocol).
 Handles the transition: 8 Sessions -> 1 Core -> 8 Cores -> 1 Sphere.
 """
 
+import hashlib
 import logging
 import json
+import os
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from msp.modules.session_distill import SessionSummarizer, StreamingSessionDistiller
+from msp.storage.codecs import read_record
 
 logger = logging.getLogger(__name__)
 
+
+class DistillLedger:
+    """
+    Durable record of which units each tier has consumed.
+
+    Tracks, per tier, the units waiting to be distilled (in arrival order),
+    the units already consumed, the groups currently being distilled and the
+    next output IDs. This is what makes distillation exactly-once: a group
+    is reserved under its output ID before anything is written, and
+    committed after the output exists, so a crash in between re-runs the
+    same group under the same ID and overwrites the same file.
+
+    Changes are buffered and made durable by ``save()`` as one fsynced
+    append to a journal, so a step costs O(new units), not O(history). The
+    journal is replayed on open and compacted into a single state entry
+    once it is mostly superseded.
+
+    Each unit may carry a content stamp. A consumed unit announced again
+    with a different stamp (its file was rewritten) is queued again, so
+    the new content is distilled instead of silently dropped.
+
+    Journal entries ({base_dir}/.index/distill_ledger.jsonl):
+        {"op": "add", "tier": "session", "unit": "session_S009", "stamp": "9f2c..."}
+        {"op": "reserve", "id": "core_002", "tier": "session", "units": [...], "next": 3}
+        {"op": "commit", "id": "core_002"}
+        {"op": "state", "pending": {...}, "consumed": {...}, "in_flight": {...}, "next_id": {...},
+         "stamps": {...}}
+
+    A ledger written by older versions as one JSON file
+    (distill_ledger.json) is read and migrated on first open.
+    """
+
+    LEDGER_NAME = "distill_ledger.jsonl"
+    LEGACY_NAME = "distill_ledger.json"
+    TIERS = ("session", "core")
+    # Output kind produced from each input tier
+    OUTPUTS = {"session": "core", "core": "sphere"}
+
+    def __init__(self, path: Path, read_only: bool = False):
+        self.path = Path(path)
+        self.read_only = read_only
+        self.pending: Dict[str, List[str]] = {t: [] for t in self.TIERS}
+        self.consumed: Dict[str, set] = {t: set() for t in self.TIERS}
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.next_id: Dict[str, int] = {"core": 1, "sphere": 1}
+        # unit -> content stamp of the announced file
+        self.stamps: Dict[str, str] = {}
+        # Entries not yet appended to the journal
+        self._unsaved: List[Dict[str, Any]] = []
+        legacy_path = self.path.with_name(self.LEGACY_NAME)
+        self.exists = self.path.exists()
+        if self.exists:
+            self._load()
+        elif legacy_path.exists():
+            self._load_legacy(legacy_path)
+            self.exists = True
+            if not read_only:
+                self.compact()
+                legacy_path.unlink()
+
+    def known(self, tier: str, unit: str) -> bool:
+        if unit in self.consumed[tier] or unit in self.pending[tier]:
+            return True
+        return any(unit in g["units"] for g in self.in_flight.values() if g["tier"] == tier)
+
+    def add(self, tier: str, unit: str, stamp: Optional[str] = None) -> bool:
+        """
+        Queues a unit for its tier.
+
+        Args:
+            tier: Input tier ('session' or 'core')
+            unit: Unit name (file stem)
+            stamp: Content stamp of the unit's file; a consumed unit whose
+                   stamp changed is queued again
+
+        Returns:
+            True if the unit was queued, False if already known
+        """
+        restamped = stamp is not None and self.stamps.get(unit) != stamp
+        queued = self._add(tier, unit, stamp)
+        if queued or restamped:
+            entry = {"op": "add", "tier": tier, "unit": unit}
+            if stamp is not None:
+                entry["stamp"] = stamp
+            self._unsaved.append(entry)
+        return queued
+
+    def reserve(self, tier: str, count: int) -> Optional[str]:
+        """
+        Moves the oldest ``count`` pending units of a tier into a new
+        in-flight group. Returns the group's output ID, or None if fewer
+        than ``count`` units are pending.
+        """
+        if len(self.pending[tier]) < count:
+            return None
+        kind = self.OUTPUTS[tier]
+        out_id = f"{kind}_{self.next_id[kind]:03d}"
+        units = self.pending[tier][:count]
+        self._reserve(out_id, tier, units, self.next_id[kind] + 1)
+        self._unsaved.append({"op": "reserve", "id": out_id, "tier": tier, "units": units,
+                              "next": self.next_id[kind]})
+        return out_id
+
+    def commit(self, out_id: str):
+        """Marks an in-flight group consumed; a new core becomes pending."""
+        self._commit(out_id)
+        self._unsaved.append({"op": "commit", "id": out_id})
+
+    def save(self):
+        """Appends the changes since the last save to the journal (fsynced)."""
+        if self.read_only or not self._unsaved:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self._unsaved)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._unsaved = []
+        self.exists = True
+
+    def compact(self):
+        """Rewrites the journal as a single state entry (atomic replace)."""
+        if self.read_only:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "state", **self._state()}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._unsaved = []
+        self.exists = True
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _add(self, tier: str, unit: str, stamp: Optional[str] = None) -> bool:
+        previous = self.stamps.get(unit)
+        if stamp is not None:
+            self.stamps[unit] = stamp
+        if unit in self.pending[tier]:
+            return False
+        if self.known(tier, unit):
+            if stamp is None or previous is None or previous == stamp:
+                return False
+            # Rewritten after it was consumed (or while in flight): distill it again
+            self.consumed[tier].discard(unit)
+            logger.info(f"[8-8-8] {unit} was rewritten after distillation; queued again")
+        self.pending[tier].append(unit)
+        return True
+
+    def _reserve(self, out_id: str, tier: str, units: List[str], next_id: int):
+        self.next_id[self.OUTPUTS[tier]] = next_id
+        self.in_flight[out_id] = {"tier": tier, "units": list(units)}
+        reserved = set(units)
+        self.pending[tier] = [u for u in self.pending[tier] if u not in reserved]
+
+    def _commit(self, out_id: str):
+        group = self.in_flight.pop(out_id)
+        # Units rewritten while in flight are pending again and stay unconsumed
+        requeued = set(self.pending[group["tier"]])
+        self.consumed[group["tier"]].update(u for u in group["units"] if u not in requeued)
+        if group["tier"] == "session":
+            self._add("core", out_id)
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "consumed": {t: sorted(units) for t, units in self.consumed.items()},
+            "in_flight": self.in_flight,
+            "next_id": self.next_id,
+            "stamps": self.stamps,
+        }
+
+    def _apply_state(self, data: Dict[str, Any]):
+        for tier in self.TIERS:
+            self.pending[tier] = list(data.get("pending", {}).get(tier, []))
+            self.consumed[tier] = set(data.get("consumed", {}).get(tier, []))
+        self.in_flight = dict(data.get("in_flight", {}))
+        self.next_id.update(data.get("next_id", {}))
+        self.stamps = dict(data.get("stamps", {}))
+
+    def _load(self):
+        lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn distill ledger entry in {self.path}")
+                    continue
+                op = entry.get("op")
+                if op == "add":
+                    self._add(entry["tier"], entry["unit"], entry.get("stamp"))
+                elif op == "reserve":
+                    self._reserve(entry["id"], entry["tier"], entry["units"], entry["next"])
+                elif op == "commit" and entry["id"] in self.in_flight:
+                    self._commit(entry["id"])
+                elif op == "state":
+                    self._apply_state(entry)
+        live = sum(len(u) for u in self.pending.values()) + sum(len(u) for u in self.consumed.values())
+        if not self.read_only and lines > 2 * (live + len(self.in_flight)) + 1024:
+            self.compact()
+
+    def _load_legacy(self, legacy_path: Path):
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            self._apply_state(json.load(f))
+
+
 class WisdomDistiller:
     """
     Implements Pillar 5: Tiered Wisdom (8-8-8) per MEM_PHILOSOPHY_888.md
-    
+
     Tiers:
     1. Session Memory: Raw snapshots of consciousness after each session.
     2. Core Memory: Narrative Arcs distilled from 8 Sessions.
     3. Sphere Memory: Wisdom/Identity DNA distilled from 8 Cores.
+
+    New units are announced with ``record_session`` (MSPEngine does this on
+    snapshot) and tracked in a DistillLedger, so each check costs O(new
+    units) and every session/core is distilled exactly once.
+
+    Work is handed out as jobs: ``claim_jobs()`` reserves every complete
+    group and ``run_job()`` distills one. ``check_and_distill()`` runs them
+    inline; DistillScheduler runs them on a worker pool.
     """
-    
-    def __init__(self, msp_engine):
+
+    def __init__(
+        self,
+        msp_engine,
+        summarizer: Optional[SessionSummarizer] = None,
+        dry_run: bool = False
+    ):
+        """
+        Initialize distiller.
+
+        Args:
+            msp_engine: Owning MSPEngine (provides base_dir)
+            summarizer: Session summarizer for the Summary pillar
+                        (default: extractive; see LLMSummarizer)
+            dry_run: Never write the ledger or any output (see plan())
+        """
         self.msp = msp_engine
         self.base_dir = Path(msp_engine.base_dir)
         self.session_dir = self.base_dir / "session_memory"
         self.core_dir = self.base_dir / "core_memory"
         self.sphere_dir = self.base_dir / "sphere_memory"
-        
+        self.dry_run = dry_run
+
         # Ensure directories exist
-        self.session_dir.mkdir(parents=True, exist_ok=True)
-        self.core_dir.mkdir(parents=True, exist_ok=True)
-        self.sphere_dir.mkdir(parents=True, exist_ok=True)
-        
+        if not dry_run:
+            self.session_dir.mkdir(parents=True, exist_ok=True)
+            self.core_dir.mkdir(parents=True, exist_ok=True)
+            self.sphere_dir.mkdir(parents=True, exist_ok=True)
+
         # Thresholds per spec
         self.SESSIONS_PER_CORE = 8
         self.CORES_PER_SPHERE = 8
-        
+
+        # Sessions are streamed turn by turn (bounded memory)
+        self.pipeline = StreamingSessionDistiller(summarizer)
+
+        self._lock = threading.RLock()
+        # Output IDs of groups a worker is currently distilling
+        self._claimed: set = set()
+        # When each unit was announced (for lag metrics)
+        self._enqueued_at: Dict[str, float] = {}
+        self.ledger = DistillLedger(self.base_dir / ".index" / DistillLedger.LEDGER_NAME, read_only=dry_run)
+        if not self.ledger.exists:
+            self._bootstrap_ledger()
+
+    # ------------------------------------------------------------------
+    # Triggering
+    # ------------------------------------------------------------------
+
+    def record_session(self, session_path: Path):
+        """
+        Announces a session snapshot to the ledger. A snapshot that rewrote
+        an already distilled session is queued again.
+        """
+        unit = Path(session_path).stem
+        stamp = self._stamp(Path(session_path))
+        with self._lock:
+            if self.ledger.add("session", unit, stamp):
+                self._enqueued_at[unit] = time.time()
+            self.ledger.save()
+
+    def register_existing(self) -> int:
+        """
+        Backfill: queues sessions/cores found on disk that the ledger has
+        never seen (e.g. copied in from another tree). Returns the count.
+        """
+        added = 0
+        with self._lock:
+            for p in sorted(self.session_dir.glob("session_*.json")):
+                added += self.ledger.add("session", p.stem)
+            for p in sorted(self.core_dir.glob("core_*.json")):
+                if p.stem not in self.ledger.in_flight:
+                    added += self.ledger.add("core", p.stem)
+            if added:
+                self.ledger.save()
+        return added
+
     def check_and_distill(self):
         """
-        Main entry point for distillation logic. 
-        Usually triggered at the end of a session.
+        Main entry point for distillation logic.
+        Runs every ready group inline, cascading Session -> Core -> Sphere.
+        """
+        while True:
+            jobs = self.claim_jobs()
+            if not jobs:
+                break
+            for job in jobs:
+                self.run_job(job)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def claim_jobs(self) -> List[Tuple[str, str, List[Path]]]:
+        """
+        Reserves every complete group and returns them as
+        (output_id, input_tier, source_paths) jobs.
+
+        Groups left in flight by a crashed run are handed out again first,
+        under their original output IDs.
         """
-        # 1. Distill Sessions to Core
-        sessions = self._get_pending_units(self.session_dir, "session")
-        if len(sessions) >= self.SESSIONS_PER_CORE:
-            self._distill_sessions_to_core(sessions[:self.SESSIONS_PER_CORE])
-            
-        # 2. Distill Cores to Sphere
-        cores = self._get_pending_units(self.core_dir, "core")
-        if len(cores) >= self.CORES_PER_SPHERE:
-            self._distill_cores_to_sphere(cores[:self.CORES_PER_SPHERE])
+        with self._lock:
+            reserved = False
+            for tier, count in (("session", self.SESSIONS_PER_CORE), ("core", self.CORES_PER_SPHERE)):
+                while self.ledger.reserve(tier, count):
+                    reserved = True
+            if reserved:
+                self.ledger.save()
+            jobs = []
+            for out_id, group in self.ledger.in_flight.items():
+                if out_id in self._claimed:
+                    continue
+                self._claimed.add(out_id)
+                jobs.append((out_id, group["tier"], self._paths(group["tier"], group["units"])))
+            return jobs
 
-    def _get_pending_units(self, directory: Path, prefix: str) -> List[Path]:
-        """Returns units that haven't been distilled yet (placeholder logic)."""
-        if not directory.exists(): return []
-        # For now, just list all and we assume we take the oldest 8.
-        # In a real system, we'd mark them as 'archived'/ 'processed'.
-        return sorted(list(directory.glob(f"{prefix}_*.json")))
+    def run_job(self, job: Tuple[str, str, List[Path]]):
+        """Distills one claimed group, then commits it to the ledger."""
+        out_id, tier, paths = job
+        try:
+            if tier == "session":
+                self._distill_sessions_to_core(paths, out_id)
+            else:
+                self._distill_cores_to_sphere(paths, out_id)
+            with self._lock:
+                self.ledger.commit(out_id)
+                self.ledger.save()
+                for p in paths:
+                    self._enqueued_at.pop(p.stem, None)
+                if tier == "session":
+                    self._enqueued_at[out_id] = time.time()
+        finally:
+            with self._lock:
+                self._claimed.discard(out_id)
 
-    def _distill_sessions_to_core(self, session_paths: List[Path]):
+    def plan(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Dry run: the groups the next distillation would produce, cascading
+        planned cores into spheres. Nothing is reserved or written.
+        """
+        with self._lock:
+            pending = {t: list(units) for t, units in self.ledger.pending.items()}
+            next_id = dict(self.ledger.next_id)
+            plan: Dict[str, List[Dict[str, Any]]] = {"resume": [], "core": [], "sphere": []}
+            for out_id, group in self.ledger.in_flight.items():
+                plan["resume"].append({"id": out_id, "sources": list(group["units"])})
+                if group["tier"] == "session":
+                    pending["core"].append(out_id)
+
+        for tier, count in (("session", self.SESSIONS_PER_CORE), ("core", self.CORES_PER_SPHERE)):
+            kind = DistillLedger.OUTPUTS[tier]
+            while len(pending[tier]) >= count:
+                out_id = f"{kind}_{next_id[kind]:03d}"
+                next_id[kind] += 1
+                plan[kind].append({"id": out_id, "sources": pending[tier][:count]})
+                pending[tier] = pending[tier][count:]
+                if kind == "core":
+                    pending["core"].append(out_id)
+        return plan
+
+    def backlog(self) -> Dict[str, Any]:
+        """Pending/in-flight counts and the age of the oldest pending unit per tier."""
+        now = time.time()
+        with self._lock:
+            oldest = {}
+            for tier in DistillLedger.TIERS:
+                units = self.ledger.pending[tier]
+                oldest[tier] = round(now - self._announced_at(tier, units[0]), 3) if units else 0.0
+            return {
+                "pending": {t: len(u) for t, u in self.ledger.pending.items()},
+                "in_flight": len(self.ledger.in_flight),
+                "oldest_pending_s": oldest,
+            }
+
+    def _announced_at(self, tier: str, unit: str) -> float:
+        stamp = self._enqueued_at.get(unit)
+        if stamp is None:
+            # Units from an earlier process: fall back to the file's mtime
+            path = self._paths(tier, [unit])[0]
+            try:
+                stamp = path.stat().st_mtime
+            except OSError:
+                stamp = time.time()
+            self._enqueued_at[unit] = stamp
+        return stamp
+
+    def _paths(self, tier: str, units: List[str]) -> List[Path]:
+        directory = self.session_dir if tier == "session" else self.core_dir
+        return [directory / f"{unit}.json" for unit in units]
+
+    def _bootstrap_ledger(self):
+        """
+        One-time scan for trees created before the ledger existed: units
+        named as sources of an existing core/sphere count as consumed.
+        """
+        consumed_sessions, consumed_cores = set(), set()
+        for core_path in self.core_dir.glob("core_*.json"):
+            consumed_sessions.update(self._sources(core_path, "source_sessions"))
+        for sphere_path in self.sphere_dir.glob("sphere_*.json"):
+            consumed_cores.update(self._sources(sphere_path, "source_cores"))
+
+        ledger = self.ledger
+        ledger.consumed["session"] = consumed_sessions
+        ledger.consumed["core"] = consumed_cores
+        for p in sorted(self.session_dir.glob("session_*.json")):
+            ledger.add("session", p.stem, self._stamp(p))
+        cores = sorted(self.core_dir.glob("core_*.json"))
+        for p in cores:
+            ledger.add("core", p.stem)
+        # Numbering may have gaps (deleted or retention-bundled units)
+        ledger.next_id["core"] = self._next_number(cores, "core_")
+        ledger.next_id["sphere"] = self._next_number(self.sphere_dir.glob("sphere_*.json"), "sphere_")
+        ledger.compact()
+        logger.info(f"[8-8-8] Distill ledger initialized "
+                    f"({len(ledger.pending['session'])} sessions, {len(ledger.pending['core'])} cores pending)")
+
+    @staticmethod
+    def _next_number(paths, prefix: str) -> int:
+        """One past the highest numeric suffix of ``{prefix}NNN`` files."""
+        numbers = [int(p.stem[len(prefix):]) for p in paths if p.stem[len(prefix):].isdigit()]
+        return max(numbers, default=0) + 1
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[str]:
+        """Content hash of a unit file (None if it cannot be read)."""
+        digest = hashlib.sha1()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _sources(path: Path, key: str) -> List[str]:
+        try:
+            return list(read_record(path).get(key, []))
+        except Exception as e:
+            logger.warning(f"[8-8-8] Could not read {path}: {e}")
+            return []
+
+    def _write_unit(self, path: Path, content: Dict[str, Any]):
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(content, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _distill_sessions_to_core(self, session_paths: List[Path], core_id: str):
         """
         8 Sessions -> 1 Core (Narrative Arc)
         Distillation Pillars: Clean, Summary, Index, Relation.
         """
         logger.info(f"[8-8-8] Distilling {len(session_paths)} sessions into 1 Core Memory...")
-        
-        # Placeholder: Extracting text from sessions
-        combined_text = ""
-        for p in session_paths:
-            try:
-                with open(p, "r", encoding="utf-8") as f:
-                    combined_text += f"\n--- Session {p.stem} ---\n" + f.read()
-            except Exception: pass
 
-        # Distillation (Mock)
-        core_id = f"core_{len(list(self.core_dir.glob('core_*.json'))) + 1:03d}"
+        # Clean / Summary / Index / Relation pillars, streamed from the snapshots
+        pillars = self.pipeline.distill(session_paths)
+
         core_content = {
             "id": core_id,
             "type": "core_narrative",
             "source_sessions": [p.stem for p in session_paths],
             "distillation": {
-                "summary": f"Distilled narrative arc from {len(session_paths)} sessions.",
-                "pillars": ["clean", "summary", "index", "relation"]
+                "summary": pillars["summary"] or f"Distilled narrative arc from {len(session_paths)} sessions.",
+                "pillars": ["clean", "summary", "index", "relation"],
+                "clean": pillars["clean"],
+                "index": pillars["index"],
+                "relation": pillars["relation"],
+                "summarizer": pillars["summarizer"]
             }
         }
-        
-        # Save Core
-        with open(self.core_dir / f"{core_id}.json", "w", encoding="utf-8") as f:
-            json.dump(core_content, f, indent=2)
-            
+
+        # run_job commits the ledger afterwards (a crash in between redoes the same core_id)
+        self._write_unit(self.core_dir / f"{core_id}.json", core_content)
+
         logger.info(f"[8-8-8] Core created: {core_id}")
 
-    def _distill_cores_to_sphere(self, core_paths: List[Path]):
+    def _distill_cores_to_sphere(self, core_paths: List[Path], sphere_id: str):
         """
         8 Cores -> 1 Sphere (Wisdom / Identity DNA)
         """
         logger.info(f"[8-8-8] Distilling {len(core_paths)} cores into 1 Sphere Memory...")
-        
-        sphere_id = f"sphere_{len(list(self.sphere_dir.glob('sphere_*.json'))) + 1:03d}"
+
         sphere_content = {
             "id": sphere_id,
             "type": "wisdom_dna",
@@ -107,8 +541,7 @@ class WisdomDistiller:
                 "epistemic_state": "Confirmed"
             }
         }
-        
-        with open(self.sphere_dir / f"{sphere_id}.json", "w", encoding="utf-8") as f:
-            json.dump(sphere_content, f, indent=2)
-            
+
+        self._write_unit(self.sphere_dir / f"{sphere_id}.json", sphere_content)
+
         logger.info(f"[8-8-8] Sphere created (Wisdom DNA): {sphere_id}")
@@ -0,0 +1,210 @@
+"""
+Ranking - Recency, salience and state-resonance re-ranking of search hits.
+
+semantic_search orders candidates by vector distance (or fused rank)
+only. MemoryRanker re-scores a candidate pool with four signals and keeps
+the best ``limit``:
+
+    relevance  1 - cosine distance, or the normalized RRF score of hybrid hits
+    recency    exponential decay of the record age (created_at / learned_at)
+    salience   importance, else confidence, else the episode's stakes level
+    resonance  similarity of the record's E9 state to the current state
+
+Per-record fields are extracted once; the scoring itself is vectorized over
+the whole pool.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Union
+
+import numpy as np
+
+# E9 dimensions in codec order (ADR-007, capabilities.core.state_tools)
+E9_KEYS = (
+    "resonance_index", "stress_load", "social_warmth", "drive_level", "cognitive_clarity",
+    "joy_level", "stability", "orientation", "momentum_intensity", "reflex_urgency",
+)
+_E9_TAG = re.compile(r"\[E9-((?:M|\d{2}){10})\]")
+_E9_PART = re.compile(r"M|\d{2}")
+
+STAKES_SALIENCE = {"low": 0.3, "medium": 0.6, "high": 0.9}
+
+
+def decode_e9(tag: str) -> Optional[List[float]]:
+    """
+    Decodes an E9 tag ("[E9-4555M62575080601590]") into its 10 values.
+
+    Returns:
+        Values in E9_KEYS order, or None if ``tag`` holds no E9 tag
+    """
+    match = _E9_TAG.search(tag)
+    if not match:
+        return None
+    return [1.0 if part == "M" else int(part) / 100.0 for part in _E9_PART.findall(match.group(1))]
+
+
+def e9_vector(state: Union[str, Dict[str, Any], None]) -> np.ndarray:
+    """
+    E9 state of a snapshot as a length-10 array (NaN where unknown).
+
+    Accepts an E9 tag, a flat state dict, or a nested snapshot such as
+    {"bus:psychological": {...}}: the first E9 tag found wins, otherwise
+    E9 keys are collected from any level.
+    """
+    vector = np.full(len(E9_KEYS), np.nan)
+    if not state:
+        return vector
+    if isinstance(state, str):
+        values = decode_e9(state)
+        return np.asarray(values) if values else vector
+
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        for key, value in node.items():
+            if isinstance(value, dict):
+                stack.append(value)
+            elif isinstance(value, str) and value.startswith("[E9-"):
+                values = decode_e9(value)
+                if values:
+                    return np.asarray(values)
+            elif key in E9_KEYS and isinstance(value, (int, float)) and np.isnan(vector[E9_KEYS.index(key)]):
+                vector[E9_KEYS.index(key)] = min(1.0, max(0.0, float(value)))
+    return vector
+
+
+def _timestamp(record: Dict[str, Any]) -> float:
+    value = record.get("created_at") or record.get("learned_at") or record.get("timestamp")
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def _salience(record: Dict[str, Any]) -> float:
+    for key in ("importance", "confidence"):
+        value = record.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return min(1.0, max(0.0, float(value)))
+    context = record.get("situation_context")
+    if isinstance(context, dict):
+        return STAKES_SALIENCE.get(context.get("stakes_level"), math.nan)
+    return math.nan
+
+
+@dataclass
+class RankingWeights:
+    """
+    Weights of the ranking signals (relative; they need not sum to 1).
+
+    Attributes:
+        relevance: Weight of search relevance
+        recency: Weight of the age decay
+        salience: Weight of importance/confidence
+        resonance: Weight of E9 state similarity (only when a state is given)
+        half_life_days: Age at which recency drops to 0.5
+    """
+    relevance: float = 1.0
+    recency: float = 0.3
+    salience: float = 0.3
+    resonance: float = 0.2
+    half_life_days: float = 30.0
+
+
+class MemoryRanker:
+    """
+    Re-ranks semantic_search candidates.
+
+    Usage:
+        ranker = MemoryRanker(RankingWeights(recency=0.5))
+        best = ranker.rerank(hits, limit=3, state=current_state)
+
+    Unknown signals (no timestamp, no importance, no E9 snapshot) score a
+    neutral 0.5 so that missing fields neither promote nor bury a record.
+    """
+
+    def __init__(self, weights: Optional[RankingWeights] = None):
+        """
+        Initialize ranker.
+
+        Args:
+            weights: Signal weights (default: RankingWeights())
+        """
+        self.weights = weights or RankingWeights()
+
+    def score(
+        self,
+        candidates: List[Dict[str, Any]],
+        state: Union[str, Dict[str, Any], None] = None,
+        now: Optional[datetime] = None
+    ) -> np.ndarray:
+        """
+        Combined score of each candidate (higher is better).
+
+        Args:
+            candidates: Hydrated search hits (with '_search_score' and
+                optionally '_rrf_score')
+            state: Current E9 state (tag, flat dict or bus snapshot)
+            now: Reference time for recency (default: now)
+
+        Returns:
+            Array of scores aligned with ``candidates``
+        """
+        n = len(candidates)
+        if n == 0:
+            return np.zeros(0)
+        w = self.weights
+        now_ts = (now or datetime.now()).timestamp()
+
+        distance = np.array([float(c.get("_search_score", 1.0)) for c in candidates])
+        rrf = np.array([float(c.get("_rrf_score", 0.0)) for c in candidates])
+        timestamps = np.array([_timestamp(c) for c in candidates])
+        salience = np.array([_salience(c) for c in candidates])
+
+        relevance = np.clip(1.0 - distance, 0.0, 1.0)
+        if rrf.max() > 0:
+            relevance = np.maximum(relevance, rrf / rrf.max())
+
+        age_days = np.maximum(0.0, (now_ts - timestamps) / 86400.0)
+        recency = np.exp(-math.log(2.0) * age_days / w.half_life_days)
+
+        total = w.relevance * relevance
+        total += w.recency * np.nan_to_num(recency, nan=0.5)
+        total += w.salience * np.nan_to_num(salience, nan=0.5)
+
+        current = e9_vector(state)
+        if w.resonance and not np.isnan(current).all():
+            snapshots = np.vstack([e9_vector(c.get("state_snapshot")) for c in candidates])
+            diff = np.abs(snapshots - current)
+            known = ~np.isnan(diff)
+            counts = known.sum(axis=1)
+            mean_diff = np.where(known, diff, 0.0).sum(axis=1) / np.maximum(counts, 1)
+            resonance = np.where(counts > 0, 1.0 - mean_diff, 0.5)
+            total += w.resonance * resonance
+        return total
+
+    def rerank(
+        self,
+        candidates: List[Dict[str, Any]],
+        limit: int,
+        state: Union[str, Dict[str, Any], None] = None,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Best ``limit`` candidates by score; each gets a '_rank_score' field.
+        Ties keep the incoming (search) order.
+        """
+        scores = self.score(candidates, state, now)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        results = []
+        for i in order:
+            candidates[i]["_rank_score"] = round(float(scores[i]), 6)
+            results.append(candidates[i])
+        return results
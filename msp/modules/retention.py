@@ -0,0 +1,262 @@
+"""
+Retention - Tiered aging of distilled 8-8-8 units.
+
+Sessions (and optionally cores) that the ledger reports as consumed have
+already been folded into the tier above, so they are cold: they can be
+compressed in place, packed into one archive bundle per parent, or
+deleted. Spheres are the distilled identity and always stay hot.
+"""
+
+import json
+import logging
+import os
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from msp.modules.distiller import DistillLedger
+from msp.storage.codecs import MAGIC, RecordCodec, decode_record, read_record
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("keep", "compress", "bundle", "delete")
+BUNDLE_COMPRESSIONS = {"deflate": zipfile.ZIP_DEFLATED, "lzma": zipfile.ZIP_LZMA}
+
+# Tier -> (directory, parent tier whose "source_*" field lists its units)
+TIERS = {
+    "session": ("session_memory", "core", "source_sessions"),
+    "core": ("core_memory", "sphere", "source_cores"),
+    "sphere": ("sphere_memory", None, None),
+}
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    What happens to a tier's consumed units.
+
+    Attributes:
+        action: 'keep', 'compress' (zstd, in place), 'bundle' (one zip per
+                parent unit) or 'delete'
+        min_age_days: Units modified more recently stay hot
+        compression: Bundle compression, 'deflate' or 'lzma'
+        level: zstd level for 'compress'
+    """
+    action: str = "keep"
+    min_age_days: float = 0.0
+    compression: str = "deflate"
+    level: int = 3
+
+    def validate(self):
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown retention action '{self.action}'. Expected one of: {', '.join(ACTIONS)}")
+        if self.action == "bundle" and self.compression not in BUNDLE_COMPRESSIONS:
+            raise ValueError(f"Unknown bundle compression '{self.compression}'. "
+                             f"Expected one of: {', '.join(BUNDLE_COMPRESSIONS)}")
+
+
+def default_policies() -> Dict[str, RetentionPolicy]:
+    """Distilled sessions are bundled; cores and spheres stay hot."""
+    return {
+        "session": RetentionPolicy("bundle"),
+        "core": RetentionPolicy("keep"),
+        "sphere": RetentionPolicy("keep"),
+    }
+
+
+class RetentionManager:
+    """
+    Applies RetentionPolicy per tier to a memory tree.
+
+    Bundles live in ``{tier_dir}/archive/{parent_id}.zip`` and are listed in
+    ``{base_dir}/.index/retention.json`` ({"bundles": {unit: path}}), so
+    ``load()`` finds a unit wherever it lives. Compressed units keep their
+    file name; ``read_record`` detects the codec.
+    """
+
+    INDEX_NAME = "retention.json"
+
+    def __init__(self, base_dir: str, policies: Optional[Dict[str, RetentionPolicy]] = None):
+        """
+        Initialize manager.
+
+        Args:
+            base_dir: Memory root (holds session_memory, core_memory, ...)
+            policies: Per-tier policies; missing tiers use default_policies()
+        """
+        self.base_dir = Path(base_dir)
+        self.policies = default_policies()
+        self.policies.update(policies or {})
+        for tier, policy in self.policies.items():
+            if tier not in TIERS:
+                raise ValueError(f"Unknown tier '{tier}'. Expected one of: {', '.join(TIERS)}")
+            policy.validate()
+        if self.policies["sphere"].action != "keep":
+            raise ValueError("Sphere memory always stays hot (action must be 'keep')")
+        self._codecs = {
+            tier: RecordCodec("json", compression="zstd", level=p.level)
+            for tier, p in self.policies.items() if p.action == "compress"
+        }
+        self.index_path = self.base_dir / ".index" / self.INDEX_NAME
+        self.bundles: Dict[str, str] = self._load_index()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def load(self, unit: str) -> Optional[Dict[str, Any]]:
+        """Reads a unit (e.g. 'session_SESS_001') from its hot file or bundle."""
+        tier = unit.split("_", 1)[0]
+        if tier not in TIERS:
+            return None
+        path = self.base_dir / TIERS[tier][0] / f"{unit}.json"
+        if path.exists():
+            return read_record(path)
+        bundle = self.bundles.get(unit)
+        if bundle is None:
+            return None
+        with zipfile.ZipFile(self.base_dir / bundle) as zf:
+            return decode_record(zf.read(f"{unit}.json"))
+
+    def footprint(self) -> Dict[str, Dict[str, int]]:
+        """Files, logical bytes and allocated disk bytes per tier (bundles included)."""
+        result = {}
+        for tier, (dirname, _, _) in TIERS.items():
+            stats = {"files": 0, "bytes": 0, "disk_bytes": 0}
+            root = self.base_dir / dirname
+            if root.exists():
+                for path in root.rglob("*"):
+                    if path.is_file():
+                        st = path.stat()
+                        stats["files"] += 1
+                        stats["bytes"] += st.st_size
+                        stats["disk_bytes"] += getattr(st, "st_blocks", 0) * 512 or st.st_size
+            result[tier] = stats
+        return result
+
+    # ------------------------------------------------------------------
+    # Aging
+    # ------------------------------------------------------------------
+
+    def apply(self, now: Optional[float] = None, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Ages every tier's consumed units per its policy.
+
+        Args:
+            now: Reference time for min_age_days (default: time.time())
+            dry_run: Count what would change without touching any file
+
+        Returns:
+            Per tier: {"eligible", "compressed", "bundled", "deleted"}
+        """
+        now = time.time() if now is None else now
+        ledger = DistillLedger(self.base_dir / ".index" / DistillLedger.LEDGER_NAME, read_only=True)
+        report = {}
+        for tier, policy in self.policies.items():
+            counts = {"eligible": 0, "compressed": 0, "bundled": 0, "deleted": 0}
+            report[tier] = counts
+            if policy.action == "keep":
+                continue
+            units = self._eligible(tier, ledger.consumed.get(tier, set()), policy, now)
+            counts["eligible"] = len(units)
+            if dry_run or not units:
+                continue
+            if policy.action == "compress":
+                counts["compressed"] = self._compress(tier, units)
+            elif policy.action == "bundle":
+                counts["bundled"] = self._bundle(tier, units, policy)
+            else:
+                for path in units.values():
+                    path.unlink()
+                counts["deleted"] = len(units)
+            logger.info(f"[8-8-8] Retention ({tier}, {policy.action}): {counts}")
+        return report
+
+    def _eligible(self, tier: str, consumed: set, policy: RetentionPolicy, now: float) -> Dict[str, Path]:
+        directory = self.base_dir / TIERS[tier][0]
+        cutoff = now - policy.min_age_days * 86400
+        units = {}
+        for path in sorted(directory.glob(f"{tier}_*.json")):
+            if path.stem not in consumed:
+                continue
+            if path.stat().st_mtime > cutoff:
+                continue
+            if policy.action == "compress" and self._is_enveloped(path):
+                continue
+            units[path.stem] = path
+        return units
+
+    @staticmethod
+    def _is_enveloped(path: Path) -> bool:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+
+    def _compress(self, tier: str, units: Dict[str, Path]) -> int:
+        codec = self._codecs[tier]
+        for path in units.values():
+            data = codec.encode(read_record(path))
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return len(units)
+
+    def _bundle(self, tier: str, units: Dict[str, Path], policy: RetentionPolicy) -> int:
+        dirname, parent_tier, source_field = TIERS[tier]
+        groups: Dict[str, List[str]] = {}
+        for parent in self._parents(parent_tier):
+            record = self.load(parent) or {}
+            members = [u for u in record.get(source_field, []) if u in units]
+            if members:
+                groups[parent] = members
+
+        archive_dir = self.base_dir / dirname / "archive"
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        # unit -> bundle holding exactly its hot content
+        bundled: Dict[str, str] = {}
+        for parent, members in groups.items():
+            bundle = archive_dir / f"{parent}.zip"
+            relative = str(bundle.relative_to(self.base_dir))
+            with zipfile.ZipFile(bundle, "a", compression=BUNDLE_COMPRESSIONS[policy.compression]) as zf:
+                present = set(zf.namelist())
+                for unit in members:
+                    name = f"{unit}.json"
+                    if name not in present:
+                        zf.write(units[unit], arcname=name)
+                    elif zf.read(name) != units[unit].read_bytes():
+                        # Rewritten since it was archived here; the hot copy is newer
+                        logger.warning(f"[8-8-8] {unit} differs from its copy in {relative}; keeping it hot")
+                        continue
+                    bundled[unit] = relative
+            with open(bundle, "rb+") as f:
+                os.fsync(f.fileno())
+        self.bundles.update(bundled)
+
+        # Index first, then drop the hot copies (a crash in between leaves duplicates, not gaps)
+        self._save_index()
+        for unit in bundled:
+            units[unit].unlink()
+        return len(bundled)
+
+    def _parents(self, parent_tier: str) -> List[str]:
+        directory = self.base_dir / TIERS[parent_tier][0]
+        hot = [p.stem for p in directory.glob(f"{parent_tier}_*.json")]
+        archived = [u for u in self.bundles if u.startswith(f"{parent_tier}_")]
+        return sorted(set(hot) | set(archived))
+
+    def _load_index(self) -> Dict[str, str]:
+        if not self.index_path.exists():
+            return {}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return dict(json.load(f).get("bundles", {}))
+
+    def _save_index(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"bundles": self.bundles}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
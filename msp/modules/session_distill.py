@@ -0,0 +1,308 @@
+"""
+Session Distillation - Streams session snapshots into Core pillar outputs.
+Reads history turns incrementally, so distilling 8 large sessions never
+holds more than one chunk of turns in memory.
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from contracts.ports.i_llm_provider import ILLMProvider, LLMMessage
+from msp.storage.codecs import read_record
+
+logger = logging.getLogger(__name__)
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]}:"
+
+
+# ----------------------------------------------------------------------
+# Incremental snapshot reader
+# ----------------------------------------------------------------------
+
+def stream_session(path: Path, chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Any]]:
+    """
+    Streams a session snapshot as (key, value) events.
+
+    Each element of the top-level "history" array is yielded on its own as
+    ("history", turn); every other top-level key is yielded once as
+    (key, value). Plain-JSON snapshots are parsed incrementally in
+    ``chunk_size`` reads. Snapshots written with a binary codec are
+    decoded whole and then replayed as the same events.
+    """
+    with open(path, "rb") as f:
+        head = f.read(1)
+        while head and head in b" \t\r\n":
+            head = f.read(1)
+        if head != b"{":
+            # Binary codec (or not an object): no incremental parser for it
+            f.seek(0)
+            record = read_record(path)
+            for key, value in record.items():
+                if key == "history":
+                    for turn in value or []:
+                        yield "history", turn
+                else:
+                    yield key, value
+            return
+
+        reader = _ChunkReader(f, chunk_size)
+        while True:
+            reader.skip_ws()
+            if reader.peek() == "}":
+                return
+            if reader.peek() == ",":
+                reader.advance(1)
+                continue
+            key = reader.decode()
+            reader.skip_ws()
+            reader.expect(":")
+            reader.skip_ws()
+            if key == "history" and reader.peek() == "[":
+                reader.advance(1)
+                while True:
+                    reader.skip_ws()
+                    if reader.peek() == "]":
+                        reader.advance(1)
+                        break
+                    if reader.peek() == ",":
+                        reader.advance(1)
+                        continue
+                    yield "history", reader.decode()
+            else:
+                yield key, reader.decode()
+
+
+class _ChunkReader:
+    """Text buffer over a binary file that refills on demand."""
+
+    def __init__(self, f, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._pending = b""
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        data = self._f.read(self._chunk_size)
+        if not data:
+            return False
+        data = self._pending + data
+        # Keep a split multi-byte UTF-8 sequence for the next read
+        try:
+            text = data.decode("utf-8")
+            self._pending = b""
+        except UnicodeDecodeError as e:
+            text = data[:e.start].decode("utf-8")
+            self._pending = data[e.start:]
+        # Drop consumed text so the buffer stays bounded
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while self.pos >= len(self.buffer):
+            if not self._fill():
+                raise ValueError("Unexpected end of session snapshot")
+        return self.buffer[self.pos]
+
+    def advance(self, n: int):
+        self.pos += n
+
+    def skip_ws(self):
+        while self.peek() in _WHITESPACE:
+            self.pos += 1
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in session snapshot")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # A number cut at a chunk boundary ("3." / "12") may continue in the next chunk
+                complete = end < len(self.buffer) and self.buffer[end] in _DELIMITERS
+                if complete or not self._fill():
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+
+# ----------------------------------------------------------------------
+# Summarizers
+# ----------------------------------------------------------------------
+
+class SessionSummarizer(ABC):
+    """
+    Refine-style summarizer: folds chunks of turns into a running summary,
+    so its memory is bounded by one chunk plus the summary itself.
+    """
+
+    @abstractmethod
+    def summarize_chunk(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        """Returns the running summary updated with ``turns``."""
+        pass
+
+    def name(self) -> str:
+        return type(self).__name__
+
+
+class ExtractiveSummarizer(SessionSummarizer):
+    """Default, model-free summarizer: keeps a few opening user excerpts."""
+
+    def __init__(self, max_excerpts: int = 5, excerpt_chars: int = 120):
+        self.max_excerpts = max_excerpts
+        self.excerpt_chars = excerpt_chars
+
+    def summarize_chunk(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        excerpts = [line for line in summary.split("\n") if line]
+        for turn in turns:
+            if len(excerpts) >= self.max_excerpts:
+                break
+            if turn.get("role") == "user" and turn.get("content"):
+                excerpts.append("- " + str(turn["content"])[:self.excerpt_chars])
+        return "\n".join(excerpts)
+
+
+class LLMSummarizer(SessionSummarizer):
+    """Summarizer backed by any ILLMProvider (e.g. MockLLM in tests)."""
+
+    SYSTEM_PROMPT = (
+        "You distill conversation sessions into a narrative arc. "
+        "Update the running summary with the new turns. Keep it under {words} words."
+    )
+
+    def __init__(self, provider: ILLMProvider, max_words: int = 200, max_tokens: int = 400):
+        self.provider = provider
+        self.max_words = max_words
+        self.max_tokens = max_tokens
+
+    def summarize_chunk(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        transcript = "\n".join(f"{t.get('role', '?')}: {t.get('content', '')}" for t in turns)
+        messages = [
+            LLMMessage(role="system", content=self.SYSTEM_PROMPT.format(words=self.max_words)),
+            LLMMessage(role="user", content=f"Running summary:\n{summary or '(empty)'}\n\nNew turns:\n{transcript}"),
+        ]
+        response = self.provider.chat(messages, temperature=0.2, max_tokens=self.max_tokens)
+        return response.content.strip()
+
+    def name(self) -> str:
+        return f"llm:{self.provider.get_model_name()}"
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------------
+
+class StreamingSessionDistiller:
+    """
+    Produces the Clean / Summary / Index / Relation pillars for a group of
+    sessions while streaming their history turns.
+
+    Memory is bounded by ``chunk_turns`` turns, the running summary, and an
+    index term table capped at ``4 * max_index_terms`` entries.
+    """
+
+    def __init__(
+        self,
+        summarizer: Optional[SessionSummarizer] = None,
+        chunk_turns: int = 32,
+        max_index_terms: int = 16,
+        min_term_length: int = 4
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            summarizer: Chunk summarizer (default: ExtractiveSummarizer)
+            chunk_turns: Turns handed to the summarizer at once
+            max_index_terms: Terms kept in the Index pillar
+            min_term_length: Shorter words are not indexed
+        """
+        self.summarizer = summarizer or ExtractiveSummarizer()
+        self.chunk_turns = max(1, chunk_turns)
+        self.max_index_terms = max_index_terms
+        self.min_term_length = min_term_length
+
+    def distill(self, session_paths: List[Path]) -> Dict[str, Any]:
+        """
+        Streams the sessions and returns the pillar outputs:
+            clean    - turn/skip counts
+            summary  - running summary after every chunk
+            index    - most frequent terms
+            relation - per-session turn counts and time span
+        """
+        summary = ""
+        terms: Counter = Counter()
+        relation = []
+        clean = {"sessions": 0, "turns": 0, "skipped_turns": 0, "unreadable_sessions": []}
+        chunk: List[Dict[str, Any]] = []
+
+        for path in session_paths:
+            session = {"session": Path(path).stem, "turns": 0, "first_at": None, "last_at": None}
+            try:
+                for key, value in stream_session(path):
+                    if key != "history":
+                        continue
+                    turn = self._clean(value)
+                    if turn is None:
+                        clean["skipped_turns"] += 1
+                        continue
+                    clean["turns"] += 1
+                    session["turns"] += 1
+                    stamp = turn.get("timestamp")
+                    session["first_at"] = session["first_at"] or stamp
+                    session["last_at"] = stamp or session["last_at"]
+                    self._count_terms(terms, turn["content"])
+                    chunk.append(turn)
+                    if len(chunk) >= self.chunk_turns:
+                        summary = self.summarizer.summarize_chunk(summary, chunk)
+                        chunk = []
+            except (OSError, ValueError) as e:
+                logger.warning(f"[8-8-8] Could not stream {path}: {e}")
+                clean["unreadable_sessions"].append(Path(path).stem)
+                continue
+            clean["sessions"] += 1
+            relation.append(session)
+
+        if chunk:
+            summary = self.summarizer.summarize_chunk(summary, chunk)
+
+        return {
+            "clean": clean,
+            "summary": summary,
+            "index": [term for term, _ in terms.most_common(self.max_index_terms)],
+            "relation": {"sessions": relation},
+            "summarizer": self.summarizer.name(),
+        }
+
+    @staticmethod
+    def _clean(turn: Any) -> Optional[Dict[str, Any]]:
+        """Clean pillar: keeps role/content/timestamp of non-empty turns."""
+        if not isinstance(turn, dict):
+            return None
+        content = str(turn.get("content") or "").strip()
+        if not content:
+            return None
+        return {"role": turn.get("role"), "content": content, "timestamp": turn.get("timestamp")}
+
+    def _count_terms(self, terms: Counter, text: str):
+        for word in text.lower().split():
+            word = word.strip(".,!?;:\"'()[]")
+            if len(word) >= self.min_term_length:
+                terms[word] += 1
+        cap = 4 * self.max_index_terms
+        if len(terms) > 2 * cap:
+            # Keep the table bounded; rare terms are dropped
+            kept = terms.most_common(cap)
+            terms.clear()
+            terms.update(dict(kept))
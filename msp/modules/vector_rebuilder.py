@@ -0,0 +1,219 @@
+"""
+Vector Index Rebuilder - Re-embeds the record store into the vector index.
+Files (or segments) are the source of truth; this recovers records whose
+indexing failed in MSPEngine.store, or builds memory/vector_db on a new box.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndexRebuilder:
+    """
+    Streams every record of a record store through the vector store's
+    collection routing, embedding in parallel batches.
+
+    Progress is checkpointed as a watermark: the key of the last record
+    whose batch (and every batch before it) has been upserted. A resumed
+    run skips everything up to the watermark without reading it, so a crash
+    costs at most ``workers`` in-flight batches of repeated work. Upserts
+    are idempotent, so live traffic writing the same IDs is safe.
+    """
+
+    def __init__(
+        self,
+        record_store,
+        vector_store,
+        checkpoint_path: Optional[str] = None,
+        batch_size: int = 256,
+        workers: int = 4,
+        progress_every: int = 20
+    ):
+        """
+        Initialize rebuilder.
+
+        Args:
+            record_store: Source store exposing iter_keyed_records(after_key)
+            vector_store: Target store exposing store_many(records, upsert=...)
+            checkpoint_path: JSON watermark file (None disables resume)
+            batch_size: Records per embedding batch
+            workers: Concurrent embedding batches
+            progress_every: Log throughput every N completed batches
+        """
+        self.record_store = record_store
+        self.vector_store = vector_store
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.progress_every = progress_every
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Asks a running rebuild to stop after its in-flight batches."""
+        self._stop.set()
+
+    def run(self, resume: bool = True) -> Dict[str, Any]:
+        """
+        Rebuilds the vector index.
+
+        Args:
+            resume: Continue from the checkpoint watermark if one exists
+
+        Returns:
+            Report with record counts, elapsed time and throughput
+        """
+        self._stop.clear()
+        start_key = self._load_checkpoint() if resume else None
+        if start_key:
+            logger.info(f"Resuming vector rebuild after {start_key}")
+
+        started = time.monotonic()
+        report = {"records": 0, "batches": 0, "failed_batches": 0, "resumed_from": start_key}
+
+        # seq -> last key of the batch; completed seqs are folded into the watermark
+        batch_keys: Dict[int, str] = {}
+        completed = set()
+        next_to_commit = 0
+        watermark = start_key
+
+        def advance_watermark():
+            nonlocal next_to_commit, watermark
+            moved = False
+            while next_to_commit in completed:
+                completed.discard(next_to_commit)
+                watermark = batch_keys.pop(next_to_commit)
+                next_to_commit += 1
+                moved = True
+            if moved:
+                self._save_checkpoint(watermark)
+
+        def collect(done_futures):
+            for future in done_futures:
+                seq, count = in_flight.pop(future)
+                try:
+                    future.result()
+                    report["records"] += count
+                    report["batches"] += 1
+                    completed.add(seq)
+                except Exception as e:
+                    # Leave the watermark behind this batch so a resume retries it
+                    logger.error(f"Vector rebuild batch {seq} failed: {e}")
+                    report["failed_batches"] += 1
+                if report["batches"] and report["batches"] % self.progress_every == 0:
+                    self._log_progress(report, started)
+            # A failed seq never enters `completed`, so the watermark stops in front of it
+            advance_watermark()
+
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="msp-reindex") as pool:
+            seq = 0
+            batch: List[Dict[str, Any]] = []
+            last_key = None
+            for key, record in self.record_store.iter_keyed_records(after_key=start_key):
+                if self._stop.is_set():
+                    break
+                batch.append(record)
+                last_key = key
+                if len(batch) < self.batch_size:
+                    continue
+
+                batch_keys[seq] = last_key
+                in_flight[pool.submit(self._index_batch, batch)] = (seq, len(batch))
+                seq += 1
+                batch = []
+                # Bound memory: never hold more than 2x workers batches
+                if len(in_flight) >= self.workers * 2:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    collect(done)
+
+            if batch and not self._stop.is_set():
+                batch_keys[seq] = last_key
+                in_flight[pool.submit(self._index_batch, batch)] = (seq, len(batch))
+
+            done, _ = wait(list(in_flight))
+            collect(done)
+
+        elapsed = time.monotonic() - started
+        report["elapsed_s"] = round(elapsed, 3)
+        report["records_per_s"] = round(report["records"] / elapsed, 1) if elapsed > 0 else 0.0
+        report["complete"] = not self._stop.is_set() and not report["failed_batches"]
+        if report["complete"]:
+            self._clear_checkpoint()
+        logger.info(f"Vector rebuild finished: {report}")
+        return report
+
+    def _index_batch(self, batch: List[Dict[str, Any]]):
+        self.vector_store.store_many(batch, upsert=True, batch_size=self.batch_size)
+
+    def _log_progress(self, report: Dict[str, Any], started: float):
+        elapsed = time.monotonic() - started
+        rate = report["records"] / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Vector rebuild: {report['records']} records in {elapsed:.1f}s ({rate:.1f} rec/s)")
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def _load_checkpoint(self) -> Optional[str]:
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("after_key")
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable rebuild checkpoint: {e}")
+            return None
+
+    def _save_checkpoint(self, after_key: str):
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"after_key": after_key, "updated_at": time.time()}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path:
+            self.checkpoint_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the MSP vector index from the record store.")
+    parser.add_argument("base_dir", help="MSP base_dir (source of truth)")
+    parser.add_argument("--backend", default="file", choices=["file", "segment"])
+    parser.add_argument("--vector-dir", help="Target vector directory (default: {base_dir}/vector_db)")
+    parser.add_argument("--vector-backend", default="chroma", choices=["chroma", "numpy"])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from msp.storage.file_memory_store import FileMemoryStore
+    from msp.storage.segment_log_store import SegmentLogStore
+
+    source = FileMemoryStore(args.base_dir) if args.backend == "file" else SegmentLogStore(args.base_dir)
+    if args.vector_backend == "numpy":
+        from msp.storage.numpy_vector_store import NumpyVectorStore as vector_cls
+    else:
+        from msp.storage.chroma_store import ChromaMemoryStore as vector_cls
+    target = vector_cls(persist_directory=args.vector_dir or str(Path(args.base_dir) / "vector_db"))
+    rebuilder = VectorIndexRebuilder(
+        source, target,
+        checkpoint_path=str(Path(args.base_dir) / ".index" / "vector_rebuild.json"),
+        batch_size=args.batch_size,
+        workers=args.workers
+    )
+    print(json.dumps(rebuilder.run(resume=not args.no_resume), indent=2))
@@ -1,92 +1,931 @@
 """MSP Engine - The unified memory service for EVA."""
 
+import heapq
+import itertools
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator, Sequence
 from pathlib import Path
 
 from contracts.ports.i_memory_storage import IMemoryStorage
 from msp.storage.file_memory_store import FileMemoryStore
-from msp.storage.chroma_store import ChromaMemoryStore
-from msp.storage.chroma_store import ChromaMemoryStore
+from msp.storage.segment_log_store import SegmentLogStore
+from msp.storage.codecs import get_codec
+from msp.storage.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from msp.storage.record_cache import CachedRecordStore
+from msp.storage.link_index import LinkIndex
+from msp.storage.where_filter import matches_where
 from msp.crosslink_manager import CrosslinkManager
+from msp.instrumentation import Instrumentation
+from msp.shard_router import ShardRouter
+from msp.write_behind import WriteBehindQueue
+from msp.modules.distill_scheduler import DistillScheduler
 from msp.modules.distiller import WisdomDistiller
+from msp.modules.ranking import MemoryRanker, RankingWeights
+from msp.modules.retention import RetentionManager
+from msp.modules.vector_rebuilder import VectorIndexRebuilder
+from msp.schema.semantic import SemanticMemory
 
 logger = logging.getLogger(__name__)
 
 class MSPEngine(IMemoryStorage):
     """
     Central orchestrator for all memory operations.
-    Delegates persistence to FileMemoryStore and indexing to ChromaMemoryStore.
+    Delegates persistence to a record store (FileMemoryStore by default,
+    or SegmentLogStore) and indexing to a vector store (ChromaMemoryStore
+    by default, or the in-process NumpyVectorStore).
+    ID reads are served from a byte-bounded LRU of decoded records
+    (CachedRecordStore) that writes go through.
     """
 
-    def __init__(self, base_dir: str = "memory"):
+    RECORD_BACKENDS = {
+        "file": FileMemoryStore,
+        "segment": SegmentLogStore,
+    }
+    VECTOR_BACKENDS = ("chroma", "numpy")
+
+    def __init__(
+        self,
+        base_dir: str = "memory",
+        storage_backend: str = "file",
+        write_behind: bool = False,
+        write_behind_batch_size: int = 64,
+        write_behind_max_delay: float = 0.05,
+        persist_query_cache: bool = False,
+        embedding_function=None,
+        vector_backend: str = "chroma",
+        vector_options: Optional[Dict[str, Any]] = None,
+        lexical_weight: float = 1.0,
+        vector_weight: float = 1.0,
+        rrf_k: int = 60,
+        ranking: Optional[RankingWeights] = None,
+        record_codec: str = "json",
+        record_compression: Optional[str] = None,
+        record_cache_bytes: int = 32 * 1024 * 1024,
+        background_distillation: bool = True,
+        distill_workers: int = 2,
+        summarizer=None,
+        retention_policies=None,
+        instrumentation: Optional[Instrumentation] = None,
+        shard_by: Optional[Sequence[str]] = None,
+        max_open_shards: int = 64
+    ):
+        """
+        Initialize MSP.
+
+        Args:
+            base_dir: Memory root directory
+            storage_backend: Source-of-truth record store, 'file' (ADR-005
+                file-per-record) or 'segment' (append-only segment log)
+            write_behind: Queue store() calls and persist them on a background
+                worker in group commits (see WriteBehindQueue)
+            write_behind_batch_size: Max records per group commit
+            write_behind_max_delay: Max seconds a record waits for its batch
+            persist_query_cache: Keep the query-embedding cache on disk
+                ({base_dir}/vector_db/query_embedding_cache.json) across restarts
+            embedding_function: Embedding function for the vector index
+                (default: Chroma's; HashEmbeddingFunction needs no model)
+            vector_backend: Semantic index, 'chroma' (ChromaMemoryStore) or
+                'numpy' (NumpyVectorStore: memory-mapped matrices, no chromadb
+                client)
+            vector_options: Extra keyword arguments for the vector store,
+                e.g. {"approximate": True, "nprobe": 16} for 'numpy'
+            lexical_weight: Weight of BM25 keyword hits when semantic_search
+                fuses them with vector hits (0 = vector only)
+            vector_weight: Weight of vector hits in the fusion
+            rrf_k: Reciprocal-rank fusion damping constant
+            ranking: Signal weights recall() uses to re-rank search hits
+                (relevance, recency, salience, E9 resonance)
+            record_codec: On-disk encoding for file records and session
+                snapshots ('json', 'json-pretty', 'msgpack', 'cbor'). The
+                'segment' backend frames records as JSON lines and only
+                accepts the default ('json', no compression)
+            record_compression: None or 'zstd'
+            record_cache_bytes: Budget of the LRU cache of decoded records
+                in front of the record store (0 disables it); writes go
+                through it and deletes invalidate it. Each open tenant
+                shard has its own cache of this size (see CachedRecordStore)
+            background_distillation: Run 8-8-8 distillation on a worker
+                pool after snapshot_session (False runs it inline)
+            distill_workers: Max 8-8-8 groups distilled concurrently
+            summarizer: SessionSummarizer for Core distillation (e.g.
+                LLMSummarizer(provider)); default is extractive
+            retention_policies: Per-tier RetentionPolicy for apply_retention()
+                (default: bundle distilled sessions, keep cores and spheres)
+            instrumentation: Metrics registry shared with the record and
+                vector stores, e.g. Instrumentation(enabled=True)
+                (default: disabled; see export_metrics())
+            shard_by: Record fields that select a per-tenant shard, e.g.
+                ("user_id",) or ("user_id", "persona_id"); each tenant gets
+                its own record tree and vector collections under
+                {base_dir}/tenants (default: one shared tree, see ShardRouter).
+                Records stored before sharding stay in the root tree and are
+                missed by tenant-scoped reads until migrate_to_shards() runs
+            max_open_shards: Tenant shards kept open (LRU of handles).
+                Reads without a tenant filter (query, semantic_search)
+                open every tenant shard in turn, so with many more tenants
+                than max_open_shards they cycle the whole LRU; scope
+                hot-path reads to a tenant
+        """
+        if storage_backend not in self.RECORD_BACKENDS:
+            raise ValueError(f"Unknown storage_backend '{storage_backend}'. "
+                             f"Expected one of: {', '.join(self.RECORD_BACKENDS)}")
+        if vector_backend not in self.VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector_backend '{vector_backend}'. "
+                             f"Expected one of: {', '.join(self.VECTOR_BACKENDS)}")
+        if storage_backend == "segment" and (getattr(record_codec, "name", record_codec) != "json" or record_compression):
+            raise ValueError("storage_backend='segment' stores records as JSON lines; "
+                             "record_codec/record_compression are only supported with 'file'")
         self.base_dir = Path(base_dir)
-        self.file_store = FileMemoryStore(base_dir=str(self.base_dir))
-        self.vector_store = ChromaMemoryStore(persist_directory=str(self.base_dir / "vector_db"))
-        self.crosslink_manager = CrosslinkManager(storage=self)
-        self.distiller = WisdomDistiller(self)
+        self.storage_backend = storage_backend
+        self.codec = get_codec(record_codec, record_compression)
+        self.instrumentation = instrumentation or Instrumentation()
+        store_kwargs = {"codec": self.codec, "instrumentation": self.instrumentation} if storage_backend == "file" else {}
+        self.record_store: IMemoryStorage = self.RECORD_BACKENDS[storage_backend](
+            base_dir=str(self.base_dir), **store_kwargs
+        )
+        self.record_cache: Optional[CachedRecordStore] = None
+        if record_cache_bytes > 0:
+            # Crosslink patches and the vector rebuilder use this same handle,
+            # so every write to the tree keeps the cache coherent
+            self.record_cache = CachedRecordStore(
+                self.record_store, max_bytes=record_cache_bytes, instrumentation=self.instrumentation
+            )
+            self.record_store = self.record_cache
+        vector_dir = self.base_dir / "vector_db"
+        # Backends are imported on demand: chromadb alone dominates startup
+        if vector_backend == "numpy":
+            from msp.storage.numpy_vector_store import NumpyVectorStore as vector_cls
+        else:
+            from msp.storage.chroma_store import ChromaMemoryStore as vector_cls
+        self.vector_backend = vector_backend
+        self.vector_store = vector_cls(
+            persist_directory=str(vector_dir),
+            embedding_function=embedding_function,
+            query_cache_path=str(vector_dir / "query_embedding_cache.json") if persist_query_cache else None,
+            instrumentation=self.instrumentation,
+            **(vector_options or {})
+        )
+        self.link_index = LinkIndex(self.base_dir / ".index")
+        # Back-links are patched into the record store directly (no re-embedding)
+        self.crosslink_manager = CrosslinkManager(
+            storage=self, record_store=self.record_store, link_index=self.link_index
+        )
+        # First open of an existing tree (each shard bootstraps its own on open)
+        if not self.link_index.journal_path.exists():
+            self.link_index.rebuild(self.record_store.iter_records())
+        self.lexical_index = LexicalIndex(self.base_dir / ".index")
+        if not self.lexical_index.journal_path.exists():
+            self.lexical_index.rebuild(self.record_store.iter_records())
+        self.lexical_weight = lexical_weight
+        self.vector_weight = vector_weight
+        self.rrf_k = rrf_k
+        self.ranker = MemoryRanker(ranking)
+        self.distiller = WisdomDistiller(self, summarizer=summarizer)
+        self.distill_scheduler: Optional[DistillScheduler] = None
+        if background_distillation:
+            self.distill_scheduler = DistillScheduler(self.distiller, max_workers=distill_workers)
+            # Resume groups a previous process left in flight
+            self.distill_scheduler.kick()
+        self.retention = RetentionManager(str(self.base_dir), retention_policies)
+
+        # Serializes read-merge-write of semantic facts (upsert_fact)
+        self._fact_lock = threading.Lock()
+
+        self.write_behind: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self.write_behind = WriteBehindQueue(
+                commit_fn=self._commit_batch,
+                sync_fn=self.record_store.sync,
+                batch_size=write_behind_batch_size,
+                max_delay=write_behind_max_delay
+            )
+
+        self.shards: Optional[ShardRouter] = None
+        if shard_by:
+            # Shards share this engine's embedding model and metrics; the
+            # 8-8-8 tiers (sessions, cores, spheres) stay in the root tree
+            self._shard_options = {
+                "storage_backend": storage_backend,
+                "write_behind": write_behind,
+                "write_behind_batch_size": write_behind_batch_size,
+                "write_behind_max_delay": write_behind_max_delay,
+                "persist_query_cache": persist_query_cache,
+                "embedding_function": self.vector_store.embedding_function,
+                "vector_backend": vector_backend,
+                "vector_options": vector_options,
+                "lexical_weight": lexical_weight,
+                "vector_weight": vector_weight,
+                "rrf_k": rrf_k,
+                "ranking": ranking,
+                "record_codec": record_codec,
+                "record_compression": record_compression,
+                "record_cache_bytes": record_cache_bytes,
+                "background_distillation": False,
+                "instrumentation": self.instrumentation,
+            }
+            self.shards = ShardRouter(self.base_dir, shard_by, self._open_shard, max_open=max_open_shards)
+
+    def _open_shard(self, path: Path) -> "MSPEngine":
+        return MSPEngine(base_dir=str(path), **self._shard_options)
 
     def store(self, memory_data: Dict[str, Any]) -> str:
         """
         Stores memory in both persistent file and vector index.
+        In write-behind mode the record is only queued; it becomes durable
+        after the next group commit (or flush()/barrier()).
         """
-        # 1. Save to File (Source of Truth)
-        m_id = self.file_store.store(memory_data)
-        
-        # 2. Index in Vector DB (for search)
+        if self.shards is not None:
+            return self._route_store([memory_data])[0]
+        return self._store_local(memory_data)
+
+    def _store_local(self, memory_data: Dict[str, Any]) -> str:
+        with self.instrumentation.span("engine.store"):
+            if self.write_behind:
+                m_id = (memory_data.get("turn_id") or
+                        memory_data.get("sensory_id") or
+                        memory_data.get("episode_id") or
+                        memory_data.get("id"))
+                self.write_behind.submit(m_id, memory_data)
+                return m_id
+
+            return self._commit_batch([memory_data])[0]
+
+    def store_many(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Stores several records at once.
+        Vector indexing is batched per vector collection.
+        """
+        if self.shards is not None:
+            return self._route_store(records)
+        return self._store_many_local(records)
+
+    def _store_many_local(self, records: List[Dict[str, Any]]) -> List[str]:
+        with self.instrumentation.span("engine.store_many"):
+            if self.write_behind:
+                return [self._store_local(record) for record in records]
+            return self._commit_batch(records)
+
+    # ------------------------------------------------------------------
+    # Tenant routing (shard_by)
+    # ------------------------------------------------------------------
+
+    def _route_store(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Splits a batch by tenant; records without one stay in the root tree."""
+        tenants = self.shards.tenants_for(records)
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, tenant in enumerate(tenants):
+            groups.setdefault(tenant, []).append(i)
+
+        ids: List[Optional[str]] = [None] * len(records)
+        for tenant, positions in groups.items():
+            batch = [records[i] for i in positions]
+            if tenant is None:
+                stored = self._store_many_local(batch)
+            else:
+                with self.shards.shard(tenant) as shard:
+                    stored = shard.store_many(batch)
+                self.shards.assign({m_id: tenant for m_id in stored if m_id})
+            for i, m_id in zip(positions, stored):
+                ids[i] = m_id
+        return ids
+
+    def migrate_to_shards(self, batch_size: int = 256) -> int:
+        """
+        Moves root-tree records that belong to a tenant into its shard.
+
+        Run once after turning shard_by on for an existing tree: records
+        stored before sharding stay in the root tree, where tenant-scoped
+        reads (query/semantic_search filtered on the tenant keys) do not
+        look. Records with their own tenant keys move first, so turns,
+        sensory records and facts can then inherit their episode's tenant.
+        Each batch is made durable in its shard before the root copies are
+        deleted, so an interrupted run can simply be repeated.
+
+        Args:
+            batch_size: Records re-stored per batch
+
+        Returns:
+            Number of records moved
+        """
+        if self.shards is None:
+            raise ValueError("migrate_to_shards() needs shard_by")
+        self.flush()
+        keys = self.shards.keys
+        moved = 0
+        for own_keys in (True, False):
+            ids = [r.get("turn_id") or r.get("sensory_id") or r.get("episode_id") or r.get("id")
+                   for r in self.record_store.iter_records()
+                   if any(r.get(k) not in (None, "") for k in keys) == own_keys]
+            for start in range(0, len(ids), batch_size):
+                batch = [r for r in self.record_store.retrieve_many(ids[start:start + batch_size]) if r]
+                moved += self._move_to_shards(batch)
+        if moved:
+            logger.info(f"Moved {moved} root records into their tenant shards")
+        return moved
+
+    def _move_to_shards(self, records: List[Dict[str, Any]]) -> int:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for record, tenant in zip(records, self.shards.tenants_for(records)):
+            if tenant is not None:
+                groups.setdefault(tenant, []).append(record)
+        moved = 0
+        for tenant, batch in groups.items():
+            with self.shards.shard(tenant) as shard:
+                stored = [m_id for m_id in shard.store_many(batch) if m_id]
+                if not shard.barrier():
+                    logger.error(f"Could not commit {len(batch)} records to shard {tenant}; kept in the root tree")
+                    continue
+            self.shards.assign({m_id: tenant for m_id in stored})
+            for m_id in stored:
+                self._delete_local(m_id)
+            moved += len(stored)
+        return moved
+
+    def _group_by_owner(self, memory_ids: List[str]) -> Dict[Optional[str], List[int]]:
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, m_id in enumerate(memory_ids):
+            groups.setdefault(self.shards.owner(m_id), []).append(i)
+        return groups
+
+    def _search_tenants(self, filters: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """
+        Shards a read must visit: the one pinned by ``filters``, or None
+        for all of them plus the root tree.
+        """
+        tenant = self.shards.tenant_from_filters(filters)
+        if tenant is None:
+            return None
+        # A tenant that never stored anything has no shard to open
+        return [tenant] if self.shards.path_for(tenant).exists() else []
+
+    def upsert_fact(self, fact: Dict[str, Any], reinforcement: float = 0.1) -> str:
+        """
+        Stores a semantic fact keyed by its (subject, predicate, object) triple.
+
+        A repeated triple updates the existing record instead of adding a
+        duplicate: episode_refs are merged, confidence is reinforced
+        (c + (1 - c) * reinforcement, never below the new observation) and
+        learned_at moves to the latest observation. The Chroma entry is
+        upserted under the same ID, so the index grows with distinct facts.
+
+        Args:
+            fact: SemanticMemory.to_dict()-style record (its 'id' is replaced)
+            reinforcement: Fraction of the remaining doubt removed per repeat
+
+        Returns:
+            The content-addressed fact ID
+        """
+        fact_id = SemanticMemory.content_id(fact["subject"], fact["predicate"], fact["object"])
+        with self._fact_lock:
+            merged = {**fact, "id": fact_id, "type": "semantic"}
+            existing = self.retrieve(fact_id)
+            if existing:
+                refs = list(existing.get("episode_refs") or [])
+                refs += [r for r in fact.get("episode_refs") or [] if r not in refs]
+                old_conf = float(existing.get("confidence", 0.8))
+                merged = {
+                    **existing,
+                    "episode_refs": refs,
+                    "confidence": round(max(old_conf + (1.0 - old_conf) * reinforcement,
+                                            float(fact.get("confidence", 0.0))), 4),
+                    "learned_at": fact.get("learned_at") or datetime.now().isoformat(),
+                }
+            self.store(merged)
+        return fact_id
+
+    def _commit_batch(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Persists, indexes and crosslinks a batch of records."""
+        metrics = self.instrumentation
+        # 1. Save to Record Store (Source of Truth)
+        with metrics.span("engine.commit.records"):
+            ids = self.record_store.store_many(records)
+
+        # 2. Index in Vector DB (for search), one upsert per collection
         try:
-            self.vector_store.store(memory_data)
+            with metrics.span("engine.commit.vectors"):
+                self.vector_store.store_many(records, upsert=True)
         except Exception as e:
-            logger.error(f"Failed to index memory {m_id} in Chroma: {e}")
-            
-        # 3. Synchronize Crosslinks (Bidirectional)
+            logger.error(f"Failed to index {len(records)} memories in the vector store: {e}")
+
+        # 3. Keyword postings (BM25)
         try:
-            self.crosslink_manager.sync_links(memory_data)
+            with metrics.span("engine.commit.lexical"):
+                self.lexical_index.index_records(records)
         except Exception as e:
-            logger.error(f"Failed to sync crosslinks for {m_id}: {e}")
-            
-        return m_id
+            logger.error(f"Failed to update the lexical index for {len(records)} memories: {e}")
+
+        # 4. Synchronize Crosslinks (Bidirectional), coalesced per episode
+        try:
+            with metrics.span("engine.commit.crosslinks"):
+                self.crosslink_manager.sync_batch(records)
+        except Exception as e:
+            logger.error(f"Failed to sync crosslinks for {len(records)} memories: {e}")
+
+        return ids
+
+    def rebuild_links(self) -> int:
+        """
+        Rebuilds the link adjacency index from the record store (the root
+        tree and, with shard_by, every tenant shard).
+
+        Returns:
+            Number of indexed edges
+        """
+        self.link_index.rebuild(self.record_store.iter_records())
+        return len(self.link_index) + sum(self._each_shard(lambda shard: shard.rebuild_links()))
+
+    def rebuild_lexical(self) -> int:
+        """
+        Rebuilds the BM25 keyword index from the record store (the root
+        tree and, with shard_by, every tenant shard).
+
+        Returns:
+            Number of indexed records
+        """
+        self.lexical_index.rebuild(self.record_store.iter_records())
+        return len(self.lexical_index) + sum(self._each_shard(lambda shard: shard.rebuild_lexical()))
+
+    def _each_shard(self, fn) -> List[Any]:
+        """Applies ``fn`` to every tenant shard (opened in turn); [] without shard_by."""
+        if self.shards is None:
+            return []
+        results = []
+        for tenant in self.shards.tenants():
+            with self.shards.shard(tenant) as shard:
+                results.append(fn(shard))
+        return results
+
+    def related(
+        self,
+        memory_ids: List[str],
+        hops: int = 2,
+        fan_out: int = 8,
+        limit: int = 32,
+        relations: Optional[List[str]] = None,
+        hydrate: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Multi-hop link expansion from seed records (e.g. episode -> facts ->
+        other episodes), answered from the LinkIndex.
+
+        Args:
+            memory_ids: Seed record IDs (not included in the result)
+            hops: Maximum link distance
+            fan_out: Max neighbors followed per record
+            limit: Max related records returned
+            relations: Restrict to these reference fields
+            hydrate: Load full records (one batch read); otherwise return
+                     {"id", "hop"} stubs only
+        """
+        if self.shards is not None:
+            groups = self._group_by_owner(memory_ids)
+            if list(groups) != [None]:
+                results = []
+                for tenant, positions in groups.items():
+                    seeds = [memory_ids[i] for i in positions]
+                    if tenant is None:
+                        results += self._related_local(seeds, hops, fan_out, limit, relations, hydrate)
+                    else:
+                        with self.shards.shard(tenant) as shard:
+                            results += shard.related(seeds, hops, fan_out, limit, relations, hydrate)
+                return results[:limit]
+        return self._related_local(memory_ids, hops, fan_out, limit, relations, hydrate)
+
+    def _related_local(self, memory_ids, hops, fan_out, limit, relations, hydrate) -> List[Dict[str, Any]]:
+        seeds = set(memory_ids)
+        expanded = self.link_index.expand(
+            memory_ids, hops=hops, fan_out=fan_out,
+            max_nodes=len(seeds) + limit, relations=relations
+        )
+        found = [(m_id, hop) for m_id, hop in expanded if m_id not in seeds][:limit]
+        if not hydrate:
+            return [{"id": m_id, "hop": hop} for m_id, hop in found]
+
+        results = []
+        for (m_id, hop), record in zip(found, self.retrieve_many([m_id for m_id, _ in found])):
+            if record is not None:
+                results.append({**record, "link_hop": hop})
+        return results
+
+    def reindex(self, batch_size: int = 256, workers: int = 4, resume: bool = True) -> Dict[str, Any]:
+        """
+        Rebuilds the vector index from the record store (source of truth).
+        Resumable: progress is checkpointed under {base_dir}/.index (per
+        shard with shard_by; the report sums the root tree and all shards).
+
+        Returns:
+            Rebuild report (records, batches, elapsed_s, records_per_s, ...)
+        """
+        rebuilder = VectorIndexRebuilder(
+            self.record_store,
+            self.vector_store,
+            checkpoint_path=str(self.base_dir / ".index" / "vector_rebuild.json"),
+            batch_size=batch_size,
+            workers=workers
+        )
+        report = rebuilder.run(resume=resume)
+        shard_reports = self._each_shard(lambda shard: shard.reindex(batch_size, workers, resume))
+        for shard_report in shard_reports:
+            for key in ("records", "batches", "failed_batches", "elapsed_s"):
+                report[key] += shard_report[key]
+            report["complete"] = report["complete"] and shard_report["complete"]
+        if shard_reports:
+            report["elapsed_s"] = round(report["elapsed_s"], 3)
+            report["records_per_s"] = (round(report["records"] / report["elapsed_s"], 1)
+                                       if report["elapsed_s"] > 0 else 0.0)
+            report["shards"] = len(shard_reports)
+        return report
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all queued stores are committed (no-op without write-behind)."""
+        ok = all(shard.flush(timeout) for shard in self.shards.open_handles()) if self.shards else True
+        if not self.write_behind:
+            return ok
+        return self.write_behind.flush(timeout) and ok
+
+    def barrier(self, timeout: Optional[float] = None) -> bool:
+        """Durability barrier: commits queued stores and fsyncs the record store."""
+        if self.shards is not None:
+            for shard in self.shards.open_handles():
+                shard.barrier(timeout)
+        if not self.write_behind:
+            self.record_store.sync()
+            return True
+        return self.write_behind.barrier(timeout)
+
+    def wait_for_distillation(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until scheduled 8-8-8 distillation has finished. False on timeout."""
+        if self.distill_scheduler is None:
+            return True
+        return self.distill_scheduler.wait_idle(timeout)
+
+    def apply_retention(self, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """Ages distilled sessions/cores per the retention policies (see RetentionManager)."""
+        return self.retention.apply(dry_run=dry_run)
+
+    def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Reads a session snapshot, whether hot, compressed or bundled."""
+        return self.retention.load(f"session_{session_id}")
+
+    def export_metrics(self, fmt: str = "dict"):
+        """
+        Memory access metrics (latency histograms, bytes, files touched).
+
+        Args:
+            fmt: 'dict' (Instrumentation.snapshot()) or 'prometheus' (text dump)
+        """
+        if fmt == "prometheus":
+            return self.instrumentation.to_prometheus()
+        if fmt != "dict":
+            raise ValueError(f"Unknown metrics format '{fmt}'. Expected 'dict' or 'prometheus'")
+        return self.instrumentation.snapshot()
+
+    def cache_metrics(self) -> Dict[str, Any]:
+        """
+        Record cache counters (see CachedRecordStore.stats), summed over
+        this engine and its open tenant shards.
+
+        Returns:
+            {"entries", "bytes", "max_bytes", "hits", "misses", "hit_rate",
+             "evictions", "invalidations"} (all zero if the cache is disabled)
+        """
+        engines = [self] + (self.shards.open_handles() if self.shards is not None else [])
+        totals = {"entries": 0, "bytes": 0, "max_bytes": 0, "hits": 0, "misses": 0,
+                  "evictions": 0, "invalidations": 0}
+        for engine in engines:
+            if engine.record_cache is not None:
+                for key, value in engine.record_cache.stats().items():
+                    if key in totals:
+                        totals[key] += value
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+        return totals
+
+    def distillation_metrics(self) -> Dict[str, Any]:
+        """8-8-8 queue depth, lag and job counters (see DistillScheduler.metrics)."""
+        if self.distill_scheduler is None:
+            return self.distiller.backlog()
+        return self.distill_scheduler.metrics()
+
+    def close(self):
+        """
+        Drains the write-behind queue (if any) durably, finishes distillation
+        and saves the persisted query-embedding cache.
+        """
+        if self.shards is not None:
+            self.shards.close()
+        if self.write_behind:
+            self.write_behind.close()
+        if self.distill_scheduler is not None:
+            self.distill_scheduler.close()
+        self.vector_store.close()
 
     def retrieve(self, memory_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieves hydrated memory from File Store."""
-        return self.file_store.retrieve(memory_id)
+        """Retrieves hydrated memory from the record cache or the Record Store."""
+        tenant = self.shards.owner(memory_id) if self.shards is not None else None
+        if tenant is not None:
+            with self.shards.shard(tenant) as shard:
+                return shard.retrieve(memory_id)
+        with self.instrumentation.span("engine.retrieve"):
+            if self.write_behind:
+                pending = self.write_behind.get_pending(memory_id)
+                if pending is not None:
+                    return pending
+            return self.record_store.retrieve(memory_id)
 
-    def query(self, filters: Dict[str, Any], limit: int = 10) -> List[Dict[str, Any]]:
-        """Queries memories via File Store metadata listing."""
-        return self.file_store.query(filters, limit)
+    def has_pending(self, memory_id: str) -> bool:
+        """True if a store() of this ID is still queued (write-behind mode)."""
+        if self.shards is not None and self.shards.owner(memory_id) is not None:
+            # Only open shards can hold queued stores (closing one drains it)
+            return any(shard.has_pending(memory_id) for shard in self.shards.open_handles())
+        return bool(self.write_behind and self.write_behind.has_pending(memory_id))
+
+    def retrieve_many(self, memory_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Retrieves several hydrated memories in one batch, preserving order."""
+        if self.shards is not None:
+            groups = self._group_by_owner(memory_ids)
+            if list(groups) != [None]:
+                results: List[Optional[Dict[str, Any]]] = [None] * len(memory_ids)
+                for tenant, positions in groups.items():
+                    batch = [memory_ids[i] for i in positions]
+                    if tenant is None:
+                        found = self._retrieve_many_local(batch)
+                    else:
+                        with self.shards.shard(tenant) as shard:
+                            found = shard.retrieve_many(batch)
+                    for i, record in zip(positions, found):
+                        results[i] = record
+                return results
+        return self._retrieve_many_local(memory_ids)
+
+    def _retrieve_many_local(self, memory_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        with self.instrumentation.span("engine.retrieve_many"):
+            results = self.record_store.retrieve_many(memory_ids)
+        if self.write_behind:
+            for i, m_id in enumerate(memory_ids):
+                pending = self.write_behind.get_pending(m_id)
+                if pending is not None:
+                    results[i] = pending
+        return results
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 10,
+        offset: int = 0,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Queries memories via Record Store metadata listing (date-ordered, paginated).
+        With shard_by, a filter on the tenant keys reads one shard; other
+        filters merge the root tree and every shard (each opened in turn)
+        by created_at.
+        """
+        if self.shards is not None:
+            tenants = self._search_tenants(filters)
+            if tenants is not None and not tenants:
+                return []
+            if tenants is not None:
+                with self.shards.shard(tenants[0]) as shard:
+                    return shard.query(filters, limit=limit, offset=offset, newest_first=newest_first)
+            window = limit + offset
+            merged = self._query_local(filters, window, 0, newest_first)
+            for tenant in self.shards.tenants():
+                with self.shards.shard(tenant) as shard:
+                    merged += shard.query(filters, limit=window, offset=0, newest_first=newest_first)
+            merged.sort(key=lambda r: str(r.get("created_at") or r.get("learned_at") or ""),
+                        reverse=newest_first)
+            return merged[offset:offset + limit]
+        return self._query_local(filters, limit, offset, newest_first)
+
+    def _query_local(self, filters, limit: int, offset: int, newest_first: bool) -> List[Dict[str, Any]]:
+        with self.instrumentation.span("engine.query"):
+            return self.record_store.query(filters, limit=limit, offset=offset, newest_first=newest_first)
+
+    def scan_episodes(
+        self,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        newest_first: bool = True,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams episodes in a time range, newest first by default (e.g. "last N episodes").
+
+        With shard_by, the root tree and every tenant shard are merged by
+        created_at. Shards are opened in turn and each one's episodes in
+        the range (at most ``limit``) are read up front.
+        """
+        # Queued stores must be on disk before a directory scan can see them
+        self.flush()
+        episodes = self.record_store.scan_episodes(
+            since=since, until=until, newest_first=newest_first, limit=limit
+        )
+        if self.shards is None:
+            return episodes
+        streams = [episodes] + self._each_shard(
+            lambda shard: list(shard.scan_episodes(since, until, newest_first, limit))
+        )
+        merged = heapq.merge(*streams, key=lambda r: str(r.get("created_at") or ""), reverse=newest_first)
+        return itertools.islice(merged, limit)
 
     def semantic_search(
         self, 
         query_text: str, 
         limit: int = 10, 
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        mode: str = "hybrid"
     ) -> List[Dict[str, Any]]:
         """
         Search by meaning and hydrate results with full data from files.
+
+        In 'hybrid' mode vector hits are fused with BM25 keyword hits by
+        reciprocal-rank fusion (weights: vector_weight, lexical_weight), so
+        exact names and IDs are found even when the embedding misses them.
+
+        With shard_by, a filter on the tenant keys searches one shard.
+        Otherwise the raw vector and keyword candidates of the root tree
+        and every tenant shard (opened one after another) are fused once,
+        globally; BM25 scores keep their per-shard statistics.
+
+        Args:
+            query_text: Natural language or keyword query
+            limit: Maximum results
+            filters: Chroma-style metadata filter
+            mode: 'hybrid', 'vector' (embedding only) or 'lexical'
+                (keywords only, no embedding call)
+
+        Returns:
+            Hydrated records with '_search_score' (vector distance, 1.0 for
+            keyword-only hits); fused results also carry '_rrf_score'
+        """
+        if mode not in ("hybrid", "vector", "lexical"):
+            raise ValueError(f"Unknown search mode '{mode}'. Expected one of: hybrid, vector, lexical")
+        if self.shards is not None:
+            tenants = self._search_tenants(filters)
+            if tenants is not None:
+                # Cost proportional to one tenant's memory
+                for tenant in tenants:
+                    with self.shards.shard(tenant) as shard:
+                        return shard.semantic_search(query_text, limit, filters, mode=mode)
+                return []
+            with self.instrumentation.span("engine.semantic_search"):
+                # Per-shard RRF scores are rank-relative; fuse the raw candidate
+                # lists once over all shards instead of merging fused results
+                matches, keyword_hits = self._search_candidates(query_text, limit, filters, mode)
+                for tenant in self.shards.tenants():
+                    with self.shards.shard(tenant) as shard:
+                        shard_matches, shard_hits = shard._search_candidates(query_text, limit, filters, mode)
+                    matches += shard_matches
+                    keyword_hits += shard_hits
+                matches = heapq.nsmallest(limit, matches, key=lambda m: m.get("_distance", 1.0))
+                keyword_hits = heapq.nlargest(limit * 4 if filters else limit, keyword_hits,
+                                              key=lambda hit: hit[1])
+                return self._fuse(matches, keyword_hits, limit, filters, mode)
+        with self.instrumentation.span("engine.semantic_search"):
+            return self._semantic_search(query_text, limit, filters, mode)
+
+    def keyword_search(
+        self,
+        query_text: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """BM25 keyword lookup (e.g. "my name is" facts) without embedding the query."""
+        return self.semantic_search(query_text, limit, filters, mode="lexical")
+
+    def recall(
+        self,
+        query_text: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        state: Any = None,
+        candidates: Optional[int] = None,
+        mode: str = "hybrid"
+    ) -> List[Dict[str, Any]]:
+        """
+        Searches a wider candidate pool and keeps the ``limit`` best by
+        relevance, recency, salience and resonance with ``state``
+        (see MemoryRanker).
+
+        Args:
+            query_text: Natural language or keyword query
+            limit: Results to return
+            filters: Chroma-style metadata filter
+            state: Current E9 state (tag, flat dict or bus snapshot), optional
+            candidates: Search hits to re-rank (default: 4 * limit)
+            mode: semantic_search mode
+
+        Returns:
+            Hydrated records with '_rank_score', best first
+        """
+        pool = self.semantic_search(query_text, candidates or 4 * limit, filters, mode=mode)
+        with self.instrumentation.span("engine.search.rerank"):
+            return self.ranker.rerank(pool, limit, state=state)
+
+    def _semantic_search(
+        self,
+        query_text: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        mode: str = "hybrid"
+    ) -> List[Dict[str, Any]]:
+        matches, keyword_hits = self._search_candidates(query_text, limit, filters, mode)
+        return self._fuse(matches, keyword_hits, limit, filters, mode)
+
+    def _search_candidates(
+        self,
+        query_text: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]],
+        mode: str
+    ):
+        """
+        Unhydrated vector matches (with '_distance') and BM25 (id, score)
+        keyword hits of this engine's own indexes.
         """
+        metrics = self.instrumentation
         # 1. Get matches from Vector DB
-        matches = self.vector_store.semantic_search(query_text, limit, filters)
-        
-        # 2. Hydrate matches with full data
+        matches = []
+        if mode != "lexical":
+            with metrics.span("engine.search.vector"):
+                matches = self.vector_store.semantic_search(query_text, limit, filters)
+            matches = [m for m in matches if m.get("_id")]
+
+        # 2. Keyword matches; filters are checked after hydration, so over-fetch
+        keyword_hits = []
+        if mode == "lexical" or (mode == "hybrid" and self.lexical_weight > 0):
+            with metrics.span("engine.search.lexical"):
+                keyword_hits = self.lexical_index.search(query_text, limit * 4 if filters else limit)
+        return matches, keyword_hits
+
+    def _fuse(self, matches, keyword_hits, limit: int, filters, mode: str) -> List[Dict[str, Any]]:
+        """Hydrates vector matches, fused with keyword hits by RRF when there are any."""
+        metrics = self.instrumentation
+        if not keyword_hits:
+            return self._hydrate_matches(matches)
+
+        by_id = {m["_id"]: m for m in matches}
+        lexical_weight = self.lexical_weight if mode == "hybrid" else 1.0
+        fused = reciprocal_rank_fusion(
+            [(list(by_id), self.vector_weight), ([m_id for m_id, _ in keyword_hits], lexical_weight)],
+            k=self.rrf_k
+        )
+        with metrics.span("engine.search.hydrate"):
+            records = self.retrieve_many([m_id for m_id, _ in fused])
+
+        results = []
+        for (m_id, score), full_data in zip(fused, records):
+            match = by_id.get(m_id)
+            if match is None and (full_data is None or (filters and not matches_where(full_data, filters))):
+                continue
+            item = full_data or match
+            item["_search_score"] = match.get("_distance", 1.0) if match else 1.0
+            item["_rrf_score"] = round(score, 6)
+            results.append(item)
+            if len(results) >= limit:
+                break
+        return results
+
+    def _hydrate_matches(self, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Hydrate matches with full data (single batched read)
+        with self.instrumentation.span("engine.search.hydrate"):
+            records = self.retrieve_many([m["_id"] for m in matches])
+
         hydrated_results = []
-        for match in matches:
-            m_id = match.get("_id")
-            if m_id:
-                full_data = self.retrieve(m_id)
-                if full_data:
-                    # Merge search score into metadata
-                    full_data["_search_score"] = match.get("_distance", 1.0)
-                    hydrated_results.append(full_data)
-                else:
-                    # Fallback to metadata if file is missing (unexpected)
-                    hydrated_results.append(match)
-                    
+        for match, full_data in zip(matches, records):
+            if full_data:
+                # Merge search score into metadata
+                full_data["_search_score"] = match.get("_distance", 1.0)
+                hydrated_results.append(full_data)
+            else:
+                # Fallback to metadata if file is missing (unexpected)
+                hydrated_results.append(match)
+
         return hydrated_results
 
     def delete(self, memory_id: str) -> bool:
         """Deletes from both stores."""
-        success_file = self.file_store.delete(memory_id)
-        success_vector = self.vector_store.delete(memory_id)
+        tenant = self.shards.owner(memory_id) if self.shards is not None else None
+        if tenant is not None:
+            with self.shards.shard(tenant) as shard:
+                deleted = shard.delete(memory_id)
+            self.shards.forget(memory_id)
+            return deleted
+        return self._delete_local(memory_id)
+
+    def _delete_local(self, memory_id: str) -> bool:
+        with self.instrumentation.span("engine.delete"):
+            if self.write_behind and self.write_behind.has_pending(memory_id):
+                # A queued store would otherwise resurrect the record after deletion
+                if not self.write_behind.flush():
+                    self.write_behind.discard(memory_id)
+            self.crosslink_manager.remove(memory_id)
+            self.lexical_index.remove(memory_id)
+            success_file = self.record_store.delete(memory_id)
+            success_vector = self.vector_store.delete(memory_id)
         return success_file or success_vector
 
     def snapshot_session(self, session_id: str, context: Dict[str, Any]):
@@ -99,13 +938,16 @@ class MSPEngine(IMemoryStorage):
         
         file_path = session_dir / f"session_{session_id}.json"
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                import json
-                json.dump(context, f, indent=2)
+            with open(file_path, "wb") as f:
+                f.write(self.codec.encode(context))
             logger.info(f"Session {session_id} snapshotted to {file_path}")
-            
-            # Trigger 8-8-8 check
-            self.distiller.check_and_distill()
+
+            # Trigger 8-8-8 check off the request path
+            self.distiller.record_session(file_path)
+            if self.distill_scheduler is not None:
+                self.distill_scheduler.kick()
+            else:
+                self.distiller.check_and_distill()
             
         except Exception as e:
             logger.error(f"Failed to snapshot session {session_id}: {e}")
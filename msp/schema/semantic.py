@@ -75,6 +75,17 @@ class SemanticMemory:
             access_count=data.get("access_count", 0)
         )
 
+    @staticmethod
+    def content_id(subject: str, predicate: str, object: str) -> str:
+        """
+        Deterministic ID for a (subject, predicate, object) triple.
+        Case and whitespace are normalized, so "I like Jazz" and
+        "i like  jazz" address the same fact.
+        """
+        import hashlib
+        normalized = "\x1f".join(" ".join(part.split()).casefold() for part in (subject, predicate, object))
+        return f"sem_{hashlib.sha1(normalized.encode()).hexdigest()[:16]}"
+
     def as_triple(self) -> str:
         """Return as subject-predicate-object string."""
         return f"{self.subject} {self.predicate} {self.object}"
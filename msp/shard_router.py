@@ -0,0 +1,305 @@
+"""Shard Router - Per-tenant MSP shards with an LRU of open handles."""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Any, Optional, Sequence
+from urllib.parse import quote, unquote
+
+logger = logging.getLogger(__name__)
+
+# Placeholder for a tenant key the record does not set (e.g. no persona_id)
+MISSING_KEY = "%00"
+
+
+def _encode(value: Any) -> str:
+    """Filesystem-safe, reversible path component for a key value."""
+    if value in (None, ""):
+        return MISSING_KEY
+    part = quote(str(value), safe="")
+    # "." and ".." would escape the tenants directory
+    return part.replace(".", "%2E") if not part.strip(".") else part
+
+
+def _record_id(data: Dict[str, Any]) -> Optional[str]:
+    return (data.get("turn_id") or
+            data.get("sensory_id") or
+            data.get("episode_id") or
+            data.get("id"))
+
+
+class ShardRouter:
+    """
+    Routes memory records to per-tenant shards keyed by ``user_id`` /
+    ``persona_id`` (or any record fields) and keeps the shards it has
+    opened in an LRU of bounded size.
+
+    Layout:
+        {base_dir}/tenants/{key1}/{key2}/...   one full MSP tree per tenant
+        {base_dir}/.index/tenant_map.jsonl     memory ID -> tenant journal
+
+    A record's tenant comes from its own key fields. Turns, sensory records
+    and facts without them inherit the tenant of their episode
+    (``episode_id`` / ``episode_refs``), so crosslinks stay inside one
+    shard. Records with no tenant stay in the root tree.
+
+    Shards are opened lazily through ``factory(path)`` and closed (write-
+    behind drained) when evicted. Handles in use via ``shard()`` are pinned
+    and never evicted, so the LRU may exceed ``max_open`` while they are held.
+    """
+
+    TENANTS_DIR = "tenants"
+    JOURNAL_NAME = "tenant_map.jsonl"
+
+    def __init__(
+        self,
+        base_dir: Path,
+        keys: Sequence[str],
+        factory: Callable[[Path], Any],
+        max_open: int = 64
+    ):
+        """
+        Initialize router.
+
+        Args:
+            base_dir: Root memory directory
+            keys: Record fields that identify a tenant, e.g. ("user_id",)
+            factory: Opens the engine of a shard directory
+            max_open: Open shard handles kept in the LRU
+        """
+        if not keys:
+            raise ValueError("ShardRouter needs at least one tenant key")
+        self.base_dir = Path(base_dir)
+        self.root = self.base_dir / self.TENANTS_DIR
+        self.keys = tuple(keys)
+        self.factory = factory
+        self.max_open = max(1, max_open)
+        self.journal_path = self.base_dir / ".index" / self.JOURNAL_NAME
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._open: "OrderedDict[str, Any]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._owners: Dict[str, str] = {}
+        self.opened = 0
+        self.evicted = 0
+        self.hits = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def tenant_for(self, record: Dict[str, Any], pending: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Tenant of a record (own keys, else its episode's), or None for the root.
+
+        Args:
+            record: Memory record
+            pending: Placements not yet assigned (e.g. earlier in the same batch)
+        """
+        values = [record.get(key) for key in self.keys]
+        if any(v not in (None, "") for v in values):
+            return "/".join(_encode(v) for v in values)
+        parents = [record.get("episode_id")] + list(record.get("episode_refs") or [])
+        with self._lock:
+            for parent in parents:
+                if not parent:
+                    continue
+                tenant = (pending or {}).get(parent) or self._owners.get(parent)
+                if tenant:
+                    return tenant
+        return None
+
+    def tenants_for(self, records: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Tenants of a batch; children may inherit from episodes in the same batch."""
+        own = [self.tenant_for(r) if any(r.get(k) not in (None, "") for k in self.keys) else None
+               for r in records]
+        pending = {_record_id(r): t for r, t in zip(records, own) if t and _record_id(r)}
+        return [t or self.tenant_for(r, pending) for r, t in zip(records, own)]
+
+    def tenant_from_filters(self, filters: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Tenant pinned by a where filter (equality on every key, at top level
+        or inside a top-level $and), or None if the filter spans tenants.
+        """
+        if not filters:
+            return None
+        clauses = [filters] + [c for c in filters.get("$and", []) if isinstance(c, dict)]
+        found: Dict[str, Any] = {}
+        for clause in clauses:
+            for key in self.keys:
+                value = clause.get(key)
+                if isinstance(value, dict) and set(value) == {"$eq"}:
+                    value = value["$eq"]
+                if isinstance(value, (str, int)) and not isinstance(value, bool):
+                    found[key] = value
+        if len(found) != len(self.keys):
+            return None
+        return self.tenant_for(found)
+
+    def owner(self, memory_id: str) -> Optional[str]:
+        """Tenant a stored record was routed to (None: root)."""
+        with self._lock:
+            return self._owners.get(memory_id)
+
+    def assign(self, placements: Dict[str, str]):
+        """Records memory ID -> tenant placements."""
+        with self._lock:
+            changed = {m_id: t for m_id, t in placements.items() if self._owners.get(m_id) != t}
+            if not changed:
+                return
+            self._owners.update(changed)
+            self._append([{"id": m_id, "t": t} for m_id, t in changed.items()])
+
+    def forget(self, memory_id: str):
+        """Drops the placement of a deleted record."""
+        with self._lock:
+            if self._owners.pop(memory_id, None) is not None:
+                self._append([{"id": memory_id, "del": True}])
+
+    def tenants(self) -> List[str]:
+        """Every tenant with a shard on disk."""
+        if not self.root.exists():
+            return []
+        depth = len(self.keys)
+        found = []
+        for path in self.root.glob("/".join(["*"] * depth)):
+            if path.is_dir():
+                found.append("/".join(path.relative_to(self.root).parts))
+        return sorted(found)
+
+    def path_for(self, tenant: str) -> Path:
+        return self.root.joinpath(*tenant.split("/"))
+
+    @staticmethod
+    def describe(tenant: str) -> List[Optional[str]]:
+        """Key values of a tenant ID (None where the record had no value)."""
+        return [None if part == MISSING_KEY else unquote(part) for part in tenant.split("/")]
+
+    # ------------------------------------------------------------------
+    # Handles
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def shard(self, tenant: str) -> Iterator[Any]:
+        """Opens (or reuses) a tenant's engine, pinned for the block."""
+        engine = self._acquire(tenant)
+        try:
+            yield engine
+        finally:
+            with self._lock:
+                self._pins[tenant] -= 1
+                if not self._pins[tenant]:
+                    del self._pins[tenant]
+            self._evict()
+
+    def open_handles(self) -> List[Any]:
+        """Currently open shard engines."""
+        with self._lock:
+            return list(self._open.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Open/opened/evicted handle counters and the LRU hit rate."""
+        with self._lock:
+            lookups = self.hits + self.opened
+            return {
+                "open": len(self._open),
+                "max_open": self.max_open,
+                "opened": self.opened,
+                "evicted": self.evicted,
+                "hits": self.hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "placements": len(self._owners),
+            }
+
+    def close(self):
+        """Closes every open shard."""
+        with self._lock:
+            engines = list(self._open.values())
+            self._open.clear()
+        for engine in engines:
+            engine.close()
+
+    def _acquire(self, tenant: str):
+        with self._lock:
+            self._pins[tenant] = self._pins.get(tenant, 0) + 1
+            engine = self._open.get(tenant)
+            if engine is not None:
+                self._open.move_to_end(tenant)
+                self.hits += 1
+                return engine
+        # Opening (Chroma client, index replay) happens outside the lock
+        try:
+            engine = self.factory(self.path_for(tenant))
+        except Exception:
+            with self._lock:
+                self._pins[tenant] -= 1
+                if not self._pins[tenant]:
+                    del self._pins[tenant]
+            raise
+        with self._lock:
+            existing = self._open.get(tenant)
+            if existing is None:
+                self._open[tenant] = engine
+                self.opened += 1
+                logger.debug(f"Opened shard {tenant}")
+            else:
+                # Another thread opened it first
+                engine.close()
+                engine = existing
+            self._open.move_to_end(tenant)
+        self._evict()
+        return engine
+
+    def _evict(self):
+        victims = []
+        with self._lock:
+            for tenant in list(self._open):
+                if len(self._open) - len(victims) <= self.max_open:
+                    break
+                if tenant not in self._pins:
+                    victims.append((tenant, self._open[tenant]))
+            for tenant, _ in victims:
+                del self._open[tenant]
+                self.evicted += 1
+        for tenant, engine in victims:
+            engine.close()
+            logger.debug(f"Evicted shard {tenant}")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+
+    def _load(self):
+        if not self.journal_path.exists():
+            return
+        lines = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping torn tenant map entry in {self.journal_path}")
+                    continue
+                if entry.get("del"):
+                    self._owners.pop(entry["id"], None)
+                else:
+                    self._owners[entry["id"]] = entry["t"]
+        if lines > 2 * len(self._owners) + 1024:
+            tmp_path = self.journal_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for m_id, tenant in self._owners.items():
+                    f.write(json.dumps({"id": m_id, "t": tenant}, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.journal_path)
@@ -1,85 +1,214 @@
 """ChromaDB Memory Storage for Semantic Search."""
 
+import heapq
 import logging
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
-import chromadb
-from chromadb.config import Settings
 from contracts.ports.i_memory_storage import IMemoryStorage
+from msp.instrumentation import Instrumentation
+from msp.storage.embedding_cache import CachedEmbeddingFunction
 
 logger = logging.getLogger(__name__)
 
+
+def prepare_vector_record(memory_data: Dict[str, Any]) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
+    """
+    Routes a record to its collection and extracts the text to embed.
+
+    Returns:
+        (collection_key, id, text, metadata) or None if nothing to index
+    """
+    m_type = memory_data.get("type", "unknown")
+    m_id = (memory_data.get("turn_id") or 
+            memory_data.get("sensory_id") or 
+            memory_data.get("episode_id") or 
+            memory_data.get("id"))
+
+    # Determine target collection and text to embed
+    text_content = ""
+    metadata = {k: v for k, v in memory_data.items() if isinstance(v, (str, int, float, bool))}
+
+    if m_type.startswith("turn_"):
+        key = "turns"
+        text_content = memory_data.get("text_excerpt", "")
+    elif m_type == "episodic_v3":
+        key = "episodes"
+        # For episodes, we embed the summary content
+        if "summary" in memory_data and isinstance(memory_data["summary"], dict):
+            text_content = (memory_data["summary"].get("content", "") + " " +
+                           memory_data["summary"].get("action_taken", "") + " " + 
+                           memory_data["summary"].get("key_outcome", ""))
+    elif m_type == "semantic":
+        key = "semantic"
+        # Format subject-predicate-object
+        text_content = f"{memory_data.get('subject', '')} {memory_data.get('predicate', '')} {memory_data.get('object', '')}"
+    else:
+        # Skip non-textual or unindexed types for now
+        return None
+
+    if not text_content or not text_content.strip():
+        logger.warning(f"No text content to embed for {m_id}")
+        return None
+
+    return key, m_id, text_content, metadata
+
+
 class ChromaMemoryStore(IMemoryStorage):
     """
     Adapter for ChromaDB to provide semantic search capabilities.
     Manages embedding and similarity search for memory records.
+
+    Embedding, writes, searches and deletes are reported to an optional
+    Instrumentation registry as ``chroma.*`` operations.
     """
 
-    def __init__(self, persist_directory: str = "memory/vector_db"):
+    def __init__(
+        self,
+        persist_directory: str = "memory/vector_db",
+        embedding_function=None,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = None,
+        query_cache_path: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None
+    ):
+        """
+        Initialize Chroma collections.
+
+        Args:
+            persist_directory: Chroma persistence directory
+            embedding_function: Shared embedding function for all collections
+                (defaults to Chroma's DefaultEmbeddingFunction)
+            query_cache_size: LRU capacity of the query-embedding cache (0 disables it)
+            query_cache_ttl: Seconds a cached query embedding stays valid
+            query_cache_path: Persist the query cache here for warm restarts
+            instrumentation: Metrics registry (default: disabled)
+        """
+        # Imported here so that choosing another vector backend never pays
+        # for loading chromadb
+        import chromadb
+        from chromadb.utils import embedding_functions
+
         self.persist_directory = persist_directory
+        self.instrumentation = instrumentation or Instrumentation()
         # Use PersistentClient for disk storage
         self.client = chromadb.PersistentClient(path=persist_directory)
+
+        # One embedding function for every collection, so a query embedded
+        # once can be reused across all of them
+        self.embedding_function = embedding_function or embedding_functions.DefaultEmbeddingFunction()
         
         # Default collections
         self.turns_collection = self.client.get_or_create_collection(
             name="memory_turns",
-            metadata={"hnsw:space": "cosine"}
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=self.embedding_function
         )
         self.episodes_collection = self.client.get_or_create_collection(
             name="memory_episodes",
-            metadata={"hnsw:space": "cosine"}
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=self.embedding_function
         )
         self.semantic_collection = self.client.get_or_create_collection(
             name="memory_semantic",
-            metadata={"hnsw:space": "cosine"}
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=self.embedding_function
         )
+        # Query texts repeat (greetings, retries, tool loops); documents rarely do,
+        # so only the query path goes through the cache
+        self.query_embedder = self.embedding_function
+        if query_cache_size > 0:
+            self.query_embedder = CachedEmbeddingFunction(
+                self.embedding_function,
+                max_entries=query_cache_size,
+                ttl_seconds=query_cache_ttl,
+                persist_path=query_cache_path
+            )
+
+        self._collections = [self.turns_collection, self.episodes_collection, self.semantic_collection]
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=len(self._collections), thread_name_prefix="msp-chroma-search"
+        )
+
+    def _collection_for(self, key: str):
+        return {
+            "turns": self.turns_collection,
+            "episodes": self.episodes_collection,
+            "semantic": self.semantic_collection,
+        }[key]
+
+    def _prepare(self, memory_data: Dict[str, Any]) -> Optional[Tuple[str, str, str, Dict[str, Any]]]:
+        return prepare_vector_record(memory_data)
 
     def store(self, memory_data: Dict[str, Any]) -> str:
         """
         Embeds and stores a memory record.
         Metadata is used for filtering.
         """
-        m_type = memory_data.get("type", "unknown")
-        m_id = (memory_data.get("turn_id") or 
-                memory_data.get("sensory_id") or 
-                memory_data.get("episode_id") or 
-                memory_data.get("id"))
-
-        # Determine target collection and text to embed
-        text_content = ""
-        metadata = {k: v for k, v in memory_data.items() if isinstance(v, (str, int, float, bool))}
-        
-        if m_type.startswith("turn_"):
-            collection = self.turns_collection
-            text_content = memory_data.get("text_excerpt", "")
-        elif m_type == "episodic_v3":
-            collection = self.episodes_collection
-            # For episodes, we embed the summary content
-            if "summary" in memory_data and isinstance(memory_data["summary"], dict):
-                text_content = (memory_data["summary"].get("content", "") + " " +
-                               memory_data["summary"].get("action_taken", "") + " " + 
-                               memory_data["summary"].get("key_outcome", ""))
-        elif m_type == "semantic":
-            collection = self.semantic_collection
-            # Format subject-predicate-object
-            text_content = f"{memory_data.get('subject', '')} {memory_data.get('predicate', '')} {memory_data.get('object', '')}"
-        else:
-            # Skip non-textual or unindexed types for now
-            return m_id
-
-        if not text_content or not text_content.strip():
-            logger.warning(f"No text content to embed for {m_id}")
-            return m_id
-
-        collection.add(
-            ids=[m_id],
-            documents=[text_content],
-            metadatas=[metadata]
-        )
-        
+        prepared = self._prepare(memory_data)
+        if prepared is None:
+            return (memory_data.get("turn_id") or
+                    memory_data.get("sensory_id") or
+                    memory_data.get("episode_id") or
+                    memory_data.get("id"))
+
+        key, m_id, text_content, metadata = prepared
+        with self.instrumentation.span("chroma.add"):
+            self._collection_for(key).add(
+                ids=[m_id],
+                documents=[text_content],
+                metadatas=[metadata]
+            )
+
         return m_id
 
+    def store_many(
+        self,
+        records: List[Dict[str, Any]],
+        upsert: bool = False,
+        batch_size: int = 512
+    ) -> Dict[str, int]:
+        """
+        Embeds and stores many records with one add/upsert per collection.
+
+        Records are grouped by target collection (turns/episodes/semantic) so
+        the embedding model runs once per chunk instead of once per record.
+        Repeated IDs within the call are collapsed (last one wins).
+
+        Args:
+            records: Memory records (any mix of types)
+            upsert: Replace existing vectors instead of skipping duplicate IDs
+            batch_size: Max records per add/upsert call
+
+        Returns:
+            Number of records sent to each collection
+        """
+        grouped: Dict[str, Dict[str, Tuple[str, Dict[str, Any]]]] = {}
+        for memory_data in records:
+            prepared = self._prepare(memory_data)
+            if prepared is None:
+                continue
+            key, m_id, text_content, metadata = prepared
+            grouped.setdefault(key, {})[m_id] = (text_content, metadata)
+
+        counts = {}
+        for key, items in grouped.items():
+            collection = self._collection_for(key)
+            write = collection.upsert if upsert else collection.add
+            entries = list(items.items())
+            for start in range(0, len(entries), batch_size):
+                chunk = entries[start:start + batch_size]
+                # Embedding happens inside add/upsert
+                with self.instrumentation.span("chroma.upsert" if upsert else "chroma.add"):
+                    write(
+                        ids=[m_id for m_id, _ in chunk],
+                        documents=[text for _, (text, _) in chunk],
+                        metadatas=[meta for _, (_, meta) in chunk]
+                    )
+            counts[key] = len(entries)
+        return counts
+
     def retrieve(self, memory_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve by ID from vector DB (returns metadata)."""
         # Try all collections
@@ -99,42 +228,66 @@ class ChromaMemoryStore(IMemoryStorage):
                 results.extend(res["metadatas"])
         return results[:limit]
 
+    def embed_query(self, query_text: str) -> List[float]:
+        """Embeds a query once so it can be reused across collections (cached)."""
+        with self.instrumentation.span("chroma.embed_query"):
+            embedding = self.query_embedder([query_text])[0]
+        return embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+
     def semantic_search(
         self, 
         query_text: str, 
         limit: int = 10, 
         filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Performs vector similarity search across all collections."""
-        all_results = []
-        
-        for collection in [self.turns_collection, self.episodes_collection, self.semantic_collection]:
+        """
+        Performs vector similarity search across all collections.
+        The query is embedded once and the three collections are queried
+        concurrently with that vector; results are merged with a top-k heap.
+        """
+        query_embedding = self.embed_query(query_text)
+
+        def search(collection) -> List[Dict[str, Any]]:
             try:
                 res = collection.query(
-                    query_texts=[query_text],
+                    query_embeddings=[query_embedding],
                     n_results=limit,
                     where=filters
                 )
-                
-                if res["ids"] and res["ids"][0]:
-                    for i in range(len(res["ids"][0])):
-                        item = res["metadatas"][0][i]
-                        item["_distance"] = res["distances"][0][i]
-                        item["_id"] = res["ids"][0][i]
-                        all_results.append(item)
             except Exception as e:
                 logger.error(f"Search failed in collection {collection.name}: {e}")
+                return []
 
-        # Sort combined results by distance (lower is better for cosine)
-        all_results.sort(key=lambda x: x.get("_distance", 1.0))
-        
-        return all_results[:limit]
+            hits = []
+            if res["ids"] and res["ids"][0]:
+                for i in range(len(res["ids"][0])):
+                    item = res["metadatas"][0][i]
+                    item["_distance"] = res["distances"][0][i]
+                    item["_id"] = res["ids"][0][i]
+                    hits.append(item)
+            return hits
+
+        with self.instrumentation.span("chroma.search"):
+            per_collection = list(self._search_pool.map(search, self._collections))
+
+        # Top-k merge by distance (lower is better for cosine)
+        return heapq.nsmallest(
+            limit,
+            (item for hits in per_collection for item in hits),
+            key=lambda x: x.get("_distance", 1.0)
+        )
 
     def delete(self, memory_id: str) -> bool:
         """Removes record from vector DB."""
-        for collection in [self.turns_collection, self.episodes_collection]:
-            collection.delete(ids=[memory_id])
+        with self.instrumentation.span("chroma.delete"):
+            for collection in [self.turns_collection, self.episodes_collection]:
+                collection.delete(ids=[memory_id])
         return True
 
+    def close(self):
+        """Saves a persisted query-embedding cache and releases its exit hook."""
+        if isinstance(self.query_embedder, CachedEmbeddingFunction):
+            self.query_embedder.close()
+
     def get_storage_type(self) -> str:
         return "vector_db"
@@ -0,0 +1,155 @@
+"""Record Codecs - Pluggable on-disk encodings for memory records."""
+
+import json
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Binary envelope: MAGIC + format byte + compression byte + payload.
+# Plain (uncompressed) JSON is written without an envelope so it stays
+# readable by json.load and by every tool that already reads memory files.
+MAGIC = b"MSP\x01"
+
+# Bare zstd frames (e.g. a file compressed with the zstd CLI) are also accepted
+ZSTD_FRAME_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_FORMAT_BYTES = {"json": b"j", "msgpack": b"m", "cbor": b"c"}
+_COMPRESSION_BYTES = {None: b"-", "zstd": b"z"}
+
+CODECS = ("json-pretty", "json", "msgpack", "cbor")
+COMPRESSIONS = (None, "zstd")
+
+
+def _require(module_name: str, feature: str):
+    """Imports an optional dependency or explains which extra is missing."""
+    try:
+        return __import__(module_name)
+    except ImportError as e:
+        raise ImportError(f"{feature} requires the '{module_name}' package "
+                          f"(pip install {module_name})") from e
+
+
+class RecordCodec:
+    """
+    Encodes/decodes one memory record (a JSON-compatible dict).
+
+    Formats:
+        json-pretty - indent=2 JSON (the original on-disk format)
+        json        - compact JSON (no whitespace)
+        msgpack     - MessagePack (requires ``msgpack``)
+        cbor        - CBOR (requires ``cbor2``)
+
+    Any format can be zstd-compressed (requires ``zstandard``). Decoding does
+    not depend on the codec instance: ``decode_record`` detects the format
+    from the bytes, so trees with mixed formats keep working.
+    """
+
+    def __init__(self, name: str = "json", compression: Optional[str] = None, level: int = 3):
+        """
+        Initialize codec.
+
+        Args:
+            name: One of CODECS
+            compression: None or 'zstd'
+            level: zstd compression level
+        """
+        if name not in CODECS:
+            raise ValueError(f"Unknown codec '{name}'. Expected one of: {', '.join(CODECS)}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'. Expected None or 'zstd'")
+        self.name = name
+        self.compression = compression
+        self.level = level
+
+        # Fail at construction time rather than on the first write
+        self._msgpack = _require("msgpack", "msgpack codec") if name == "msgpack" else None
+        self._cbor = _require("cbor2", "cbor codec") if name == "cbor" else None
+        self._zstd = _require("zstandard", "zstd compression") if compression == "zstd" else None
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}+{self.compression}" if self.compression else self.name
+
+    def encode(self, record: Any) -> bytes:
+        """Serializes a record to bytes."""
+        if self.name == "json-pretty":
+            payload = json.dumps(record, indent=2, ensure_ascii=False).encode("utf-8")
+        elif self.name == "json":
+            payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        elif self.name == "msgpack":
+            payload = self._msgpack.packb(record, use_bin_type=True)
+        else:
+            payload = self._cbor.dumps(record)
+
+        if self.name.startswith("json") and not self.compression:
+            return payload
+
+        fmt = "json" if self.name.startswith("json") else self.name
+        if self._zstd is not None:
+            # zstd compressors are not thread-safe; a per-call one is cheap enough
+            payload = self._zstd.ZstdCompressor(level=self.level).compress(payload)
+        return MAGIC + _FORMAT_BYTES[fmt] + _COMPRESSION_BYTES[self.compression] + payload
+
+    def decode(self, data: bytes) -> Any:
+        """Deserializes bytes written by any codec (auto-detected)."""
+        return decode_record(data)
+
+    def __repr__(self) -> str:
+        return f"RecordCodec({self.label!r})"
+
+
+def get_codec(codec: Union[str, RecordCodec, None] = "json", compression: Optional[str] = None) -> RecordCodec:
+    """Returns a RecordCodec for a name (or passes an instance through)."""
+    if isinstance(codec, RecordCodec):
+        return codec
+    return RecordCodec(codec or "json", compression=compression)
+
+
+def decode_record(data: bytes) -> Any:
+    """
+    Decodes a record of any supported format.
+
+    Detection:
+        MSP envelope  -> format/compression bytes
+        zstd frame    -> decompress, then detect again
+        anything else -> UTF-8 JSON (legacy files)
+    """
+    if data.startswith(MAGIC):
+        fmt = data[len(MAGIC):len(MAGIC) + 1]
+        comp = data[len(MAGIC) + 1:len(MAGIC) + 2]
+        payload = data[len(MAGIC) + 2:]
+        if comp == _COMPRESSION_BYTES["zstd"]:
+            payload = _zstd_decompress(payload)
+        elif comp != _COMPRESSION_BYTES[None]:
+            raise ValueError(f"Unknown record compression byte {comp!r}")
+
+        if fmt == _FORMAT_BYTES["json"]:
+            return json.loads(payload.decode("utf-8"))
+        if fmt == _FORMAT_BYTES["msgpack"]:
+            return _require("msgpack", "msgpack codec").unpackb(payload, raw=False, strict_map_key=False)
+        if fmt == _FORMAT_BYTES["cbor"]:
+            return _require("cbor2", "cbor codec").loads(payload)
+        raise ValueError(f"Unknown record format byte {fmt!r}")
+
+    if data.startswith(ZSTD_FRAME_MAGIC):
+        return decode_record(_zstd_decompress(data))
+
+    return json.loads(data.decode("utf-8"))
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    # decompressobj also handles frames written without a content size
+    zstd = _require("zstandard", "zstd compression")
+    return zstd.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def read_record(path: Union[str, Path]) -> Any:
+    """Reads and decodes a record file of any supported format."""
+    with open(path, "rb") as f:
+        return decode_record(f.read())
+
+
+def write_record(path: Union[str, Path], record: Any, codec: Optional[RecordCodec] = None):
+    """Encodes and writes a record file."""
+    data = (codec or get_codec()).encode(record)
+    with open(path, "wb") as f:
+        f.write(data)
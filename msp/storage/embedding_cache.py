@@ -0,0 +1,206 @@
+"""Embedding Cache - LRU/TTL cache in front of an embedding function."""
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CachedEmbeddingFunction:
+    """
+    Wraps a Chroma-compatible embedding function (``fn(List[str]) -> vectors``)
+    with an LRU cache keyed by (model id, normalized text).
+
+    Keys are NFC-normalized only, so two texts share an entry only when
+    any model would embed them identically. ``casefold=True`` also folds
+    case and collapses whitespace; enable it only for an uncased model
+    whose tokenizer ignores both. Misses within one call are embedded
+    together in a single batch.
+
+    The cache can be persisted to a JSON file so a warm restart does not
+    re-embed hot queries; entries from another model id or key
+    normalization are ignored on load. A persisted cache is saved by
+    ``close()``, or at interpreter exit if it was never closed.
+    """
+
+    def __init__(
+        self,
+        embedding_function,
+        model_id: Optional[str] = None,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        persist_path: Optional[str] = None,
+        casefold: bool = False
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            embedding_function: Underlying embedding function
+            model_id: Cache namespace (defaults to the function's name())
+            max_entries: LRU capacity
+            ttl_seconds: Entry lifetime (None = no expiry)
+            persist_path: JSON file to load from / save to
+            casefold: Also fold case and collapse whitespace in keys
+        """
+        self._inner = embedding_function
+        self.model_id = model_id or self._default_model_id(embedding_function)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.casefold = casefold
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if self.persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    # ------------------------------------------------------------------
+    # Embedding function protocol
+    # ------------------------------------------------------------------
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        now = time.time()
+        keys = [self._key(text) for text in input]
+        results: List[Optional[List[float]]] = [None] * len(input)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and not self._expired(entry[0], now):
+                    self._entries.move_to_end(key)
+                    results[i] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+                    self.misses += 1
+
+        if missing:
+            texts = [input[positions[0]] for positions in missing.values()]
+            vectors = self._inner(texts)
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), vectors):
+                    vector = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+                    self._entries[key] = (now, vector)
+                    self._entries.move_to_end(key)
+                    for i in positions:
+                        results[i] = vector
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return results
+
+    def name(self) -> str:
+        return self.model_id
+
+    def __getattr__(self, item):
+        # Delegate anything else Chroma may ask for (config, etc.)
+        if item == "_inner":
+            raise AttributeError(item)
+        return getattr(self._inner, item)
+
+    # ------------------------------------------------------------------
+    # Stats & persistence
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_id": self.model_id,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def close(self):
+        """Saves the cache and drops its exit hook. Safe to call twice."""
+        if not self.persist_path:
+            return
+        self.save()
+        atexit.unregister(self.save)
+
+    def save(self):
+        """Writes live entries to persist_path (atomic replace)."""
+        if not self.persist_path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [[k, ts, vec] for k, (ts, vec) in self._entries.items()
+                       if not self._expired(ts, now)]
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model_id": self.model_id, "key_format": self._key_format(), "entries": entries}, f)
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self):
+        """Loads entries saved by a previous process for the same model id."""
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable embedding cache {self.persist_path}: {e}")
+            return
+        if data.get("model_id") != self.model_id:
+            logger.info("Embedding cache was written by another model; starting cold")
+            return
+        if data.get("key_format") != self._key_format():
+            # Files without a key_format used case-folded keys
+            logger.info("Embedding cache uses another key normalization; starting cold")
+            return
+        now = time.time()
+        with self._lock:
+            for key, ts, vector in data.get("entries", [])[-self.max_entries:]:
+                if not self._expired(ts, now):
+                    self._entries[key] = (ts, vector)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _key(self, text: str) -> str:
+        normalized = unicodedata.normalize("NFC", text)
+        if self.casefold:
+            normalized = _WHITESPACE.sub(" ", normalized).strip().casefold()
+        return f"{self.model_id}\x00{normalized}"
+
+    def _key_format(self) -> str:
+        return "nfc+casefold" if self.casefold else "nfc"
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    @staticmethod
+    def _default_model_id(embedding_function) -> str:
+        name = getattr(embedding_function, "name", None)
+        if callable(name):
+            try:
+                return str(name())
+            except Exception:
+                pass
+        return type(embedding_function).__name__
@@ -1,12 +1,16 @@
 """File-based Memory Storage (File-per-Record)."""
 
-import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Union
 from datetime import datetime
 
 from contracts.ports.i_memory_storage import IMemoryStorage
+from msp.instrumentation import Instrumentation
+from msp.storage.codecs import RecordCodec, decode_record, get_codec
+from msp.storage.record_index import RecordIndex, INDEXED_FIELDS, RANGE_FILTERS, extract_meta
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +18,235 @@ class FileMemoryStore(IMemoryStorage):
     """
     Implementation of IMemoryStorage using local filesystem.
     Follows Date-based Hierarchical structure (ADR-005).
+
+    Retrieval by ID goes through a persistent RecordIndex (ID -> relative
+    path) kept in ``{base_dir}/.index``, so lookups do not walk the tree.
+    The same index carries secondary indexes (type, session_id, user_id,
+    persona_id, tags, created_at) that answer query() without opening
+    non-matching files.
+
+    Records are encoded with a pluggable RecordCodec (compact JSON by
+    default; msgpack/CBOR and zstd optional). Files keep the ``.json``
+    name whatever the codec, and reads auto-detect the format, so trees
+    written with another codec (or the old indent=2 JSON) stay readable.
+
+    Reads, writes, deletes and queries are reported to an optional
+    Instrumentation registry as ``file.*`` operations.
     """
 
-    def __init__(self, base_dir: str = "memory"):
+    # Top-level folders that _get_path routes records into
+    RECORD_ROOTS = ("episodes", "turns", "semantic", "misc")
+    INDEX_DIR = ".index"
+
+    def __init__(
+        self,
+        base_dir: str = "memory",
+        read_workers: int = 8,
+        codec: Union[str, RecordCodec] = "json",
+        compression: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None
+    ):
         self.base_dir = Path(base_dir)
+        self.instrumentation = instrumentation or Instrumentation()
+        self.codec = get_codec(codec, compression)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.read_workers = read_workers
+        self._read_pool: Optional[ThreadPoolExecutor] = None
+
+        journal_exists = (self.base_dir / self.INDEX_DIR / RecordIndex.JOURNAL_NAME).exists()
+        self.index = RecordIndex(self.base_dir / self.INDEX_DIR)
+        if self.index.missing_meta or (
+            not journal_exists and any((self.base_dir / root).exists() for root in self.RECORD_ROOTS)
+        ):
+            # Existing tree (or journal) from before the indexes were introduced
+            self.rebuild_index()
+
+    @staticmethod
+    def _get_id(data: Dict[str, Any]) -> Optional[str]:
+        """Primary ID of a record, regardless of its type."""
+        return (data.get("turn_id") or
+                data.get("sensory_id") or
+                data.get("episode_id") or
+                data.get("id"))
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.base_dir).as_posix()
+
+    def _resolve(self, memory_id: str) -> Optional[Path]:
+        """
+        Resolves an ID to its file path via the index.
+        The index is authoritative: unknown IDs (the common case for a new
+        fact's upsert) cost no tree scan. Records written outside this store
+        become visible after rebuild_index().
+        """
+        rel_path = self.index.get(memory_id)
+        if not rel_path:
+            return None
+        path = self.base_dir / rel_path
+        if path.exists():
+            return path
+        # File removed out of band; drop the stale entry
+        self.index.remove(memory_id)
+        return None
+
+    def _scan_records(self):
+        """Yields (id, path) for every record file under the routed roots."""
+        for root in self.RECORD_ROOTS:
+            root_dir = self.base_dir / root
+            if not root_dir.exists():
+                continue
+            for path in root_dir.rglob("*.json"):
+                yield path.stem, path
+
+    def iter_keyed_records(self, after_key: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streams (key, record) in a deterministic order for resumable scans.
+        The key is the record's relative path; records up to and including
+        ``after_key`` are skipped without being read.
+
+        Roots and directory entries are walked in sorted order, so the walk
+        order is the order of the path components and the watermark
+        comparison holds across roots. Subtrees wholly before the watermark
+        are not listed.
+        """
+        after = tuple(after_key.split("/")) if after_key else None
+
+        def walk(directory: Path, parts: Tuple[str, ...]):
+            try:
+                entries = sorted(os.scandir(directory), key=lambda e: e.name)
+            except FileNotFoundError:
+                return
+            for entry in entries:
+                entry_parts = parts + (entry.name,)
+                if entry.is_dir():
+                    if after and entry_parts < after[:len(entry_parts)]:
+                        continue
+                    yield from walk(Path(entry.path), entry_parts)
+                elif entry.name.endswith(".json"):
+                    yield Path(entry.path)
+
+        for root in sorted(self.RECORD_ROOTS):
+            if after and (root,) < after[:1]:
+                continue
+            for path in walk(self.base_dir / root, (root,)):
+                rel_path = self._relative(path)
+                if after and tuple(rel_path.split("/")) <= after:
+                    continue
+                record = self._read(path)
+                if record is not None:
+                    yield rel_path, record
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Streams every stored record (used by bulk reindexing)."""
+        for _, path in self._scan_records():
+            record = self._read(path)
+            if record is not None:
+                yield record
+
+    def scan_episodes(
+        self,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        newest_first: bool = True,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams episodes in created_at order using the episodes/YYYY/MM layout.
+
+        Year and month directories outside [since, until] are skipped without
+        being listed, and scanning stops as soon as ``limit`` episodes have been
+        yielded, so "last N episodes" touches only the newest partitions.
+        Within a month, files are ordered by the indexed created_at and only
+        the ones yielded are read.
+
+        Args:
+            since: Inclusive lower bound (datetime or ISO string)
+            until: Inclusive upper bound (datetime or ISO string)
+            newest_first: Newest episodes first (oldest first if False)
+            limit: Stop after this many episodes (None = all)
+        """
+        lo = self._as_iso(since)
+        hi = self._as_iso(until)
+        lo_part = self._partition_of(lo)
+        hi_part = self._partition_of(hi)
+
+        yielded = 0
+        for year_dir in self._sorted_dirs(self.base_dir / "episodes", newest_first):
+            year = int(year_dir.name)
+            if (lo_part and year < lo_part[0]) or (hi_part and year > hi_part[0]):
+                continue
+            for month_dir in self._sorted_dirs(year_dir, newest_first):
+                month = (year, int(month_dir.name))
+                if (lo_part and month < lo_part) or (hi_part and month > hi_part):
+                    continue
+
+                entries = []
+                with os.scandir(month_dir) as it:
+                    for entry in it:
+                        if not entry.name.endswith(".json"):
+                            continue
+                        m_id = entry.name[:-5]
+                        meta = self.index.get_meta(m_id)
+                        if meta is None or self.index.get(m_id) != self._relative(Path(entry.path)):
+                            record = self._read(Path(entry.path))
+                            if record is None:
+                                continue
+                            meta = extract_meta(record)
+                        entries.append((meta["created_at"], m_id, entry.path))
+                entries.sort(reverse=newest_first)
+
+                for created_at, m_id, path in entries:
+                    if (lo and created_at < lo) or (hi and created_at > hi):
+                        continue
+                    record = self._read(Path(path))
+                    if record is None:
+                        continue
+                    yield record
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+
+    @staticmethod
+    def _as_iso(value: Optional[Any]) -> Optional[str]:
+        if value is None:
+            return None
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    @staticmethod
+    def _partition_of(iso: Optional[str]) -> Optional[Tuple[int, int]]:
+        """(year, month) of an ISO bound, or None when it cannot be parsed."""
+        if not iso:
+            return None
+        try:
+            dt = datetime.fromisoformat(iso)
+        except ValueError:
+            return None
+        return dt.year, dt.month
+
+    @staticmethod
+    def _sorted_dirs(directory: Path, reverse: bool) -> List[Path]:
+        """Numeric partition subdirectories (YYYY or MM), sorted."""
+        if not directory.is_dir():
+            return []
+        with os.scandir(directory) as it:
+            names = [e.name for e in it if e.is_dir() and e.name.isdigit()]
+        return [directory / name for name in sorted(names, key=int, reverse=reverse)]
+
+    def rebuild_index(self) -> int:
+        """
+        Recovery scan: rebuilds the ID and metadata indexes from the files on disk.
+
+        Returns:
+            Number of indexed records
+        """
+        def entries():
+            for m_id, path in self._scan_records():
+                record = self._read(path)
+                if record is not None:
+                    yield m_id, self._relative(path), extract_meta(record)
+
+        self.index.rebuild(entries())
+        return len(self.index)
 
     def _get_path(self, data: Dict[str, Any]) -> Path:
         """Route data to the correct file path based on 'type' field."""
@@ -57,51 +285,147 @@ class FileMemoryStore(IMemoryStorage):
 
     def store(self, memory_data: Dict[str, Any]) -> str:
         """Stores a memory record to disk."""
-        path = self._get_path(memory_data)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(memory_data, f, indent=2, ensure_ascii=False)
-        
-        # Return the primary ID of the stored object
-        return (memory_data.get("turn_id") or 
-                memory_data.get("sensory_id") or 
-                memory_data.get("episode_id") or 
-                memory_data.get("id"))
+        return self.store_many([memory_data])[0]
+
+    def store_many(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Stores several records (group commit).
+        Files are written one per record; index updates share one journal append.
+        """
+        with self.instrumentation.span("file.write") as span:
+            return self._store_many(records, span)
+
+    def _store_many(self, records: List[Dict[str, Any]], span) -> List[str]:
+        ids = []
+        index_entries = []
+        for memory_data in records:
+            path = self._get_path(memory_data)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            data = self.codec.encode(memory_data)
+            with open(path, "wb") as f:
+                f.write(data)
+            span.add(bytes_written=len(data), files=1)
+
+            # Collect the primary ID of the stored object
+            m_id = self._get_id(memory_data)
+            ids.append(m_id)
+            if m_id:
+                rel_path = self._relative(path)
+                previous = self.index.get(m_id)
+                if previous and previous != rel_path:
+                    # Record was re-routed (e.g. created_at changed); drop the stale copy
+                    (self.base_dir / previous).unlink(missing_ok=True)
+                index_entries.append((m_id, rel_path, extract_meta(memory_data)))
+
+        self.index.put_many(index_entries)
+        return ids
+
+    def sync(self, memory_ids: Optional[List[str]] = None):
+        """
+        Durability barrier: fsyncs the given records (if any) and the index journal.
+        """
+        for m_id in memory_ids or []:
+            rel_path = self.index.get(m_id)
+            if not rel_path:
+                continue
+            try:
+                fd = os.open(self.base_dir / rel_path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.index.sync()
 
     def retrieve(self, memory_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieves a specific memory by ID.
-        Note: File-per-record requires knowing the path or searching.
-        In this Phase, we assume a search or specific path routing.
-        (Refinement needed for efficient global retrieval by ID alone).
-        """
-        # For Phase 1.1, we'll implement a simple recursive search if path unknown
-        for path in self.base_dir.rglob(f"{memory_id}.json"):
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return None
+        Resolved in O(1) through the ID index.
+        """
+        path = self._resolve(memory_id)
+        if path is None:
+            return None
+        return self._read(path)
 
-    def query(self, filters: Dict[str, Any], limit: int = 10) -> List[Dict[str, Any]]:
+    def retrieve_many(self, memory_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieves several memories at once.
+        Paths are resolved up front, then files are read concurrently.
+        Results keep the order of memory_ids (None for unknown IDs).
         """
-        Simple file-system query.
-        Filters supported: 'type' (episodic, sensory, etc.)
+        paths = [self._resolve(m_id) for m_id in memory_ids]
+        pending = [p for p in paths if p is not None]
+        if len(pending) <= 1 or self.read_workers <= 1:
+            return [self._read(p) if p is not None else None for p in paths]
+
+        if self._read_pool is None:
+            self._read_pool = ThreadPoolExecutor(
+                max_workers=self.read_workers, thread_name_prefix="msp-read"
+            )
+        loaded = iter(self._read_pool.map(self._read, pending))
+        return [next(loaded) if p is not None else None for p in paths]
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        with self.instrumentation.span("file.read") as span:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Deleted between resolve and read
+                return None
+            span.add(bytes_read=len(data), files=1)
+        return decode_record(data)
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 10,
+        offset: int = 0,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
         """
+        Filtered, date-ordered, paginated listing.
+
+        Indexed filters ('type', 'session_id', 'user_id', 'persona_id',
+        'tags', 'since', 'until') are answered by the RecordIndex without
+        opening any file. Other keys are applied as exact-match filters on
+        the loaded candidates.
+
+        Args:
+            filters: Filter dict (see above). 'type' accepts aliases
+                     ('episodic', 'sensory', 'turn') or exact record types.
+            limit: Page size
+            offset: Number of matches to skip
+            newest_first: Order by created_at descending (ascending if False)
+        """
+        with self.instrumentation.span("file.query"):
+            return self._query(filters, limit, offset, newest_first)
+
+    def _query(self, filters: Dict[str, Any], limit: int, offset: int, newest_first: bool) -> List[Dict[str, Any]]:
+        residual = {k: v for k, v in filters.items()
+                    if k not in INDEXED_FIELDS and k not in RANGE_FILTERS}
+
+        if not residual:
+            ids = self.index.find(filters, limit=limit, offset=offset, newest_first=newest_first)
+            return [r for r in self.retrieve_many(ids) if r is not None]
+
+        # Unindexed keys: walk the indexed candidates in order, page by page
         results = []
-        m_type = filters.get("type")
-        
-        # Search in relevant subfolder if type provided
-        search_path = self.base_dir
-        if m_type == "episodic": search_path = self.base_dir / "episodes"
-        elif m_type == "sensory": search_path = self.base_dir / "turns" / "sensory"
-        
-        for path in search_path.rglob("*.json"):
-            if len(results) >= limit: break
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # Apply further filters here if needed
-                results.append(data)
-        
+        skipped = 0
+        candidates = self.index.find(filters, limit=None, newest_first=newest_first)
+        chunk = max(limit * 2, 32)
+        for start in range(0, len(candidates), chunk):
+            for record in self.retrieve_many(candidates[start:start + chunk]):
+                if record is None or any(record.get(k) != v for k, v in residual.items()):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                results.append(record)
+                if len(results) >= limit:
+                    return results
         return results
 
     def semantic_search(
@@ -116,10 +440,14 @@ class FileMemoryStore(IMemoryStorage):
 
     def delete(self, memory_id: str) -> bool:
         """Deletes the memory file."""
-        for path in self.base_dir.rglob(f"{memory_id}.json"):
+        with self.instrumentation.span("file.delete") as span:
+            path = self._resolve(memory_id)
+            if path is None:
+                return False
             path.unlink()
-            return True
-        return False
+            span.add(files=1)
+            self.index.remove(memory_id)
+        return True
 
     def get_storage_type(self) -> str:
         return "filesystem"
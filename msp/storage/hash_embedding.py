@@ -0,0 +1,59 @@
+"""Hash Embedding - Deterministic, model-free embedding function."""
+
+import hashlib
+import math
+import re
+import unicodedata
+from typing import List
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashEmbeddingFunction:
+    """
+    Chroma-compatible embedding function (``fn(List[str]) -> vectors``) based
+    on signed feature hashing of word unigrams and bigrams.
+
+    Vectors are L2-normalized, so cosine similarity reflects shared words.
+    Output depends only on the text, ``dim`` and ``seed`` (blake2b, not
+    Python's salted ``hash``), which makes it suitable for benchmarks and
+    tests that must be reproducible and must not download a model. It has
+    no notion of meaning beyond word overlap.
+    """
+
+    def __init__(self, dim: int = 384, seed: int = 0, bigrams: bool = True):
+        """
+        Initialize embedder.
+
+        Args:
+            dim: Vector dimension
+            seed: Hash salt (different seeds give unrelated spaces)
+            bigrams: Also hash adjacent word pairs
+        """
+        self.dim = dim
+        self.seed = seed
+        self.bigrams = bigrams
+        self._salt = seed.to_bytes(8, "little", signed=False)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in input]
+
+    def name(self) -> str:
+        return f"hash-{self.dim}-{self.seed}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        tokens = _TOKEN.findall(unicodedata.normalize("NFC", text).casefold())
+        features = list(tokens)
+        if self.bigrams:
+            features += [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8, salt=self._salt).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dim] += 1.0 if (value >> 63) else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0.0:
+            # Empty text: a fixed unit vector keeps cosine distance defined
+            vector[0] = 1.0
+            return vector
+        return [v / norm for v in vector]
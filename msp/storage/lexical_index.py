@@ -0,0 +1,241 @@
+"""Lexical Index - Incremental BM25 inverted index over memory text."""
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and snake_case identifiers (IDs like SEM_ab12 stay whole)
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded word tokens of ``text``."""
+    return _TOKEN.findall(unicodedata.normalize("NFC", text).casefold())
+
+
+def document_text(record: Dict[str, Any]) -> str:
+    """
+    Searchable text of a record: turn ``text_excerpt``, episode
+    ``summary.content`` or a semantic fact's subject/predicate/object.
+    Other record types have no text (empty string).
+    """
+    m_type = record.get("type") or ""
+    if m_type.startswith("turn_"):
+        return record.get("text_excerpt") or ""
+    if m_type == "episodic_v3":
+        summary = record.get("summary")
+        return (summary.get("content") or "") if isinstance(summary, dict) else ""
+    if m_type == "semantic":
+        return " ".join(str(record.get(k) or "") for k in ("subject", "predicate", "object"))
+    return ""
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Tuple[Sequence[str], float]],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Weighted reciprocal-rank fusion.
+
+    Args:
+        rankings: (ids best-first, weight) per retriever
+        k: Rank damping constant (larger flattens the head of each list)
+
+    Returns:
+        (id, sum of weight / (k + rank)) sorted by descending score; ties
+        keep first-seen order
+    """
+    scores: Dict[str, float] = {}
+    for ids, weight in rankings:
+        if weight <= 0:
+            continue
+        for rank, m_id in enumerate(ids, start=1):
+            scores[m_id] = scores.get(m_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def _record_id(data: Dict[str, Any]) -> Optional[str]:
+    return (data.get("turn_id") or
+            data.get("sensory_id") or
+            data.get("episode_id") or
+            data.get("id"))
+
+
+class LexicalIndex:
+    """
+    BM25 (Okapi) inverted index over the text fields of memory records.
+
+    Complements vector search with exact-token recall: names, IDs and code
+    identifiers that an embedding blurs. Queries need no embedding call.
+    Postings live in memory; updates are appended to a journal under
+    ``.index`` and replayed on open, like LinkIndex:
+        {"op": "set", "id": "TU_1", "tf": {"guitar": 2, "chords": 1}}
+        {"op": "drop", "id": "TU_1"}
+    Re-storing a record with unchanged text writes nothing.
+    """
+
+    JOURNAL_NAME = "lexical_index.jsonl"
+
+    def __init__(self, index_dir: Path, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize index.
+
+        Args:
+            index_dir: Directory of the journal (usually {base_dir}/.index)
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization (0 = none, 1 = full)
+        """
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.index_dir / self.JOURNAL_NAME
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._load()
+
+    def __len__(self) -> int:
+        """Number of indexed records."""
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def search(self, query_text: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Ranks records by BM25 against the query terms.
+
+        Returns:
+            (id, score) pairs, best first; records sharing no term are omitted
+        """
+        terms = set(tokenize(query_text))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs or not terms:
+                return []
+            avg_length = self._total_length / n_docs
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1.0 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for m_id, tf in postings.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * self._lengths[m_id] / avg_length)
+                    scores[m_id] = scores.get(m_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def index_records(self, records: Iterable[Dict[str, Any]]):
+        """Adds or replaces the postings of stored records."""
+        lines = []
+        with self._lock:
+            for record in records:
+                entry = self._entry_for(record)
+                if entry is None:
+                    # Text became empty: the old postings no longer describe the record
+                    m_id = _record_id(record)
+                    if m_id not in self._docs:
+                        continue
+                    entry = {"op": "drop", "id": m_id}
+                elif self._docs.get(entry["id"]) == entry["tf"]:
+                    continue
+                self._apply(entry)
+                lines.append(entry)
+            self._append(lines)
+
+    def remove(self, memory_id: str):
+        """Drops a record's postings."""
+        with self._lock:
+            if memory_id not in self._docs:
+                return
+            entry = {"op": "drop", "id": memory_id}
+            self._apply(entry)
+            self._append([entry])
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]):
+        """Rebuilds the index from a record scan and compacts the journal."""
+        with self._lock:
+            self._docs, self._lengths, self._postings, self._total_length = {}, {}, {}, 0
+            for record in records:
+                entry = self._entry_for(record)
+                if entry is not None:
+                    self._apply(entry)
+            self._compact()
+        logger.info(f"LexicalIndex rebuilt with {len(self)} records")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _entry_for(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        m_id = _record_id(record)
+        tokens = tokenize(document_text(record))
+        if not m_id or not tokens:
+            return None
+        return {"op": "set", "id": m_id, "tf": dict(Counter(tokens))}
+
+    def _apply(self, entry: Dict[str, Any]):
+        m_id = entry["id"]
+        old = self._docs.pop(m_id, None)
+        if old is not None:
+            for term in old:
+                postings = self._postings[term]
+                del postings[m_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._lengths.pop(m_id)
+        if entry["op"] != "set":
+            return
+        tf = entry["tf"]
+        self._docs[m_id] = tf
+        self._lengths[m_id] = sum(tf.values())
+        self._total_length += self._lengths[m_id]
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[m_id] = count
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+
+    def _compact(self):
+        tmp_path = self.journal_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for m_id, tf in self._docs.items():
+                f.write(json.dumps({"op": "set", "id": m_id, "tf": tf}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.journal_path)
+
+    def _load(self):
+        if not self.journal_path.exists():
+            return
+        lines = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning(f"Skipping corrupt lexical index entry in {self.journal_path}")
+        if lines > 2 * len(self._docs) + 1024:
+            self._compact()
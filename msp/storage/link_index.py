@@ -0,0 +1,282 @@
+"""Link Index - Persistent bidirectional adjacency between memory records."""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Reference fields that carry links, by record type
+LINK_FIELDS = {
+    "episodic_v3": ("turn_refs", "sensory_refs", "semantic_refs"),
+    "semantic": ("episode_refs",),
+}
+
+# Single-valued parent pointers, mapped onto the episode-side relation
+PARENT_FIELDS = {
+    "sensory_v1": "sensory_refs",
+    "turn_user": "turn_refs",
+    "turn_llm": "turn_refs",
+}
+
+RELATIONS = ("turn_refs", "sensory_refs", "semantic_refs", "episode_refs")
+
+
+def _record_id(data: Dict[str, Any]) -> Optional[str]:
+    return (data.get("turn_id") or
+            data.get("sensory_id") or
+            data.get("episode_id") or
+            data.get("id"))
+
+
+class LinkIndex:
+    """
+    Adjacency lists over the reference fields of memory records.
+
+    Every edge ``(source, relation, target)`` is stored twice, forward
+    (source -> target) and reverse (target -> source), so "which facts
+    belong to this episode" and "which episodes cite this fact" are both
+    O(degree) lookups with no record reads.
+
+    Edges come from:
+        episode.turn_refs / sensory_refs / semantic_refs  (episode -> child)
+        semantic.episode_refs                              (fact -> episode)
+        sensory.episode_id, turn.episode_id                (as episode -> child)
+
+    Persisted as an append-only journal of edge deltas, replayed on open
+    like RecordIndex and compacted when it outgrows the live edge set:
+        {"op": "add", "src": "EP_1", "rel": "sensory_refs", "dst": ["SM_1"]}
+        {"op": "drop", "src": "EP_1", "rel": "semantic_refs", "dst": ["SEM_1"]}
+        {"op": "drop", "id": "SEM_1"}
+    Older journals may also hold full-list ``set`` entries; they still replay.
+    """
+
+    JOURNAL_NAME = "link_index.jsonl"
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.index_dir / self.JOURNAL_NAME
+        self._lock = threading.RLock()
+        # node -> relation -> targets, and the mirror image
+        self._out: Dict[str, Dict[str, Set[str]]] = {}
+        self._in: Dict[str, Dict[str, Set[str]]] = {}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def links(self, memory_id: str, direction: str = "out") -> Dict[str, List[str]]:
+        """
+        Links of one record grouped by relation.
+
+        Args:
+            memory_id: Record ID
+            direction: 'out' (fields on this record), 'in' (records whose
+                       fields point here) or 'both'
+        """
+        with self._lock:
+            result: Dict[str, Set[str]] = {}
+            sides = {"out": (self._out,), "in": (self._in,), "both": (self._out, self._in)}[direction]
+            for side in sides:
+                for rel, targets in side.get(memory_id, {}).items():
+                    result.setdefault(rel, set()).update(targets)
+            return {rel: sorted(targets) for rel, targets in result.items()}
+
+    def neighbors(self, memory_id: str, relations: Optional[Iterable[str]] = None) -> List[str]:
+        """All records linked to ``memory_id`` in either direction."""
+        wanted = set(relations) if relations else None
+        with self._lock:
+            found: Set[str] = set()
+            for side in (self._out, self._in):
+                for rel, targets in side.get(memory_id, {}).items():
+                    if wanted is None or rel in wanted:
+                        found.update(targets)
+            found.discard(memory_id)
+            return sorted(found)
+
+    def expand(
+        self,
+        seeds: Iterable[str],
+        hops: int = 2,
+        fan_out: int = 8,
+        max_nodes: int = 64,
+        relations: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Breadth-first multi-hop expansion (e.g. episode -> facts -> episodes).
+
+        Args:
+            seeds: Starting record IDs (returned at hop 0)
+            hops: Maximum path length
+            fan_out: Max neighbors followed per node
+            max_nodes: Overall cap on returned nodes
+            relations: Restrict to these relations (default: all)
+
+        Returns:
+            (id, hop) pairs in discovery order, seeds first
+        """
+        relations = list(relations) if relations else None
+        visited: Dict[str, int] = {}
+        frontier = deque()
+        for seed in seeds:
+            if seed not in visited and len(visited) < max_nodes:
+                visited[seed] = 0
+                frontier.append(seed)
+
+        while frontier and len(visited) < max_nodes:
+            node = frontier.popleft()
+            depth = visited[node]
+            if depth >= hops:
+                continue
+            followed = 0
+            for neighbor in self.neighbors(node, relations):
+                if followed >= fan_out or len(visited) >= max_nodes:
+                    break
+                if neighbor in visited:
+                    continue
+                visited[neighbor] = depth + 1
+                frontier.append(neighbor)
+                followed += 1
+        return list(visited.items())
+
+    def __len__(self) -> int:
+        """Number of stored (forward) edges."""
+        with self._lock:
+            return sum(len(t) for rels in self._out.values() for t in rels.values())
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def index_records(self, records: Iterable[Dict[str, Any]]):
+        """Updates adjacency from the reference fields of stored records."""
+        lines = []
+        with self._lock:
+            for record in records:
+                for entry in self._ops_for(record):
+                    self._apply(entry)
+                    lines.append(entry)
+            self._append(lines)
+
+    def remove(self, memory_id: str):
+        """Drops a record and every edge touching it."""
+        with self._lock:
+            if memory_id not in self._out and memory_id not in self._in:
+                return
+            entry = {"op": "drop", "id": memory_id}
+            self._apply(entry)
+            self._append([entry])
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]):
+        """Rebuilds the index from a record scan and compacts the journal."""
+        with self._lock:
+            self._out, self._in = {}, {}
+            for record in records:
+                for entry in self._ops_for(record):
+                    self._apply(entry)
+            self._compact()
+        logger.info(f"LinkIndex rebuilt with {len(self)} edges")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _ops_for(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        m_type = record.get("type")
+        m_id = _record_id(record)
+        if not m_id:
+            return []
+        ops = []
+        for rel in LINK_FIELDS.get(m_type, ()):
+            # The record's list is authoritative for its own field
+            targets = {t for t in (record.get(rel) or []) if isinstance(t, str)}
+            current = self._out.get(m_id, {}).get(rel, set())
+            if current - targets:
+                ops.append({"op": "drop", "src": m_id, "rel": rel, "dst": sorted(current - targets)})
+            if targets - current:
+                ops.append({"op": "add", "src": m_id, "rel": rel, "dst": sorted(targets - current)})
+        parent_rel = PARENT_FIELDS.get(m_type)
+        ep_id = record.get("episode_id")
+        if parent_rel and ep_id:
+            # Single-valued: an edge from any other episode is a stale parent
+            for old in sorted(self._in.get(m_id, {}).get(parent_rel, set()) - {ep_id}):
+                ops.append({"op": "drop", "src": old, "rel": parent_rel, "dst": [m_id]})
+            if m_id not in self._out.get(ep_id, {}).get(parent_rel, ()):
+                ops.append({"op": "add", "src": ep_id, "rel": parent_rel, "dst": [m_id]})
+        return ops
+
+    def _apply(self, entry: Dict[str, Any]):
+        op = entry.get("op")
+        if op == "drop" and "id" in entry:
+            node = entry["id"]
+            for rel, targets in self._out.pop(node, {}).items():
+                for t in targets:
+                    self._discard(self._in, t, rel, node)
+            for rel, sources in self._in.pop(node, {}).items():
+                for s in sources:
+                    self._discard(self._out, s, rel, node)
+            return
+
+        src, rel, dst = entry["src"], entry["rel"], entry["dst"]
+        if op == "drop":
+            for target in dst:
+                self._discard(self._in, target, rel, src)
+                self._discard(self._out, src, rel, target)
+            return
+        if op == "set":
+            for old in self._out.get(src, {}).get(rel, set()) - set(dst):
+                self._discard(self._in, old, rel, src)
+                self._discard(self._out, src, rel, old)
+        for target in dst:
+            self._out.setdefault(src, {}).setdefault(rel, set()).add(target)
+            self._in.setdefault(target, {}).setdefault(rel, set()).add(src)
+
+    @staticmethod
+    def _discard(side: Dict[str, Dict[str, Set[str]]], node: str, rel: str, other: str):
+        rels = side.get(node)
+        if not rels or rel not in rels:
+            return
+        rels[rel].discard(other)
+        if not rels[rel]:
+            del rels[rel]
+        if not rels:
+            del side[node]
+
+    def _append(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+
+    def _compact(self):
+        tmp_path = self.journal_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for src, rels in self._out.items():
+                for rel, targets in rels.items():
+                    f.write(json.dumps({"op": "add", "src": src, "rel": rel, "dst": sorted(targets)},
+                                       ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.journal_path)
+
+    def _load(self):
+        if not self.journal_path.exists():
+            return
+        lines = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                lines += 1
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    # A torn trailing write after a crash; rebuild() repairs any gap.
+                    logger.warning(f"Skipping corrupt link journal line {line_no}")
+        if lines > 2 * len(self) + 1024:
+            self._compact()
@@ -0,0 +1,572 @@
+"""NumPy Vector Store - In-process semantic index on memory-mapped matrices."""
+
+import heapq
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from contracts.ports.i_memory_storage import IMemoryStorage
+from msp.instrumentation import Instrumentation
+from msp.storage.chroma_store import prepare_vector_record
+from msp.storage.embedding_cache import CachedEmbeddingFunction
+from msp.storage.where_filter import matches_where
+
+logger = logging.getLogger(__name__)
+
+
+class VectorCollection:
+    """
+    One collection: a float32 matrix memory-mapped from ``{name}.f32`` plus
+    an append-only JSONL journal of ids and metadata (``{name}.jsonl``).
+
+    Rows hold L2-normalized vectors, so cosine distance is ``1 - M @ q``.
+    The matrix file grows by doubling; rows freed by deletes are reused.
+    Vectors are flushed before their journal line is appended, so a torn
+    write leaves at most an unreferenced row behind.
+
+    With ``approximate=True`` and at least ``ivf_min_rows`` vectors, searches
+    use an inverted-file index (spherical k-means, sqrt(n) lists) and score
+    only the ``nprobe`` closest lists. The IVF is kept in memory and trained
+    on the first search after load; it is retrained once the collection has
+    doubled in size.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        name: str,
+        approximate: bool = False,
+        nprobe: int = 8,
+        ivf_min_rows: int = 20000
+    ):
+        self.name = name
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.matrix_path = self.directory / f"{name}.f32"
+        self.journal_path = self.directory / f"{name}.jsonl"
+        self.manifest_path = self.directory / f"{name}.json"
+        self.approximate = approximate
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._ids: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._ivf_rows = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if self.manifest_path.exists():
+            self.dim = json.loads(self.manifest_path.read_text(encoding="utf-8"))["dim"]
+            self._map()
+
+        lines = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping torn journal line in {self.journal_path}")
+                        continue
+                    if entry.get("del"):
+                        self._release(entry["id"])
+                    elif self._matrix is not None and entry["row"] < len(self._matrix):
+                        self._assign_row(entry["id"], entry["row"], entry["meta"])
+
+        self._free = [row for row in range(len(self._ids)) if self._ids[row] is None]
+        self._free.reverse()
+        if lines > 2 * len(self._rows) + 1024:
+            self.compact()
+
+    def _map(self):
+        capacity = self.matrix_path.stat().st_size // (4 * self.dim) if self.matrix_path.exists() else 0
+        if capacity == 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        if len(self._live) < capacity:
+            self._live = np.concatenate([self._live, np.zeros(capacity - len(self._live), dtype=bool)])
+            self._assign = np.concatenate([self._assign, np.full(capacity - len(self._assign), -1, dtype=np.int32)])
+
+    def _grow(self, needed: int):
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if needed <= capacity:
+            return
+        new_capacity = max(1024, capacity)
+        while new_capacity < needed:
+            new_capacity *= 2
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        # Extending the file zero-fills it; existing rows stay in place
+        with open(self.matrix_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._map()
+
+    def _init_dim(self, dim: int):
+        self.dim = dim
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(json.dumps({"dim": dim}), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def compact(self):
+        """Rewrites the journal with one line per live vector."""
+        with self._lock:
+            tmp = self.journal_path.with_name(self.journal_path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for m_id, row in self._rows.items():
+                    f.write(json.dumps({"id": m_id, "row": row, "meta": self._metadatas[row]}) + "\n")
+            os.replace(tmp, self.journal_path)
+
+    # ------------------------------------------------------------------
+    # Row bookkeeping
+    # ------------------------------------------------------------------
+
+    def _assign_row(self, m_id: str, row: int, metadata: Dict[str, Any]):
+        old = self._rows.get(m_id)
+        if old is not None and old != row:
+            self._ids[old] = None
+            self._metadatas[old] = None
+            self._live[old] = False
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._metadatas.append(None)
+        self._ids[row] = m_id
+        self._metadatas[row] = metadata
+        self._rows[m_id] = row
+        self._live[row] = True
+
+    def _release(self, m_id: str) -> Optional[int]:
+        row = self._rows.pop(m_id, None)
+        if row is not None:
+            self._ids[row] = None
+            self._metadatas[row] = None
+            self._live[row] = False
+            self._assign[row] = -1
+        return row
+
+    # ------------------------------------------------------------------
+    # Collection API
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        upsert: bool = False
+    ) -> int:
+        """
+        Writes vectors and metadata.
+
+        Args:
+            ids: Record IDs
+            embeddings: One vector per ID (normalized on write)
+            metadatas: One metadata dict per ID
+            upsert: Overwrite existing IDs (otherwise they are skipped, like Chroma's add)
+
+        Returns:
+            Bytes written (vectors + journal)
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError(f"Expected {len(ids)} embeddings for collection {self.name}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            if self.dim is None:
+                self._init_dim(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match "
+                                 f"collection {self.name} ({self.dim})")
+
+            placed: List[Tuple[str, int, Dict[str, Any]]] = []
+            picks: List[int] = []
+            next_row = len(self._ids)
+            for i, (m_id, metadata) in enumerate(zip(ids, metadatas)):
+                row = self._rows.get(m_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row = next_row
+                        next_row += 1
+                elif not upsert:
+                    continue
+                placed.append((m_id, row, metadata))
+                picks.append(i)
+            if not placed:
+                return 0
+
+            self._grow(next_row)
+            rows = np.fromiter((row for _, row, _ in placed), dtype=np.int64, count=len(placed))
+            self._matrix[rows] = vectors[picks]
+            self._matrix.flush()
+
+            lines = "".join(json.dumps({"id": m_id, "row": row, "meta": metadata}) + "\n"
+                            for m_id, row, metadata in placed)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+            for m_id, row, metadata in placed:
+                self._assign_row(m_id, row, metadata)
+            if self._centroids is not None:
+                self._assign[rows] = np.argmax(self._matrix[rows] @ self._centroids.T, axis=1)
+        return len(placed) * self.dim * 4 + len(lines)
+
+    def get(self, m_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._rows.get(m_id)
+            return dict(self._metadatas[row]) if row is not None else None
+
+    def where(self, filters: Optional[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """Metadata of up to ``limit`` vectors matching ``filters`` (insertion order)."""
+        results = []
+        with self._lock:
+            for row in self._rows.values():
+                metadata = self._metadatas[row]
+                if matches_where(metadata, filters):
+                    results.append(dict(metadata))
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def delete(self, ids: List[str]) -> int:
+        """Drops vectors; returns the number removed."""
+        with self._lock:
+            removed = [m_id for m_id in ids if m_id in self._rows]
+            if not removed:
+                return 0
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"id": m_id, "del": True}) + "\n" for m_id in removed))
+            for m_id in removed:
+                row = self._release(m_id)
+                self._matrix[row] = 0.0
+                self._free.append(row)
+        return len(removed)
+
+    def search(
+        self,
+        query: np.ndarray,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Top-k by cosine distance.
+
+        Args:
+            query: Unit-length float32 query vector
+            n_results: Max hits
+            where: Chroma-style metadata filter
+
+        Returns:
+            [(id, distance, metadata)] sorted by ascending distance
+        """
+        with self._lock:
+            if not self._rows or n_results <= 0:
+                return []
+            rows = self._probe(query, n_results) if self.approximate else None
+            if rows is not None:
+                hits = self._top(rows, self._matrix[rows] @ query, n_results, where)
+                if len(hits) == n_results or not where:
+                    return hits
+                # The probed lists ran out of matching vectors: fall back to exact
+            size = len(self._ids)
+            scores = self._matrix[:size] @ query
+            scores[~self._live[:size]] = -np.inf
+            hits = self._top(np.arange(size), scores, n_results, where)
+            return hits
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, n_results: int, where) -> List[Tuple[str, float, Dict[str, Any]]]:
+        # Filters are applied in descending score order, widening the
+        # candidate window until enough vectors pass
+        live = int(np.isfinite(scores).sum())
+        if live == 0:
+            return []
+        window = min(live, n_results if not where else max(4 * n_results, 64))
+        while True:
+            if window < len(scores):
+                top = np.argpartition(-scores, window - 1)[:window]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            hits = []
+            for i in top:
+                if not np.isfinite(scores[i]):
+                    break
+                row = int(rows[i])
+                metadata = self._metadatas[row]
+                if where and not matches_where(metadata, where):
+                    continue
+                hits.append((self._ids[row], float(1.0 - scores[i]), dict(metadata)))
+                if len(hits) == n_results:
+                    return hits
+            if window >= live:
+                return hits
+            window = min(live, window * 4)
+
+    # ------------------------------------------------------------------
+    # Approximate search (IVF)
+    # ------------------------------------------------------------------
+
+    def _probe(self, query: np.ndarray, n_results: int) -> Optional[np.ndarray]:
+        """Candidate rows from the closest IVF lists, or None for an exact scan."""
+        count = len(self._rows)
+        if count < self.ivf_min_rows:
+            return None
+        if self._centroids is None or count > 2 * self._ivf_rows:
+            self._train_ivf()
+        lists = np.argsort(-(self._centroids @ query))[:self.nprobe]
+        size = len(self._ids)
+        rows = np.flatnonzero(np.isin(self._assign[:size], lists) & self._live[:size])
+        return rows if len(rows) >= n_results else None
+
+    def _train_ivf(self, iterations: int = 8, seed: int = 0):
+        live = np.flatnonzero(self._live[:len(self._ids)])
+        n_lists = max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(seed)
+        sample = self._matrix[rng.choice(live, size=min(len(live), 64 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for k in range(n_lists):
+                members = sample[labels == k]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[k] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        self._assign[:] = -1
+        for start in range(0, len(live), 65536):
+            chunk = live[start:start + 65536]
+            self._assign[chunk] = np.argmax(self._matrix[chunk] @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._ivf_rows = len(live)
+        logger.info(f"Trained IVF for {self.name}: {n_lists} lists over {len(live)} vectors")
+
+
+class NumpyVectorStore(IMemoryStorage):
+    """
+    In-process alternative to ChromaMemoryStore with the same interface.
+
+    Each collection (turns/episodes/semantic) is a memory-mapped float32
+    matrix searched with one vectorized dot product per query, so opening
+    the store costs a JSONL replay instead of importing chromadb and
+    starting a PersistentClient. Routing, metadata and ``where`` filters
+    follow ChromaMemoryStore. Search is exact unless ``approximate=True``
+    (IVF, see VectorCollection).
+
+    Embedding, writes, searches and deletes are reported to an optional
+    Instrumentation registry as ``numpy.*`` operations.
+    """
+
+    COLLECTIONS = {
+        "turns": "memory_turns",
+        "episodes": "memory_episodes",
+        "semantic": "memory_semantic",
+    }
+
+    def __init__(
+        self,
+        persist_directory: str = "memory/vector_db",
+        embedding_function=None,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = None,
+        query_cache_path: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        approximate: bool = False,
+        nprobe: int = 8,
+        ivf_min_rows: int = 20000
+    ):
+        """
+        Initialize collections.
+
+        Args:
+            persist_directory: Vector directory (matrices live in its numpy/ subdirectory)
+            embedding_function: Shared embedding function for all collections
+                (defaults to Chroma's DefaultEmbeddingFunction, which needs
+                chromadb; pass e.g. HashEmbeddingFunction to avoid it)
+            query_cache_size: LRU capacity of the query-embedding cache (0 disables it)
+            query_cache_ttl: Seconds a cached query embedding stays valid
+            query_cache_path: Persist the query cache here for warm restarts
+            instrumentation: Metrics registry (default: disabled)
+            approximate: Use IVF search once a collection has ivf_min_rows vectors
+            nprobe: IVF lists scored per query
+            ivf_min_rows: Collection size at which approximate search kicks in
+        """
+        self.persist_directory = persist_directory
+        self.instrumentation = instrumentation or Instrumentation()
+        if embedding_function is None:
+            from chromadb.utils import embedding_functions
+            embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self.embedding_function = embedding_function
+
+        directory = Path(persist_directory) / "numpy"
+        options = {"approximate": approximate, "nprobe": nprobe, "ivf_min_rows": ivf_min_rows}
+        self.turns_collection = VectorCollection(directory, self.COLLECTIONS["turns"], **options)
+        self.episodes_collection = VectorCollection(directory, self.COLLECTIONS["episodes"], **options)
+        self.semantic_collection = VectorCollection(directory, self.COLLECTIONS["semantic"], **options)
+
+        self.query_embedder = self.embedding_function
+        if query_cache_size > 0:
+            self.query_embedder = CachedEmbeddingFunction(
+                self.embedding_function,
+                max_entries=query_cache_size,
+                ttl_seconds=query_cache_ttl,
+                persist_path=query_cache_path
+            )
+
+        self._collections = [self.turns_collection, self.episodes_collection, self.semantic_collection]
+
+    def _collection_for(self, key: str) -> VectorCollection:
+        return {
+            "turns": self.turns_collection,
+            "episodes": self.episodes_collection,
+            "semantic": self.semantic_collection,
+        }[key]
+
+    def store(self, memory_data: Dict[str, Any]) -> str:
+        """Embeds and stores a memory record (existing IDs are kept)."""
+        prepared = prepare_vector_record(memory_data)
+        if prepared is None:
+            return (memory_data.get("turn_id") or
+                    memory_data.get("sensory_id") or
+                    memory_data.get("episode_id") or
+                    memory_data.get("id"))
+        self.store_many([memory_data])
+        return prepared[1]
+
+    def store_many(
+        self,
+        records: List[Dict[str, Any]],
+        upsert: bool = False,
+        batch_size: int = 512
+    ) -> Dict[str, int]:
+        """
+        Embeds and stores many records with one write per collection chunk.
+
+        Args:
+            records: Memory records (any mix of types)
+            upsert: Replace existing vectors instead of skipping duplicate IDs
+            batch_size: Max records embedded per call
+
+        Returns:
+            Number of records sent to each collection
+        """
+        grouped: Dict[str, Dict[str, Tuple[str, Dict[str, Any]]]] = {}
+        for memory_data in records:
+            prepared = prepare_vector_record(memory_data)
+            if prepared is None:
+                continue
+            key, m_id, text_content, metadata = prepared
+            grouped.setdefault(key, {})[m_id] = (text_content, metadata)
+
+        counts = {}
+        for key, items in grouped.items():
+            collection = self._collection_for(key)
+            entries = list(items.items())
+            for start in range(0, len(entries), batch_size):
+                chunk = entries[start:start + batch_size]
+                with self.instrumentation.span("numpy.upsert" if upsert else "numpy.add") as span:
+                    embeddings = self.embedding_function([text for _, (text, _) in chunk])
+                    written = collection.add(
+                        ids=[m_id for m_id, _ in chunk],
+                        embeddings=embeddings,
+                        metadatas=[meta for _, (_, meta) in chunk],
+                        upsert=upsert
+                    )
+                    span.add(bytes_written=written)
+            counts[key] = len(entries)
+        return counts
+
+    def retrieve(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve by ID (returns metadata)."""
+        for collection in self._collections:
+            metadata = collection.get(memory_id)
+            if metadata is not None:
+                return metadata
+        return None
+
+    def query(self, filters: Dict[str, Any], limit: int = 10) -> List[Dict[str, Any]]:
+        """Queries metadata with a Chroma-style where filter."""
+        results = []
+        for collection in self._collections:
+            results.extend(collection.where(filters, limit - len(results)))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def embed_query(self, query_text: str) -> List[float]:
+        """Embeds a query once so it can be reused across collections (cached)."""
+        with self.instrumentation.span("numpy.embed_query"):
+            embedding = self.query_embedder([query_text])[0]
+        return embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+
+    def semantic_search(
+        self,
+        query_text: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Exact (or IVF) cosine search across all collections.
+        Results are merged with a top-k heap; each hit is its metadata plus
+        ``_id`` and ``_distance``.
+        """
+        query = np.asarray(self.embed_query(query_text), dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self.instrumentation.span("numpy.search"):
+            hits = []
+            for collection in self._collections:
+                try:
+                    hits.extend(collection.search(query, limit, filters))
+                except ValueError as e:
+                    logger.error(f"Search failed in collection {collection.name}: {e}")
+
+        results = []
+        for m_id, distance, metadata in heapq.nsmallest(limit, hits, key=lambda h: h[1]):
+            metadata["_distance"] = distance
+            metadata["_id"] = m_id
+            results.append(metadata)
+        return results
+
+    def delete(self, memory_id: str) -> bool:
+        """Removes the record's vector from every collection."""
+        with self.instrumentation.span("numpy.delete"):
+            for collection in self._collections:
+                collection.delete([memory_id])
+        return True
+
+    def close(self):
+        """Saves a persisted query-embedding cache and releases its exit hook."""
+        if isinstance(self.query_embedder, CachedEmbeddingFunction):
+            self.query_embedder.close()
+
+    def get_storage_type(self) -> str:
+        return "vector_db"
@@ -0,0 +1,243 @@
+"""Record Cache - Byte-bounded LRU of decoded records in front of a record store."""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+from contracts.ports.i_memory_storage import IMemoryStorage
+from msp.instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+def _record_id(data: Dict[str, Any]) -> Optional[str]:
+    return (data.get("turn_id") or
+            data.get("sensory_id") or
+            data.get("episode_id") or
+            data.get("id"))
+
+
+class CachedRecordStore(IMemoryStorage):
+    """
+    Wraps a record store (FileMemoryStore / SegmentLogStore) with an LRU
+    cache of records keyed by memory ID and bounded by size in bytes.
+
+    Entries are kept as compact JSON, which gives exact byte accounting
+    and hands every caller its own copy: hydration adds '_search_score'
+    and crosslink sync patches ref lists in place, neither of which may
+    leak into the cache.
+
+    Coherence: every write made through the wrapper (store, store_many,
+    and the crosslink manager's direct back-link patches) replaces the
+    cached copy after the inner store succeeds; delete() drops it. Records
+    written to the tree by another process are not seen until evicted.
+    A read that raced with a write is returned but not cached.
+
+    Anything not related to ID reads and writes (query, scan_episodes,
+    iter_records, sync, ...) is delegated to the wrapped store.
+    """
+
+    def __init__(
+        self,
+        store: IMemoryStorage,
+        max_bytes: int = 32 * 1024 * 1024,
+        instrumentation: Optional[Instrumentation] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            store: Wrapped record store (source of truth)
+            max_bytes: Cache budget (sum of encoded record sizes)
+            instrumentation: Metrics registry; lookups are reported as
+                ``cache.read`` operations
+        """
+        self._inner = store
+        self.max_bytes = max_bytes
+        self.instrumentation = instrumentation or Instrumentation()
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        # Bumped on every write/delete; fills from older reads are dropped
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def retrieve(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieves a record, from the cache when present."""
+        return self.retrieve_many([memory_id])[0]
+
+    def retrieve_many(self, memory_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieves several records; only misses reach the wrapped store, in
+        one batch. Results keep the order of memory_ids (None for unknown IDs).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(memory_ids)
+        missing: Dict[str, List[int]] = {}
+        with self.instrumentation.span("cache.read") as span:
+            with self._lock:
+                generation = self._generation
+                for i, m_id in enumerate(memory_ids):
+                    payload = self._entries.get(m_id)
+                    if payload is not None:
+                        self._entries.move_to_end(m_id)
+                        self.hits += 1
+                        span.add(cache_hits=1, bytes_cached=len(payload))
+                        results[i] = json.loads(payload)
+                    else:
+                        missing.setdefault(m_id, []).append(i)
+                        self.misses += 1
+        if not missing:
+            return results
+
+        loaded = self._inner.retrieve_many(list(missing))
+        encoded = {}
+        for (m_id, positions), record in zip(missing.items(), loaded):
+            if record is None:
+                continue
+            payload = self._encode(record)
+            for n, i in enumerate(positions):
+                # Duplicate IDs in one call still get independent dicts
+                results[i] = record if n == 0 or payload is None else json.loads(payload)
+            if payload is not None:
+                encoded[m_id] = payload
+        with self._lock:
+            if self._generation == generation:
+                for m_id, payload in encoded.items():
+                    self._put(m_id, payload)
+        return results
+
+    # ------------------------------------------------------------------
+    # Writes (write-through)
+    # ------------------------------------------------------------------
+
+    def store(self, memory_data: Dict[str, Any]) -> str:
+        """Stores a record and caches the written copy."""
+        return self.store_many([memory_data])[0]
+
+    def store_many(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Stores several records and caches the written copies."""
+        try:
+            ids = self._inner.store_many(records)
+        except Exception:
+            # Part of the batch may be on disk; drop every cached copy
+            self.invalidate([_record_id(r) for r in records])
+            raise
+        encoded = [(m_id, self._encode(record)) for m_id, record in zip(ids, records) if m_id]
+        with self._lock:
+            self._generation += 1
+            for m_id, payload in encoded:
+                if payload is None:
+                    self._drop(m_id)
+                else:
+                    self._put(m_id, payload)
+        return ids
+
+    def delete(self, memory_id: str) -> bool:
+        """Deletes a record and drops its cached copy."""
+        try:
+            return self._inner.delete(memory_id)
+        finally:
+            self.invalidate([memory_id])
+
+    def invalidate(self, memory_ids: List[Optional[str]]):
+        """Drops cached copies (e.g. after an out-of-band write)."""
+        with self._lock:
+            self._generation += 1
+            for m_id in memory_ids:
+                if m_id and self._drop(m_id):
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    # ------------------------------------------------------------------
+    # IMemoryStorage / delegation
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 10,
+        offset: int = 0,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
+        return self._inner.query(filters, limit=limit, offset=offset, newest_first=newest_first)
+
+    def semantic_search(
+        self,
+        query_text: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return self._inner.semantic_search(query_text, limit, filters)
+
+    def get_storage_type(self) -> str:
+        return self._inner.get_storage_type()
+
+    def __getattr__(self, item):
+        # iter_records, scan_episodes, sync, rebuild_index, compact, ...
+        if item == "_inner":
+            raise AttributeError(item)
+        return getattr(self._inner, item)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError):
+            # Not JSON-safe (e.g. a datetime in a hand-built record): not cached
+            return None
+
+    def _put(self, memory_id: str, payload: bytes):
+        self._drop(memory_id)
+        if len(payload) > self.max_bytes:
+            return
+        self._entries[memory_id] = payload
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _drop(self, memory_id: str) -> bool:
+        payload = self._entries.pop(memory_id, None)
+        if payload is None:
+            return False
+        self._bytes -= len(payload)
+        return True
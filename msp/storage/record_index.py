@@ -0,0 +1,330 @@
+"""Record Index - Persistent ID -> relative path map for file-based stores."""
+
+import bisect
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# Aliases accepted by query() for the 'type' filter
+TYPE_ALIASES = {
+    "episodic": ("episodic_v3",),
+    "sensory": ("sensory_v1",),
+    "turn": ("turn_user", "turn_llm"),
+}
+
+# Metadata fields with an equality (posting list) index
+INDEXED_FIELDS = ("type", "session_id", "user_id", "persona_id", "tags")
+
+# Range / ordering filters answered from the created_at index
+RANGE_FILTERS = ("since", "until")
+
+
+def extract_meta(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Picks the indexed metadata out of a memory record."""
+    tags = data.get("tags") or []
+    return {
+        "type": data.get("type"),
+        "session_id": data.get("session_id"),
+        "user_id": data.get("user_id"),
+        "persona_id": data.get("persona_id"),
+        "tags": [t for t in tags if isinstance(t, str)],
+        # Semantic facts carry learned_at instead of created_at
+        "created_at": data.get("created_at") or data.get("learned_at") or "",
+    }
+
+
+def _as_iso(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class RecordIndex:
+    """
+    Persistent mapping of memory ID to its path relative to ``base_dir``,
+    plus secondary indexes over record metadata.
+
+    Backed by an append-only journal (one JSON object per line) so that
+    ``put``/``remove`` cost a single small append instead of rewriting the
+    whole index. The journal is replayed into memory on open and compacted
+    by ``rebuild``, or on open once it is mostly superseded entries.
+
+    Secondary indexes (in memory, rebuilt from the journal):
+    - posting lists for type, session_id, user_id, persona_id and tags
+    - a (created_at, id) sorted list for date ranges and ordering
+
+    Journal entries:
+        {"op": "put", "id": "EP_001", "path": "episodes/2026/01/EP_001.json", "meta": {...}}
+        {"op": "del", "id": "EP_001"}
+    """
+
+    JOURNAL_NAME = "record_index.jsonl"
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.index_dir / self.JOURNAL_NAME
+        self._lock = threading.RLock()
+        self._paths: Dict[str, str] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[Any, Set[str]]] = {f: {} for f in INDEXED_FIELDS}
+        self._by_date: List[Tuple[str, str]] = []
+        # True when the journal predates metadata indexing (needs a rebuild)
+        self.missing_meta = False
+        # While bulk loading, the date list is rebuilt once at the end
+        self._bulk = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, memory_id: str) -> Optional[str]:
+        """Returns the relative path for an ID, or None if unknown."""
+        return self._paths.get(memory_id)
+
+    def get_meta(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the indexed metadata for an ID."""
+        return self._meta.get(memory_id)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Snapshot iterator over (id, relative_path) pairs."""
+        with self._lock:
+            return iter(list(self._paths.items()))
+
+    def find(
+        self,
+        filters: Dict[str, Any],
+        limit: Optional[int] = 10,
+        offset: int = 0,
+        newest_first: bool = True
+    ) -> List[str]:
+        """
+        Answers a metadata query from the indexes alone (no file reads).
+
+        Supported filters:
+            type        - record type or alias ('episodic', 'sensory', 'turn')
+            session_id, user_id, persona_id - exact match
+            tags        - tag or list of tags (all must be present)
+            since/until - created_at bounds (ISO string or datetime, inclusive)
+
+        Returns:
+            IDs ordered by created_at, paginated by offset/limit
+        """
+        with self._lock:
+            candidate_sets = []
+            for field in INDEXED_FIELDS:
+                if filters.get(field) is None:
+                    continue
+                value = filters[field]
+                if field == "type":
+                    values = TYPE_ALIASES.get(value, (value,))
+                elif field == "tags":
+                    values = None
+                    for tag in ([value] if isinstance(value, str) else value):
+                        candidate_sets.append(self._postings["tags"].get(tag, set()))
+                    continue
+                else:
+                    values = (value,)
+                merged = set()
+                for v in values:
+                    merged |= self._postings[field].get(v, set())
+                candidate_sets.append(merged)
+
+            lo = _as_iso(filters["since"]) if filters.get("since") is not None else None
+            hi = _as_iso(filters["until"]) if filters.get("until") is not None else None
+
+            if candidate_sets:
+                candidate_sets.sort(key=len)
+                ids = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+                ordered = sorted(((self._meta[i]["created_at"], i) for i in ids), reverse=newest_first)
+                if lo is not None or hi is not None:
+                    ordered = [e for e in ordered
+                               if (lo is None or e[0] >= lo) and (hi is None or e[0] <= hi)]
+            else:
+                # No equality filters: slice the date-ordered list directly
+                start = bisect.bisect_left(self._by_date, (lo,)) if lo is not None else 0
+                end = bisect.bisect_right(self._by_date, (hi, "\uffff")) if hi is not None else len(self._by_date)
+                # Index arithmetic keeps this O(limit) instead of copying the range
+                if newest_first:
+                    hi_pos = end - offset
+                    lo_pos = start if limit is None else max(start, hi_pos - limit)
+                    page = self._by_date[lo_pos:max(lo_pos, hi_pos)][::-1]
+                else:
+                    lo_pos = start + offset
+                    hi_pos = end if limit is None else min(end, lo_pos + limit)
+                    page = self._by_date[lo_pos:max(lo_pos, hi_pos)]
+                return [m_id for _, m_id in page]
+
+            stop = None if limit is None else offset + limit
+            return [m_id for _, m_id in ordered[offset:stop]]
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def put(self, memory_id: str, rel_path: str, meta: Optional[Dict[str, Any]] = None):
+        """Records (or moves) the path and metadata of a memory ID."""
+        self.put_many([(memory_id, rel_path, meta)])
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]):
+        """Records several paths with a single journal append."""
+        lines = []
+        with self._lock:
+            for memory_id, rel_path, meta in entries:
+                meta = meta or extract_meta({})
+                if self._paths.get(memory_id) == rel_path and self._meta.get(memory_id) == meta:
+                    continue
+                self._apply_put(memory_id, rel_path, meta)
+                lines.append({"op": "put", "id": memory_id, "path": rel_path, "meta": meta})
+            self._append(lines)
+
+    def remove(self, memory_id: str) -> bool:
+        """Forgets an ID. Returns True if it was indexed."""
+        with self._lock:
+            if memory_id not in self._paths:
+                return False
+            self._apply_del(memory_id)
+            self._append([{"op": "del", "id": memory_id}])
+            return True
+
+    def rebuild(self, entries: Iterable[Tuple[str, str, Dict[str, Any]]]):
+        """
+        Replaces the whole index (recovery scan) and compacts the journal.
+        The new journal is written to a temp file and swapped in atomically.
+        """
+        with self._lock:
+            self._reset()
+            self._begin_bulk()
+            for memory_id, rel_path, meta in entries:
+                self._apply_put(memory_id, rel_path, meta)
+            self._end_bulk()
+            self._compact()
+            self.missing_meta = False
+        logger.info(f"RecordIndex rebuilt with {len(self._paths)} entries")
+
+    def sync(self):
+        """fsyncs the journal so acknowledged puts survive a crash."""
+        with self._lock:
+            if not self.journal_path.exists():
+                return
+            fd = os.open(self.journal_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # ------------------------------------------------------------------
+    # In-memory index maintenance
+    # ------------------------------------------------------------------
+
+    def _begin_bulk(self):
+        self._bulk = True
+
+    def _end_bulk(self):
+        self._bulk = False
+        self._by_date = sorted((m.get("created_at") or "", m_id) for m_id, m in self._meta.items())
+
+    def _reset(self):
+        self._paths = {}
+        self._meta = {}
+        self._postings = {f: {} for f in INDEXED_FIELDS}
+        self._by_date = []
+
+    def _apply_put(self, memory_id: str, rel_path: str, meta: Dict[str, Any]):
+        if memory_id in self._meta:
+            self._unindex(memory_id)
+        self._paths[memory_id] = rel_path
+        self._meta[memory_id] = meta
+        for field in INDEXED_FIELDS:
+            values = (meta.get(field) or []) if field == "tags" else [meta.get(field)]
+            for v in values:
+                if v is not None:
+                    self._postings[field].setdefault(v, set()).add(memory_id)
+        if not self._bulk:
+            bisect.insort(self._by_date, (meta.get("created_at") or "", memory_id))
+
+    def _apply_del(self, memory_id: str):
+        if memory_id in self._meta:
+            self._unindex(memory_id)
+            del self._meta[memory_id]
+        self._paths.pop(memory_id, None)
+
+    def _unindex(self, memory_id: str):
+        meta = self._meta[memory_id]
+        for field in INDEXED_FIELDS:
+            values = (meta.get(field) or []) if field == "tags" else [meta.get(field)]
+            for v in values:
+                bucket = self._postings[field].get(v)
+                if bucket is not None:
+                    bucket.discard(memory_id)
+                    if not bucket:
+                        del self._postings[field][v]
+        if self._bulk:
+            return
+        key = (meta.get("created_at") or "", memory_id)
+        i = bisect.bisect_left(self._by_date, key)
+        if i < len(self._by_date) and self._by_date[i] == key:
+            del self._by_date[i]
+
+    # ------------------------------------------------------------------
+    # Journal I/O
+    # ------------------------------------------------------------------
+
+    def _append(self, entries):
+        if not entries:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+
+    def _compact(self):
+        tmp_path = self.journal_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for memory_id, rel_path in self._paths.items():
+                f.write(json.dumps({"op": "put", "id": memory_id, "path": rel_path,
+                                    "meta": self._meta[memory_id]}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.journal_path)
+
+    def _load(self):
+        if not self.journal_path.exists():
+            return
+        self._begin_bulk()
+        try:
+            lines = self._replay()
+        finally:
+            self._end_bulk()
+        # Entries without meta are left for the rebuild they trigger
+        if lines > 2 * len(self._paths) + 1024 and not self.missing_meta:
+            self._compact()
+
+    def _replay(self) -> int:
+        lines = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn trailing write after a crash; the recovery scan fixes any gap.
+                    logger.warning(f"Skipping corrupt index journal line {line_no}")
+                    continue
+                if entry.get("op") == "put":
+                    if "meta" not in entry:
+                        self.missing_meta = True
+                    self._apply_put(entry["id"], entry["path"], entry.get("meta") or extract_meta({}))
+                elif entry.get("op") == "del":
+                    self._apply_del(entry["id"])
+        return lines
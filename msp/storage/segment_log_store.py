@@ -0,0 +1,536 @@
+"""Append-only Segment Log Storage (alternative to File-per-Record)."""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from contracts.ports.i_memory_storage import IMemoryStorage
+from msp.storage.record_index import TYPE_ALIASES
+
+logger = logging.getLogger(__name__)
+
+
+def _created_at(record: Dict[str, Any]) -> str:
+    """Ordering key of a record: created_at, or learned_at for semantic facts."""
+    return _as_iso(record.get("created_at") or record.get("learned_at")) or ""
+
+
+def _as_iso(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class SegmentLogStore(IMemoryStorage):
+    """
+    Implementation of IMemoryStorage using rolling append-only segment files.
+
+    Every record (and every tombstone) is one compact JSON line appended to
+    the active segment ``{base_dir}/segments/seg_NNNNNN.log``. When a segment
+    reaches ``segment_max_bytes`` a new one is started. A compact offset
+    index maps each live ID to ``(segment, offset, length, type,
+    created_at)`` so a read is a single positioned read, with no directory
+    walk and no extra inode per record, and query() can order by date
+    without reading records.
+
+    Rewriting a record (e.g. an episode updated by crosslinks) appends a new
+    version; the old bytes become garbage until ``compact()`` copies live
+    records out of sealed segments and removes them.
+
+    Layout:
+        segments/
+        ├── seg_000001.log      # {"op": "put", "id": ..., "rec": {...}}\\n ...
+        ├── seg_000002.log
+        └── index.jsonl         # ["p", id, seg, offset, length, type, created_at] / ["d", id]
+    """
+
+    SEGMENT_DIR = "segments"
+    INDEX_NAME = "index.jsonl"
+
+    def __init__(
+        self,
+        base_dir: str = "memory",
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = False
+    ):
+        """
+        Initialize segment log.
+
+        Args:
+            base_dir: Memory root (segments live in {base_dir}/segments)
+            segment_max_bytes: Size at which the active segment is sealed
+            fsync: fsync the segment after every append batch
+        """
+        self.base_dir = Path(base_dir)
+        self.segment_dir = self.base_dir / self.SEGMENT_DIR
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.segment_dir / self.INDEX_NAME
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, Tuple[int, int, int, str, str]] = {}
+        self._readers: Dict[int, Any] = {}
+
+        if self.index_path.exists():
+            self._load_index()
+        elif self._segment_numbers():
+            self.rebuild_index()
+
+        segments = self._segment_numbers()
+        self._active_seg = segments[-1] if segments else 1
+        self._active_size = self._segment_path(self._active_seg).stat().st_size \
+            if self._segment_path(self._active_seg).exists() else 0
+
+    # ------------------------------------------------------------------
+    # IMemoryStorage
+    # ------------------------------------------------------------------
+
+    def store(self, memory_data: Dict[str, Any]) -> str:
+        """Appends a record to the active segment."""
+        return self.store_many([memory_data])[0]
+
+    def store_many(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Appends several records with one write (group commit)."""
+        ids = []
+        entries = []
+        with self._lock:
+            for record in records:
+                m_id = self._get_id(record)
+                ids.append(m_id)
+                if m_id is None:
+                    logger.warning("Skipping record without an ID")
+                    continue
+                entries.append((m_id, record.get("type", "unknown"),
+                                {"op": "put", "id": m_id, "rec": record}))
+            self._append(entries)
+        return ids
+
+    def retrieve(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Reads the latest version of a record via the offset index."""
+        loc = self._index.get(memory_id)
+        if loc is None:
+            return None
+        return self._read_at(loc[0], loc[1], loc[2])
+
+    def retrieve_many(self, memory_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Reads several records, ordered by (segment, offset) for locality."""
+        locs = [(i, self._index.get(m_id)) for i, m_id in enumerate(memory_ids)]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(memory_ids)
+        for i, loc in sorted((x for x in locs if x[1]), key=lambda x: (x[1][0], x[1][1])):
+            results[i] = self._read_at(loc[0], loc[1], loc[2])
+        return results
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 10,
+        offset: int = 0,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Lists records ordered by created_at (learned_at for facts), like
+        FileMemoryStore.query, so pagination matches across backends.
+        'type' and 'since'/'until' are answered from the index without
+        reading non-matching records; other keys (exact match) are checked
+        on the loaded record.
+        """
+        m_type = filters.get("type")
+        wanted = TYPE_ALIASES.get(m_type, (m_type,)) if m_type else None
+        since = _as_iso(filters.get("since"))
+        until = _as_iso(filters.get("until"))
+        residual = {k: v for k, v in filters.items() if k not in ("type", "since", "until")}
+
+        with self._lock:
+            entries = [
+                (loc[4], m_id, loc) for m_id, loc in self._index.items()
+                if (not wanted or loc[3] in wanted)
+                and (since is None or loc[4] >= since)
+                and (until is None or loc[4] <= until)
+            ]
+        entries.sort(key=lambda e: (e[0], e[1]), reverse=newest_first)
+
+        results = []
+        skipped = 0
+        for _, m_id, (seg, off, length, _, _) in entries:
+            if len(results) >= limit:
+                break
+            record = self._read_at(seg, off, length)
+            if record is None or not self._matches(record, None, None, residual):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            results.append(record)
+        return results
+
+    def scan_episodes(
+        self,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        newest_first: bool = True,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams episodes in created_at order (FileMemoryStore parity).
+        Segments have no date partitions, so this reads every episode once.
+        """
+        episodes = [
+            record for record in (
+                self._read_at(seg, off, length)
+                for seg, off, length, r_type, _ in list(self._index.values())
+                if r_type in TYPE_ALIASES["episodic"]
+            )
+            if record is not None and self._matches(record, since, until, {})
+        ]
+        episodes.sort(key=lambda r: str(r.get("created_at") or ""), reverse=newest_first)
+        yield from episodes[:limit]
+
+    @staticmethod
+    def _matches(record: Dict[str, Any], since, until, residual: Dict[str, Any]) -> bool:
+        created_at = str(record.get("created_at") or record.get("learned_at") or "")
+        if since is not None and created_at < getattr(since, "isoformat", lambda: str(since))():
+            return False
+        if until is not None and created_at > getattr(until, "isoformat", lambda: str(until))():
+            return False
+        for key, value in residual.items():
+            if key == "tags":
+                tags = record.get("tags") or []
+                if any(t not in tags for t in ([value] if isinstance(value, str) else value)):
+                    return False
+            elif record.get(key) != value:
+                return False
+        return True
+
+    def semantic_search(
+        self,
+        query_text: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """SegmentLogStore does not support vector search."""
+        logger.warning("Attempted semantic search on SegmentLogStore. Returning empty list.")
+        return []
+
+    def delete(self, memory_id: str) -> bool:
+        """Appends a tombstone and drops the ID from the index."""
+        with self._lock:
+            if memory_id not in self._index:
+                return False
+            self._append([(memory_id, None, {"op": "del", "id": memory_id})])
+            return True
+
+    def get_storage_type(self) -> str:
+        return "segment_log"
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Streams every live record in (segment, offset) order."""
+        for m_id, loc in sorted(self._index.items(), key=lambda x: (x[1][0], x[1][1])):
+            record = self._read_at(loc[0], loc[1], loc[2])
+            if record is not None:
+                yield record
+
+    def iter_keyed_records(self, after_key: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streams (key, record) in (segment, offset) order for resumable scans.
+        Keys are "SSSSSS/OOOOOOOOOOOO" and sort the same way as the records.
+        """
+        for m_id, loc in sorted(self._index.items(), key=lambda x: (x[1][0], x[1][1])):
+            key = f"{loc[0]:06d}/{loc[1]:012d}"
+            if after_key and key <= after_key:
+                continue
+            record = self._read_at(loc[0], loc[1], loc[2])
+            if record is not None:
+                yield key, record
+
+    def stats(self) -> Dict[str, Any]:
+        """Segment count, live vs total bytes and garbage ratio."""
+        total = sum(self._segment_path(n).stat().st_size for n in self._segment_numbers())
+        live = sum(loc[2] for loc in self._index.values())
+        return {
+            "segments": len(self._segment_numbers()),
+            "records": len(self._index),
+            "total_bytes": total,
+            "live_bytes": live,
+            "garbage_ratio": (1.0 - live / total) if total else 0.0,
+        }
+
+    def compact(self, include_active: bool = False) -> int:
+        """
+        Copies live records out of sealed segments and removes them.
+        Superseded versions and tombstones are dropped.
+
+        Args:
+            include_active: Seal the active segment first so it is compacted too
+
+        Returns:
+            Number of segments reclaimed
+        """
+        with self._lock:
+            if include_active and self._active_size > 0:
+                self._roll()
+            sealed = [n for n in self._segment_numbers() if n != self._active_seg]
+            if not sealed:
+                return 0
+            sealed_set = set(sealed)
+
+            # Start a fresh segment so compacted data never mixes with sealed ones
+            self._roll()
+            moved = [(m_id, loc) for m_id, loc in self._index.items() if loc[0] in sealed_set]
+            moved.sort(key=lambda x: (x[1][0], x[1][1]))
+
+            batch = []
+            for m_id, (seg, off, length, r_type, _) in moved:
+                record = self._read_at(seg, off, length)
+                if record is not None:
+                    batch.append((m_id, r_type, {"op": "put", "id": m_id, "rec": record}))
+                if len(batch) >= 1000:
+                    self._append(batch, journal=False)
+                    batch = []
+            self._append(batch, journal=False)
+
+            # Snapshot the index, then drop the sealed segments
+            self._write_index_snapshot()
+            for n in sealed:
+                reader = self._readers.pop(n, None)
+                if reader:
+                    reader.close()
+                self._segment_path(n).unlink(missing_ok=True)
+
+        logger.info(f"Compacted {len(sealed)} segments ({len(moved)} live records moved)")
+        return len(sealed)
+
+    def rebuild_index(self) -> int:
+        """
+        Recovery scan: rebuilds the offset index by replaying every segment.
+
+        Returns:
+            Number of live records
+        """
+        with self._lock:
+            self._index = {}
+            for n in self._segment_numbers():
+                offset = 0
+                with open(self._segment_path(n), "rb") as f:
+                    for line in f:
+                        length = len(line)
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Torn tail after a crash; later appends start a new line
+                            logger.warning(f"Skipping corrupt entry in segment {n} at {offset}")
+                            offset += length
+                            continue
+                        if entry.get("op") == "put":
+                            rec = entry["rec"]
+                            self._index[entry["id"]] = (n, offset, length, rec.get("type", "unknown"),
+                                                        _created_at(rec))
+                        elif entry.get("op") == "del":
+                            self._index.pop(entry["id"], None)
+                        offset += length
+            self._write_index_snapshot()
+        return len(self._index)
+
+    def sync(self, memory_ids: Optional[List[str]] = None):
+        """
+        Durability barrier: fsyncs the segments holding the given records
+        (the active segment if none are given) and the offset index.
+        """
+        with self._lock:
+            segments = {self._active_seg}
+            for m_id in memory_ids or []:
+                loc = self._index.get(m_id)
+                if loc:
+                    segments.add(loc[0])
+            for path in [self._segment_path(n) for n in segments] + [self.index_path]:
+                if not path.exists():
+                    continue
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def close(self):
+        """Closes cached segment readers."""
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers = {}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _get_id(data: Dict[str, Any]) -> Optional[str]:
+        return (data.get("turn_id") or
+                data.get("sensory_id") or
+                data.get("episode_id") or
+                data.get("id"))
+
+    def _segment_path(self, n: int) -> Path:
+        return self.segment_dir / f"seg_{n:06d}.log"
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(p.stem.split("_")[1]) for p in self.segment_dir.glob("seg_*.log"))
+
+    def _roll(self):
+        self._active_seg += 1
+        self._active_size = 0
+
+    def _append(self, entries: List[Tuple[str, Optional[str], Dict[str, Any]]], journal: bool = True):
+        """Encodes entries and appends them to the active segment(s)."""
+        if not entries:
+            return
+        index_lines = []
+        buf = bytearray()
+
+        def flush():
+            nonlocal buf
+            if not buf:
+                return
+            with open(self._segment_path(self._active_seg), "ab") as f:
+                f.write(buf)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            buf = bytearray()
+
+        for m_id, r_type, entry in entries:
+            line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            if self._active_size > 0 and self._active_size + len(line) > self.segment_max_bytes:
+                flush()
+                self._roll()
+            offset = self._active_size
+            buf += line
+            self._active_size += len(line)
+
+            if entry["op"] == "put":
+                created_at = _created_at(entry["rec"])
+                self._index[m_id] = (self._active_seg, offset, len(line), r_type, created_at)
+                index_lines.append(["p", m_id, self._active_seg, offset, len(line), r_type, created_at])
+            else:
+                self._index.pop(m_id, None)
+                index_lines.append(["d", m_id])
+        flush()
+
+        if journal:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n"
+                                for e in index_lines))
+
+    def _write_index_snapshot(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for m_id, (seg, off, length, r_type, created_at) in self._index.items():
+                f.write(json.dumps(["p", m_id, seg, off, length, r_type, created_at],
+                                   ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.index_path)
+
+    def _load_index(self):
+        legacy = False
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt segment index line")
+                    continue
+                if entry[0] == "p":
+                    created_at = entry[6] if len(entry) > 6 else None
+                    legacy = legacy or created_at is None
+                    self._index[entry[1]] = (entry[2], entry[3], entry[4], entry[5], created_at)
+                elif entry[0] == "d":
+                    self._index.pop(entry[1], None)
+        if legacy:
+            # Index written before created_at was tracked: backfill it once
+            for m_id, (seg, off, length, r_type, created_at) in list(self._index.items()):
+                if created_at is None:
+                    record = self._read_at(seg, off, length)
+                    self._index[m_id] = (seg, off, length, r_type, _created_at(record or {}))
+            self._write_index_snapshot()
+
+    def _read_at(self, seg: int, offset: int, length: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            reader = self._readers.get(seg)
+            if reader is None:
+                try:
+                    reader = open(self._segment_path(seg), "rb")
+                except FileNotFoundError:
+                    return None
+                self._readers[seg] = reader
+            raw = os.pread(reader.fileno(), length, offset)
+        return json.loads(raw)["rec"]
+
+
+def migrate_from_file_store(
+    source_dir: str,
+    target_dir: Optional[str] = None,
+    batch_size: int = 500,
+    segment_max_bytes: int = 64 * 1024 * 1024
+) -> int:
+    """
+    Copies every record of a FileMemoryStore tree into a SegmentLogStore.
+    Source files are left untouched.
+
+    Args:
+        source_dir: FileMemoryStore base_dir (episodes/, turns/, semantic/, misc/)
+        target_dir: SegmentLogStore base_dir (defaults to source_dir)
+        batch_size: Records per append batch
+        segment_max_bytes: Segment roll-over size
+
+    Returns:
+        Number of migrated records
+    """
+    from msp.storage.file_memory_store import FileMemoryStore
+
+    source = FileMemoryStore(base_dir=source_dir)
+    target = SegmentLogStore(base_dir=target_dir or source_dir, segment_max_bytes=segment_max_bytes)
+
+    migrated = 0
+    batch = []
+    for _, path in source._scan_records():
+        try:
+            record = source._read(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Skipping unreadable record {path}: {e}")
+            continue
+        if record is None:
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            target.store_many(batch)
+            migrated += len(batch)
+            batch = []
+    if batch:
+        target.store_many(batch)
+        migrated += len(batch)
+
+    target.close()
+    logger.info(f"Migrated {migrated} records from {source_dir} to segment log")
+    return migrated
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate a file-per-record MSP tree to a segment log.")
+    parser.add_argument("source_dir", help="Existing FileMemoryStore base_dir")
+    parser.add_argument("target_dir", nargs="?", help="SegmentLogStore base_dir (default: source_dir)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    count = migrate_from_file_store(args.source_dir, args.target_dir, batch_size=args.batch_size)
+    print(f"Migrated {count} records.")
@@ -0,0 +1,57 @@
+"""Where Filter - Chroma-style metadata predicates evaluated in Python."""
+
+from typing import Dict, Any, Optional
+
+_MISSING = object()
+
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    if value is _MISSING:
+        return False
+    if op == "$in":
+        return any(_compare(value, "$eq", a) for a in arg)
+    if op == "$nin":
+        return not any(_compare(value, "$eq", a) for a in arg)
+    if op in ("$eq", "$ne"):
+        # Chroma keeps bools and numbers apart (True does not match 1)
+        equal = isinstance(value, bool) == isinstance(arg, bool) and value == arg
+        return equal if op == "$eq" else not equal
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        if op == "$lte":
+            return value <= arg
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported where operator '{op}'")
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluates a Chroma ``where`` filter against one metadata dict.
+
+    Supports implicit equality ({"type": "semantic"}), the comparison
+    operators $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin and nesting with $and/$or.
+    A field missing from the metadata never matches (also for $ne/$nin),
+    and several top-level fields are combined with AND.
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key, _MISSING)
+            if not all(_compare(value, op, arg) for op, arg in condition.items()):
+                return False
+        elif not _compare(metadata.get(key, _MISSING), "$eq", condition):
+            return False
+    return True
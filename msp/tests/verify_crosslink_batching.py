@@ -0,0 +1,82 @@
+"""Verification script for incremental, batched CrosslinkManager back-links."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.crosslink_manager import CrosslinkManager
+from msp.storage.file_memory_store import FileMemoryStore
+
+
+class CountingStore(FileMemoryStore):
+    """FileMemoryStore that counts reads and writes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = []
+        self.reads = 0
+
+    def store_many(self, records):
+        self.writes.append([r.get("episode_id") or r.get("id") for r in records])
+        return super().store_many(records)
+
+    def retrieve_many(self, memory_ids):
+        self.reads += len(memory_ids)
+        return super().retrieve_many(memory_ids)
+
+
+def verify_crosslink_batching():
+    print("Verifying incremental CrosslinkManager...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_xlink_"))
+    try:
+        store = CountingStore(base_dir=str(test_dir))
+        manager = CrosslinkManager(storage=store, record_store=store, cache_size=2)
+        for ep in ("EP_X1", "EP_X2"):
+            store.store({"episode_id": ep, "type": "episodic_v3", "created_at": "2026-01-01T00:00:00"})
+        store.writes.clear()
+
+        # 1. Many back-links in one batch -> one write per episode
+        batch = [
+            {"type": "semantic", "id": f"SEM_X{i}", "subject": "User", "predicate": "p", "object": str(i),
+             "episode_refs": ["EP_X1", "EP_X2"] if i % 2 else ["EP_X1"]}
+            for i in range(6)
+        ]
+        batch.append({"type": "sensory_v1", "sensory_id": "SM_X1", "episode_id": "EP_X1"})
+        manager.sync_batch(batch)
+        assert store.writes == [["EP_X1", "EP_X2"]], store.writes
+        ep1 = store.retrieve("EP_X1")
+        assert ep1["semantic_refs"] == [f"SEM_X{i}" for i in range(6)]
+        assert ep1["sensory_refs"] == ["SM_X1"]
+        assert store.retrieve("EP_X2")["semantic_refs"] == ["SEM_X1", "SEM_X3", "SEM_X5"]
+        print("[PASS] Back-links coalesced into one write per episode")
+
+        # 2. Hot cache: the next batch does not re-read the episodes
+        reads = store.reads
+        manager.sync_links({"type": "semantic", "id": "SEM_X9", "subject": "User", "predicate": "p",
+                            "object": "9", "episode_refs": ["EP_X1"]})
+        assert store.reads == reads
+        assert manager.stats["cache_hits"] >= 1
+        assert "SEM_X9" in store.retrieve("EP_X1")["semantic_refs"]
+        print("[PASS] Hot episode cache avoids re-reads")
+
+        # 3. Already-linked facts cause no write
+        store.writes.clear()
+        manager.sync_batch(batch)
+        assert store.writes == []
+        print("[PASS] Idempotent re-sync writes nothing")
+
+        # 4. Missing episodes are skipped; cache is bounded
+        manager.sync_links({"type": "sensory_v1", "sensory_id": "SM_X2", "episode_id": "EP_MISSING"})
+        assert len(manager._hot) <= 2
+        manager.invalidate()
+        assert not manager._hot
+        print("[PASS] Missing episodes skipped, cache bounded/invalidated")
+
+        print("\n=== Crosslink batching verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_crosslink_batching()
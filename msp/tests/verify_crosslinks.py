@@ -65,6 +65,27 @@ def verify_crosslinks():
     assert "SEM_001" in updated_ep.get("semantic_refs", [])
     print("[PASS] Semantic back-link verified")
 
+    # 6. Back-links in one batch are coalesced into a single episode write
+    print("Step 6: Storing two facts for EP_001 in one batch...")
+    writes_before = engine.crosslink_manager.stats["episode_writes"]
+    engine.store_many([
+        SemanticMemory(id="SEM_002", subject="User", predicate="likes", object="tea",
+                       episode_refs=["EP_001"]).to_dict(),
+        SemanticMemory(id="SEM_003", subject="User", predicate="likes", object="rain",
+                       episode_refs=["EP_001"]).to_dict(),
+    ])
+    updated_ep = engine.retrieve("EP_001")
+    assert {"SEM_001", "SEM_002", "SEM_003"} <= set(updated_ep["semantic_refs"])
+    assert "SM_001" in updated_ep["sensory_refs"]
+    assert engine.crosslink_manager.stats["episode_writes"] == writes_before + 1
+    assert engine.crosslink_manager.stats["cache_hits"] > 0
+    print("[PASS] Coalesced back-link write served from hot cache")
+
+    # 7. Related context comes from the link index
+    related_ids = {r.get("sensory_id") or r.get("id") for r in engine.related(["EP_001"], hops=1)}
+    assert {"SM_001", "SEM_001", "SEM_002", "SEM_003"} <= related_ids
+    print("[PASS] related() expansion hydrated from link index")
+
     # Clean up
     # shutil.rmtree(test_repo)
     print("\n=== Crosslink Manager verification passed! ===")
@@ -0,0 +1,145 @@
+"""Verification script for the incremental, exactly-once WisdomDistiller."""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from msp.modules.distill_scheduler import DistillScheduler
+from msp.modules.distiller import DistillLedger, WisdomDistiller
+
+
+def _snapshot(base: Path, i: int) -> Path:
+    path = base / "session_memory" / f"session_S{i:03d}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"session_id": f"S{i:03d}", "history": []}), encoding="utf-8")
+    return path
+
+
+def verify_distill_ledger():
+    print("Verifying WisdomDistiller ledger...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_distill_"))
+    try:
+        engine = SimpleNamespace(base_dir=str(test_dir))
+        distiller = WisdomDistiller(engine)
+
+        # 1. Each session is consumed once
+        for i in range(1, 9):
+            distiller.record_session(_snapshot(test_dir, i))
+            distiller.check_and_distill()
+        distiller.check_and_distill()
+        cores = sorted((test_dir / "core_memory").glob("core_*.json"))
+        assert [p.stem for p in cores] == ["core_001"]
+        assert distiller.ledger.pending["session"] == []
+        print("[PASS] 8 sessions -> exactly one core")
+
+        # 2. Ledger survives a restart; no re-distillation
+        distiller = WisdomDistiller(engine)
+        distiller.record_session(test_dir / "session_memory" / "session_S001.json")
+        distiller.check_and_distill()
+        assert len(list((test_dir / "core_memory").glob("core_*.json"))) == 1
+        print("[PASS] Restart does not re-distill consumed sessions")
+
+        # 3. A crash between writing a core and committing the ledger redoes the same core
+        for i in range(9, 17):
+            distiller.record_session(_snapshot(test_dir, i))
+        with mock.patch.object(DistillLedger, "save", side_effect=OSError("disk full")):
+            try:
+                distiller.check_and_distill()
+            except OSError:
+                pass
+        distiller = WisdomDistiller(engine)
+        distiller.check_and_distill()
+        cores = sorted(p.stem for p in (test_dir / "core_memory").glob("core_*.json"))
+        assert cores == ["core_001", "core_002"], cores
+        with open(test_dir / "core_memory" / "core_002.json", encoding="utf-8") as f:
+            assert json.load(f)["source_sessions"][0] == "session_S009"
+
+        # Crash after the reservation is durable: the group resumes under its ID
+        for i in range(17, 25):
+            distiller.record_session(_snapshot(test_dir, i))
+        with mock.patch.object(WisdomDistiller, "_distill_sessions_to_core", side_effect=RuntimeError("crash")):
+            try:
+                distiller.check_and_distill()
+            except RuntimeError:
+                pass
+        distiller = WisdomDistiller(engine)
+        assert list(distiller.ledger.in_flight) == ["core_003"]
+        distiller.check_and_distill()
+        assert distiller.ledger.in_flight == {}
+        assert len(list((test_dir / "core_memory").glob("core_*.json"))) == 3
+        print("[PASS] Crash recovery is exactly-once")
+
+        # 4. Background scheduler: 40 more sessions -> 8 cores -> 1 sphere
+        scheduler = DistillScheduler(distiller)
+        for i in range(25, 65):
+            distiller.record_session(_snapshot(test_dir, i))
+            scheduler.kick()
+        assert scheduler.wait_idle(timeout=10)
+        assert len(list((test_dir / "core_memory").glob("core_*.json"))) == 8
+        assert [p.stem for p in (test_dir / "sphere_memory").glob("sphere_*.json")] == ["sphere_001"]
+        assert distiller.ledger.pending["core"] == []
+        scheduler.close()
+        print("[PASS] Background scheduler distills cores and sphere")
+
+        # 5. Trees from before the ledger are bootstrapped from core sources
+        (test_dir / ".index" / DistillLedger.LEDGER_NAME).unlink()
+        for i in range(65, 68):
+            _snapshot(test_dir, i)
+        legacy = WisdomDistiller(engine)
+        assert legacy.ledger.pending["session"] == ["session_S065", "session_S066", "session_S067"]
+        assert legacy.ledger.next_id == {"core": 9, "sphere": 2}
+        print("[PASS] Ledger bootstrapped from an existing tree")
+
+        # 6. Appends cost O(new units); gaps in numbering never reuse an ID
+        journal = test_dir / ".index" / DistillLedger.LEDGER_NAME
+        size = journal.stat().st_size
+        legacy.record_session(_snapshot(test_dir, 68))
+        assert journal.stat().st_size - size < 100
+        (test_dir / "core_memory" / "core_003.json").unlink()
+        journal.unlink()
+        assert WisdomDistiller(engine).ledger.next_id["core"] == 9
+        print("[PASS] Append-only journal and gap-safe numbering")
+
+        # 7. A single-file ledger from older versions is migrated
+        state = {"pending": {"session": ["session_S099"], "core": []},
+                 "consumed": {"session": ["session_S001"], "core": []},
+                 "in_flight": {}, "next_id": {"core": 12, "sphere": 3}}
+        journal.unlink()
+        (test_dir / ".index" / DistillLedger.LEGACY_NAME).write_text(json.dumps(state), encoding="utf-8")
+        migrated = DistillLedger(journal)
+        assert migrated.pending["session"] == ["session_S099"] and migrated.next_id["core"] == 12
+        assert journal.exists() and not (test_dir / ".index" / DistillLedger.LEGACY_NAME).exists()
+        assert DistillLedger(journal).consumed["session"] == {"session_S001"}
+        print("[PASS] Legacy ledger migrated")
+
+        # 8. Rewriting a distilled session queues it again (unchanged re-announces do not)
+        base = test_dir / "resnap"
+        distiller = WisdomDistiller(SimpleNamespace(base_dir=str(base)))
+        for i in range(8):
+            distiller.record_session(_snapshot(base, i))
+        distiller.check_and_distill()
+        assert "session_S000" in distiller.ledger.consumed["session"]
+        distiller.record_session(base / "session_memory" / "session_S000.json")
+        assert distiller.ledger.pending["session"] == []
+        path = _snapshot(base, 0)
+        path.write_text(json.dumps({"session_id": "S000", "history": [{"role": "user", "content": "v2"}]}),
+                        encoding="utf-8")
+        distiller.record_session(path)
+        assert distiller.ledger.pending["session"] == ["session_S000"]
+        assert "session_S000" not in distiller.ledger.consumed["session"]
+        reopened = WisdomDistiller(SimpleNamespace(base_dir=str(base)))
+        assert reopened.ledger.pending["session"] == ["session_S000"]
+        assert "session_S000" not in reopened.ledger.consumed["session"]
+        print("[PASS] Re-snapshots of consumed sessions are distilled again")
+
+        print("\n=== Distill ledger verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_distill_ledger()
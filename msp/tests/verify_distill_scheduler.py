@@ -0,0 +1,130 @@
+"""Verification script for the background 8-8-8 DistillScheduler."""
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from msp.modules.distill_scheduler import DistillScheduler, backfill
+from msp.modules.distiller import WisdomDistiller
+from msp.modules.session_distill import SessionSummarizer
+
+REPO_TREE = Path(__file__).resolve().parents[2] / "memory_888_test"
+
+
+def _snapshot(base: Path, name: str) -> Path:
+    path = base / "session_memory" / f"session_{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    history = [{"role": "user", "content": f"hello from {name}"}]
+    path.write_text(json.dumps({"session_id": name, "history": history}), encoding="utf-8")
+    return path
+
+
+class _SlowSummarizer(SessionSummarizer):
+    """Records how many summaries run at once."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def summarize_chunk(self, summary, turns):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return "slow"
+
+
+def verify_distill_scheduler():
+    print("Verifying DistillScheduler...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_distill_sched_"))
+    try:
+        # 1. kick() never blocks; cores run concurrently up to max_workers
+        summarizer = _SlowSummarizer()
+        distiller = WisdomDistiller(SimpleNamespace(base_dir=str(test_dir / "a")), summarizer=summarizer)
+        scheduler = DistillScheduler(distiller, max_workers=3)
+        for i in range(64):
+            distiller.record_session(_snapshot(test_dir / "a", f"S{i:03d}"))
+        started = time.perf_counter()
+        assert scheduler.kick() == 8
+        assert time.perf_counter() - started < 0.05
+        metrics = scheduler.metrics()
+        assert metrics["in_flight"] == 8 and metrics["queue_depth"] == 8
+        assert scheduler.wait_idle(timeout=10)
+        assert 1 < summarizer.peak <= 3, summarizer.peak
+        print(f"[PASS] Non-blocking kick, peak concurrency {summarizer.peak}/3")
+
+        # 2. Cores cascade into a sphere without another snapshot
+        assert (test_dir / "a" / "sphere_memory" / "sphere_001.json").exists()
+        metrics = scheduler.metrics()
+        assert metrics["completed"] == {"core": 8, "sphere": 1}
+        assert metrics["queue_depth"] == 0 and metrics["active_jobs"] == 0
+        print("[PASS] Core -> Sphere cascade")
+
+        # 3. Queue depth and lag of units waiting for a full group
+        for i in range(64, 67):
+            distiller.record_session(_snapshot(test_dir / "a", f"S{i:03d}"))
+        time.sleep(0.02)
+        assert scheduler.kick() == 0
+        metrics = scheduler.metrics()
+        assert metrics["pending"] == {"session": 3, "core": 0}
+        assert metrics["queue_depth"] == 3
+        assert metrics["lag_s"]["session"] >= 0.02
+        scheduler.close()
+        assert scheduler.kick() == 0
+        print("[PASS] Queue depth and lag metrics")
+
+        # 4. A failed job stays reserved and is retried under the same ID
+        distiller = WisdomDistiller(SimpleNamespace(base_dir=str(test_dir / "b")))
+        scheduler = DistillScheduler(distiller, max_workers=2)
+        for i in range(8):
+            distiller.record_session(_snapshot(test_dir / "b", f"S{i:03d}"))
+        with mock.patch.object(WisdomDistiller, "_distill_sessions_to_core", side_effect=RuntimeError("boom")):
+            scheduler.kick()
+            assert scheduler.wait_idle(timeout=5)
+        assert scheduler.metrics()["failed"] == 1
+        assert list(distiller.ledger.in_flight) == ["core_001"]
+        assert scheduler.kick() == 1
+        assert scheduler.wait_idle(timeout=5)
+        assert distiller.ledger.in_flight == {}
+        assert (test_dir / "b" / "core_memory" / "core_001.json").exists()
+        scheduler.close()
+        print("[PASS] Failed job retried under its reserved ID")
+
+        # 5. Dry-run backfill over a memory_888_test-style tree writes nothing
+        tree = test_dir / "tree"
+        shutil.copytree(REPO_TREE, tree, ignore=shutil.ignore_patterns("vector_db"))
+        for i in range(9, 17):
+            _snapshot(tree, f"SESS_{i:03d}")
+        before = sorted(str(p.relative_to(tree)) for p in tree.rglob("*"))
+        report = backfill(str(tree), dry_run=True)
+        assert sorted(str(p.relative_to(tree)) for p in tree.rglob("*")) == before
+        plan = report["plan"]
+        assert [c["id"] for c in plan["core"]] == ["core_002"]
+        assert plan["core"][0]["sources"][0] == "session_SESS_009"
+        assert plan["sphere"] == []
+        print("[PASS] Dry-run backfill plans without writing")
+
+        # 6. Real backfill produces exactly the planned units
+        report = backfill(str(tree), dry_run=False, timeout=10)
+        assert (tree / "core_memory" / "core_002.json").exists()
+        assert report["metrics"]["completed"]["core"] == 1
+        assert backfill(str(tree), dry_run=True)["plan"]["core"] == []
+        print("[PASS] Backfill distills the plan")
+
+        print("\n=== DistillScheduler verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_distill_scheduler()
@@ -0,0 +1,108 @@
+"""Verification script for the query-embedding cache."""
+
+import atexit
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from msp.msp_engine import MSPEngine
+from msp.storage.embedding_cache import CachedEmbeddingFunction
+from msp.storage.hash_embedding import HashEmbeddingFunction
+
+
+class CountingEmbedder:
+    """Deterministic stand-in for a real embedding model."""
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        self.texts += len(input)
+        return [[float(len(t)), float(sum(map(ord, t)) % 97)] for t in input]
+
+    @staticmethod
+    def name():
+        return "counting-v1"
+
+
+def verify_embedding_cache():
+    print("Verifying CachedEmbeddingFunction...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_embcache_"))
+    try:
+        inner = CountingEmbedder()
+        cache = CachedEmbeddingFunction(inner, max_entries=2, persist_path=str(test_dir / "cache.json"))
+
+        # 1. NFC-equivalent repeats are hits; case and spacing are kept
+        cache(["caf\u00e9 EVA"])
+        cache(["cafe\u0301 EVA"])
+        assert inner.texts == 1
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        assert cache(["Apple"]) != cache(["apple"]) and inner.texts == 3
+        folded = CachedEmbeddingFunction(CountingEmbedder(), casefold=True)
+        folded(["Hello  EVA"])
+        folded(["  hello eva "])
+        assert folded.stats()["hits"] == 1
+        print("[PASS] Normalized repeats served from cache (case folding opt-in)")
+
+        # 2. Misses in one call are batched; LRU evicts oldest
+        cache(["a", "b", "a"])
+        assert inner.calls == 4 and inner.texts == 5
+        assert cache.stats()["entries"] == 2
+        print("[PASS] Batched misses and LRU eviction")
+
+        # 3. Warm restart from disk
+        cache.save()
+        warm_inner = CountingEmbedder()
+        warm = CachedEmbeddingFunction(warm_inner, max_entries=2, persist_path=str(test_dir / "cache.json"))
+        warm(["b"])
+        assert warm_inner.texts == 0
+        refolded = CachedEmbeddingFunction(CountingEmbedder(), max_entries=2, casefold=True,
+                                           persist_path=str(test_dir / "cache.json"))
+        assert refolded.stats()["entries"] == 0
+        print("[PASS] Persisted cache survives restart")
+
+        # 4. TTL expiry
+        ttl = CachedEmbeddingFunction(CountingEmbedder(), ttl_seconds=0.01)
+        ttl(["x"])
+        time.sleep(0.02)
+        ttl(["x"])
+        assert ttl.stats()["misses"] == 2
+        print("[PASS] Expired entries are re-embedded")
+
+        # 5. close() saves and releases the exit hook, also through MSPEngine and its shards
+        hooks = set()
+        with mock.patch.object(atexit, "register", side_effect=hooks.add), \
+                mock.patch.object(atexit, "unregister", side_effect=hooks.discard):
+            closing = CachedEmbeddingFunction(CountingEmbedder(), persist_path=str(test_dir / "closing.json"))
+            closing(["x"])
+            assert hooks == {closing.save}
+            closing.close()
+            closing.close()
+            assert not hooks and (test_dir / "closing.json").exists()
+            engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                               vector_backend="numpy", embedding_function=HashEmbeddingFunction(dim=64),
+                               persist_query_cache=True, shard_by=("user_id",), max_open_shards=2)
+            for i in range(20):
+                engine.store({"type": "episodic_v3", "episode_id": f"EP_HOOK_{i:02d}", "user_id": f"user{i}",
+                              "summary": {"content": "jazz piano"}})
+                engine.semantic_search("jazz", limit=1, filters={"user_id": f"user{i}"})
+            caches = {h for h in hooks if isinstance(getattr(h, "__self__", None), CachedEmbeddingFunction)}
+            assert len(caches) <= 3, len(caches)
+            engine.close()
+            assert not {h for h in hooks if isinstance(getattr(h, "__self__", None), CachedEmbeddingFunction)}
+        assert (test_dir / "engine" / "vector_db" / "query_embedding_cache.json").exists()
+        assert (test_dir / "engine" / "tenants" / "user19" / "vector_db" / "query_embedding_cache.json").exists()
+        print("[PASS] close() persists the cache without leaking exit hooks")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+    print("\n=== Embedding cache verification passed! ===")
+
+
+if __name__ == "__main__":
+    verify_embedding_cache()
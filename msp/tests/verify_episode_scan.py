@@ -0,0 +1,80 @@
+"""Verification script for time-range episode scans over the year/month layout."""
+
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.storage.segment_log_store import SegmentLogStore
+
+
+def _episode(year: int, month: int, day: int):
+    ep_id = f"EP_SCAN_{year}{month:02d}{day:02d}"
+    return {
+        "episode_id": ep_id,
+        "type": "episodic_v3",
+        "created_at": f"{year}-{month:02d}-{day:02d}T09:00:00",
+    }
+
+
+def verify_episode_scan():
+    print("Verifying FileMemoryStore.scan_episodes...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_scan_"))
+    try:
+        store = FileMemoryStore(base_dir=str(test_dir))
+        dates = [(2025, 11, 3), (2025, 12, 24), (2026, 1, 2), (2026, 1, 20), (2026, 2, 14), (2026, 3, 1)]
+        for d in dates:
+            store.store(_episode(*d))
+
+        # 1. Newest first across years/months
+        ids = [r["episode_id"] for r in store.scan_episodes()]
+        assert ids == [_episode(*d)["episode_id"] for d in reversed(dates)], ids
+        print("[PASS] Recency order")
+
+        # 2. Range bounds (inclusive), oldest first
+        ranged = store.scan_episodes(since="2025-12-01", until=datetime(2026, 1, 20, 9, 0), newest_first=False)
+        assert [r["episode_id"] for r in ranged] == ["EP_SCAN_20251224", "EP_SCAN_20260102", "EP_SCAN_20260120"]
+        print("[PASS] since/until bounds")
+
+        # 3. "Last N" only opens the newest partitions
+        opened = []
+        real_scandir = __import__("os").scandir
+
+        def tracking_scandir(path):
+            opened.append(Path(path))
+            return real_scandir(path)
+
+        with mock.patch("msp.storage.file_memory_store.os.scandir", side_effect=tracking_scandir):
+            last_two = list(store.scan_episodes(limit=2))
+        assert [r["episode_id"] for r in last_two] == ["EP_SCAN_20260301", "EP_SCAN_20260214"]
+        month_dirs = {p.relative_to(test_dir).as_posix() for p in opened if len(p.relative_to(test_dir).parts) == 3}
+        assert month_dirs == {"episodes/2026/03", "episodes/2026/02"}, month_dirs
+        print("[PASS] limit stops before older partitions")
+
+        # 4. Pruned range never lists other years
+        opened.clear()
+        with mock.patch("msp.storage.file_memory_store.os.scandir", side_effect=tracking_scandir):
+            this_month = list(store.scan_episodes(since="2026-02-01"))
+        assert len(this_month) == 2
+        assert not any("2025" in p.as_posix() for p in opened)
+        print("[PASS] Out-of-range partitions pruned")
+
+        # 5. Segment backend parity
+        seg = SegmentLogStore(base_dir=str(test_dir / "seg"))
+        for d in dates:
+            seg.store(_episode(*d))
+        assert [r["episode_id"] for r in seg.scan_episodes(since="2026-01-01", limit=2)] == \
+            ["EP_SCAN_20260301", "EP_SCAN_20260214"]
+        seg.close()
+        print("[PASS] SegmentLogStore parity")
+
+        print("\n=== Episode scan verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_episode_scan()
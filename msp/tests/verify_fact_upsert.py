@@ -0,0 +1,50 @@
+"""Verification script for semantic fact deduplication (MSPEngine.upsert_fact)."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.msp_engine import MSPEngine
+from msp.schema.semantic import SemanticMemory
+
+
+def verify_fact_upsert():
+    print("Verifying semantic fact upsert...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_facts_"))
+    try:
+        engine = MSPEngine(base_dir=str(test_dir))
+
+        first = SemanticMemory(subject="User", predicate="likes", object="Jazz", episode_refs=["EP_F1"])
+        fact_id = engine.upsert_fact(first.to_dict())
+        assert fact_id == SemanticMemory.content_id("User", "likes", "Jazz")
+        stored = engine.retrieve(fact_id)
+        assert stored["confidence"] == 0.8
+        print("[PASS] First observation stored under content ID")
+
+        # 1. Repeats (different case/whitespace) merge into the same record
+        again = SemanticMemory(subject="user", predicate="likes", object=" jazz", episode_refs=["EP_F2"])
+        assert engine.upsert_fact(again.to_dict()) == fact_id
+        engine.upsert_fact(SemanticMemory(subject="User", predicate="likes", object="Jazz",
+                                          episode_refs=["EP_F2"]).to_dict())
+        merged = engine.retrieve(fact_id)
+        assert merged["episode_refs"] == ["EP_F1", "EP_F2"]
+        assert 0.8 < merged["confidence"] < 1.0
+        assert merged["learned_at"] >= stored["learned_at"]
+        assert merged["object"] == "Jazz"  # first surface form is kept
+        print(f"[PASS] Merged refs, confidence {stored['confidence']} -> {merged['confidence']}")
+
+        # 2. Store and index grow with distinct facts only
+        engine.upsert_fact(SemanticMemory(subject="User", predicate="likes", object="Rain").to_dict())
+        files = list((test_dir / "semantic").rglob("*.json"))
+        assert len(files) == 2, files
+        assert engine.vector_store.semantic_collection.count() == 2
+        print("[PASS] One file and one vector per distinct fact")
+
+        print("\n=== Fact upsert verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_fact_upsert()
@@ -0,0 +1,47 @@
+"""Verification script for HashEmbeddingFunction and the benchmark corpus."""
+
+import math
+
+from msp.benchmarks.bench_msp import generate_corpus, latency_stats
+from msp.storage.hash_embedding import HashEmbeddingFunction
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def verify_hash_embedding():
+    print("Verifying HashEmbeddingFunction...")
+
+    # 1. Deterministic, unit-length, seed-dependent
+    embed = HashEmbeddingFunction(dim=128)
+    a, b = embed(["Thai cooking tonight", "thai  COOKING tonight"])
+    assert a == b
+    assert abs(math.sqrt(sum(v * v for v in a)) - 1.0) < 1e-9
+    assert HashEmbeddingFunction(dim=128)(["Thai cooking tonight"])[0] == a
+    assert HashEmbeddingFunction(dim=128, seed=1)(["Thai cooking tonight"])[0] != a
+    assert len(embed([""])[0]) == 128
+    assert embed.name() == "hash-128-0"
+    print("[PASS] Deterministic unit vectors")
+
+    # 2. Word overlap drives similarity
+    query, near, far = embed(["guitar chords practice", "practice guitar chords daily", "monthly budget review"])
+    assert _cosine(query, near) > _cosine(query, far)
+    print("[PASS] Overlap ranks above unrelated text")
+
+    # 3. Benchmark corpus is reproducible and covers every record kind
+    first = list(generate_corpus(400, seed=7))
+    assert first == list(generate_corpus(400, seed=7))
+    assert first != list(generate_corpus(400, seed=8))
+    kinds = {r["type"] for r in first}
+    assert kinds == {"turn_user", "turn_llm", "sensory_v1", "semantic", "episodic_v3"}, kinds
+    assert 350 <= len(first) <= 450
+    stats = latency_stats([0.001 * i for i in range(1, 101)])
+    assert stats["p50_ms"] == 51.0 and stats["max_ms"] == 100.0
+    print("[PASS] Deterministic benchmark corpus")
+
+    print("\n=== HashEmbeddingFunction verification passed! ===")
+
+
+if __name__ == "__main__":
+    verify_hash_embedding()
@@ -0,0 +1,106 @@
+"""Verification script for MSP memory access instrumentation."""
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from msp.instrumentation import Instrumentation
+from msp.msp_engine import MSPEngine
+from msp.schema.turn import TurnUser
+from msp.storage.file_memory_store import FileMemoryStore
+
+
+def _turn(i: int):
+    return TurnUser(
+        turn_id=f"TU_METRICS_{i:03d}",
+        episode_id="EP_METRICS_01",
+        text_excerpt=f"Instrumented message number {i}",
+        intent="testing"
+    ).to_dict()
+
+
+def verify_instrumentation():
+    print("Verifying instrumentation...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_metrics_"))
+    try:
+        # 1. Histogram, quantiles and errors
+        metrics = Instrumentation(enabled=True, buckets=(0.001, 0.01, 0.1))
+        for seconds in (0.0005, 0.0005, 0.005, 0.05, 0.5):
+            metrics.record("demo", seconds)
+        try:
+            with metrics.span("demo"):
+                raise RuntimeError("fail")
+        except RuntimeError:
+            pass
+        demo = metrics.snapshot()["demo"]
+        assert demo["count"] == 6 and demo["errors"] == 1
+        assert demo["buckets"] == {"0.001": 3, "0.01": 4, "0.1": 5, "+Inf": 6}
+        assert demo["p50_s"] == 0.001 and demo["p99_s"] == float("inf")
+        print("[PASS] Histogram buckets, quantiles and errors")
+
+        # 2. FileMemoryStore reports bytes and files per operation
+        metrics = Instrumentation(enabled=True)
+        store = FileMemoryStore(base_dir=str(test_dir / "files"), instrumentation=metrics)
+        store.store_many([_turn(i) for i in range(5)])
+        on_disk = sum(p.stat().st_size for p in (test_dir / "files" / "turns").rglob("*.json"))
+        store.retrieve_many([f"TU_METRICS_{i:03d}" for i in range(5)])
+        store.query({"type": "turn"}, limit=2)
+        store.delete("TU_METRICS_004")
+        snap = metrics.snapshot()
+        assert snap["file.write"]["count"] == 1
+        assert snap["file.write"]["files"] == 5 and snap["file.write"]["bytes_written"] == on_disk
+        assert snap["file.read"]["files"] == 7 and snap["file.read"]["bytes_read"] > 0
+        assert snap["file.query"]["count"] == 1
+        assert snap["file.delete"]["files"] == 1
+        print("[PASS] File store bytes/files accounting")
+
+        # 3. Prometheus text dump
+        text = metrics.to_prometheus()
+        assert "# TYPE msp_op_latency_seconds histogram" in text
+        assert 'msp_op_latency_seconds_bucket{op="file.read",le="+Inf"} 7' in text
+        assert f'msp_op_bytes_written_total{{op="file.write"}} {on_disk}' in text
+        assert 'msp_op_files_total{op="file.delete"} 1' in text
+        print("[PASS] Prometheus export")
+
+        # 4. Disabled instrumentation records nothing and costs little
+        off = Instrumentation()
+        store = FileMemoryStore(base_dir=str(test_dir / "off"), instrumentation=off)
+        store.store(_turn(0))
+        assert off.snapshot() == {}
+        started = time.perf_counter()
+        for _ in range(100000):
+            with off.span("noop") as span:
+                span.add(bytes_read=1)
+        per_call = (time.perf_counter() - started) / 100000
+        assert per_call < 5e-6, per_call
+        print(f"[PASS] Disabled overhead {per_call * 1e9:.0f} ns/span")
+
+        # 5. MSPEngine phases share the registry with its stores
+        metrics = Instrumentation(enabled=True)
+        engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                           instrumentation=metrics)
+        engine.store(_turn(1))
+        engine.retrieve("TU_METRICS_001")
+        engine.query({"type": "turn"})
+        engine.semantic_search("instrumented message", limit=1)
+        engine.delete("TU_METRICS_001")
+        snap = engine.export_metrics()
+        for op in ("engine.store", "engine.commit.records", "engine.commit.vectors",
+                   "engine.commit.crosslinks", "engine.retrieve", "engine.query",
+                   "engine.semantic_search", "engine.search.vector", "engine.search.hydrate",
+                   "engine.delete", "file.write", "file.read", "chroma.upsert",
+                   "chroma.embed_query", "chroma.search", "chroma.delete"):
+            assert snap.get(op, {}).get("count", 0) >= 1, op
+        assert engine.export_metrics("prometheus").startswith("# HELP")
+        engine.close()
+        print("[PASS] Engine, file and Chroma operations instrumented")
+
+        print("\n=== Instrumentation verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_instrumentation()
@@ -0,0 +1,107 @@
+"""Verification script for the BM25 lexical index and hybrid search."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.msp_engine import MSPEngine
+from msp.schema.semantic import SemanticMemory
+from msp.schema.turn import TurnUser
+from msp.storage.hash_embedding import HashEmbeddingFunction
+from msp.storage.lexical_index import LexicalIndex, reciprocal_rank_fusion
+
+
+class _CountingEmbedding(HashEmbeddingFunction):
+    def __init__(self):
+        super().__init__(dim=64)
+        self.calls = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        return super().__call__(input)
+
+
+def _turn(i: int, text: str, episode: str = "EP_LEX_01"):
+    return TurnUser(
+        turn_id=f"TU_LEX_{i:03d}",
+        episode_id=episode,
+        text_excerpt=text,
+        intent="testing"
+    ).to_dict()
+
+
+def verify_lexical_index():
+    print("Verifying LexicalIndex...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_lexical_"))
+    try:
+        # 1. BM25 ranking: rare terms and identifiers dominate
+        index = LexicalIndex(test_dir / "idx")
+        index.index_records([
+            _turn(0, "we talked about the parse_config function"),
+            _turn(1, "we talked about the weather"),
+            _turn(2, "we talked about dinner and the weather"),
+            {"type": "sensory_v1", "sensory_id": "SM_LEX_01"},
+        ])
+        assert len(index) == 3
+        assert index.search("parse_config", limit=5)[0][0] == "TU_LEX_000"
+        ranked = [m_id for m_id, _ in index.search("weather dinner", limit=5)]
+        assert ranked == ["TU_LEX_002", "TU_LEX_001"], ranked
+        assert index.search("nothing matches", limit=5) == []
+        print("[PASS] BM25 ranking")
+
+        # 2. Journal replay; unchanged re-index writes nothing; remove
+        size = index.journal_path.stat().st_size
+        index.index_records([_turn(1, "we talked about the weather")])
+        assert index.journal_path.stat().st_size == size
+        index.remove("TU_LEX_001")
+        reopened = LexicalIndex(test_dir / "idx")
+        assert len(reopened) == 2 and [m for m, _ in reopened.search("weather")] == ["TU_LEX_002"]
+        reopened.index_records([_turn(2, "")])
+        assert len(reopened) == 1 and reopened.search("weather") == []
+        assert LexicalIndex(test_dir / "idx").search("weather") == []
+        print("[PASS] Journal replay and removal (including records whose text became empty)")
+
+        # 3. Weighted reciprocal-rank fusion
+        fused = reciprocal_rank_fusion([(["a", "b"], 1.0), (["b", "c"], 1.0)], k=60)
+        assert [m for m, _ in fused] == ["b", "a", "c"]
+        assert [m for m, _ in reciprocal_rank_fusion([(["a"], 1.0), (["c"], 2.0)])] == ["c", "a"]
+        print("[PASS] Reciprocal-rank fusion")
+
+        # 4. Engine: hybrid search, keyword lookups without embedding, filters, delete
+        embed = _CountingEmbedding()
+        engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                           vector_backend="numpy", embedding_function=embed)
+        engine.upsert_fact(SemanticMemory(subject="User", predicate="name is", object="Somchai").to_dict())
+        engine.store_many([_turn(i, t) for i, t in enumerate(
+            ["Somchai fixed the parse_config bug", "lunch plans for friday", "the weather is nice"])])
+
+        calls = embed.calls
+        facts = engine.keyword_search("my name is", limit=1)
+        assert facts[0]["object"] == "Somchai" and embed.calls == calls
+        hybrid = engine.semantic_search("parse_config", limit=2)
+        assert hybrid[0]["turn_id"] == "TU_LEX_000" and "_rrf_score" in hybrid[0]
+        only_turns = engine.semantic_search("Somchai", limit=5, filters={"type": "turn_user"})
+        assert [r["turn_id"] for r in only_turns][:1] == ["TU_LEX_000"]
+        assert all(r["type"] == "turn_user" for r in only_turns)
+        engine.delete("TU_LEX_000")
+        assert all(r.get("turn_id") != "TU_LEX_000" for r in engine.keyword_search("parse_config"))
+        engine.close()
+        print("[PASS] Hybrid and keyword search in MSPEngine")
+
+        # 5. Existing trees are indexed on first open; lexical_weight=0 is vector-only
+        (test_dir / "engine" / ".index" / LexicalIndex.JOURNAL_NAME).unlink()
+        engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                           vector_backend="numpy", embedding_function=embed, lexical_weight=0.0)
+        assert len(engine.lexical_index) == 3
+        assert all("_rrf_score" not in r for r in engine.semantic_search("weather", limit=3))
+        engine.close()
+        print("[PASS] Rebuild on open and vector-only weighting")
+
+        print("\n=== LexicalIndex verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_lexical_index()
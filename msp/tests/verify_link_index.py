@@ -0,0 +1,99 @@
+"""Verification script for the persistent link adjacency index."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.crosslink_manager import CrosslinkManager
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.storage.link_index import LinkIndex
+
+
+def verify_link_index():
+    print("Verifying LinkIndex...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_links_"))
+    try:
+        store = FileMemoryStore(base_dir=str(test_dir))
+        links = LinkIndex(test_dir / ".index")
+        manager = CrosslinkManager(storage=store, record_store=store, link_index=links)
+
+        def put(records):
+            store.store_many(records)
+            manager.sync_batch(records)
+
+        put([
+            {"type": "episodic_v3", "episode_id": "EP_A", "turn_refs": ["TU_A1"], "created_at": "2026-01-01T00:00:00"},
+            {"type": "episodic_v3", "episode_id": "EP_B", "created_at": "2026-01-02T00:00:00"},
+            {"type": "episodic_v3", "episode_id": "EP_C", "created_at": "2026-01-03T00:00:00"},
+        ])
+        put([
+            {"type": "sensory_v1", "sensory_id": "SM_A1", "episode_id": "EP_A"},
+            {"type": "semantic", "id": "SEM_1", "subject": "User", "predicate": "likes", "object": "tea",
+             "episode_refs": ["EP_A", "EP_B"]},
+            {"type": "semantic", "id": "SEM_2", "subject": "User", "predicate": "likes", "object": "rain",
+             "episode_refs": ["EP_B", "EP_C"]},
+        ])
+
+        # 1. Forward and reverse lookups without reading records
+        out = links.links("EP_A")
+        assert out == {"turn_refs": ["TU_A1"], "sensory_refs": ["SM_A1"], "semantic_refs": ["SEM_1"]}, out
+        assert links.links("EP_B", direction="in")["episode_refs"] == ["SEM_1", "SEM_2"]
+        assert links.neighbors("SEM_1") == ["EP_A", "EP_B"]
+        print("[PASS] Bidirectional adjacency")
+
+        # 2. Multi-hop: episode -> facts -> other episodes
+        hops = dict(links.expand(["EP_A"], hops=2))
+        assert hops["SEM_1"] == 1 and hops["EP_B"] == 2 and "EP_C" not in hops
+        assert dict(links.expand(["EP_A"], hops=4))["EP_C"] == 4
+        print("[PASS] Multi-hop expansion")
+
+        # 3. Bounded fan-out and node cap
+        assert len(links.expand(["EP_A"], hops=1, fan_out=1)) == 2
+        assert len(links.expand(["EP_A"], hops=4, max_nodes=3)) == 3
+        assert [n for n, _ in links.expand(["EP_B"], hops=1, relations=["episode_refs"])] == ["EP_B", "SEM_1", "SEM_2"]
+        print("[PASS] Fan-out, node cap and relation filter")
+
+        # 4. Persisted and replayed; removal drops both directions
+        reopened = LinkIndex(test_dir / ".index")
+        assert reopened.links("EP_A") == out
+        reopened.remove("SEM_1")
+        assert "SEM_1" not in reopened.neighbors("EP_A")
+        assert "semantic_refs" not in reopened.links("EP_A")
+        assert LinkIndex(test_dir / ".index").neighbors("EP_B") == ["SEM_2"]
+        print("[PASS] Journal replay and node removal")
+
+        # 5. Rebuild from the record store matches incremental maintenance
+        rebuilt = LinkIndex(test_dir / "rebuilt")
+        rebuilt.rebuild(store.iter_records())
+        assert rebuilt.links("EP_A") == out
+        assert rebuilt.links("EP_C", direction="both") == {"episode_refs": ["SEM_2"], "semantic_refs": ["SEM_2"]}
+        print("[PASS] Rebuild from records")
+
+        # 6. Re-stores journal deltas; shrunk refs and moved parents drop old edges
+        journal = test_dir / ".index" / LinkIndex.JOURNAL_NAME
+        size = journal.stat().st_size
+        many = [f"SEM_X{i:02d}" for i in range(50)]
+        put([{"type": "episodic_v3", "episode_id": "EP_C", "semantic_refs": many, "created_at": "2026-01-03T00:00:00"}])
+        grown = journal.stat().st_size
+        put([{"type": "episodic_v3", "episode_id": "EP_C", "semantic_refs": many + ["SEM_2"],
+              "created_at": "2026-01-03T00:00:00"}])
+        assert journal.stat().st_size - grown < 120 and grown - size > 50 * 8
+        put([{"type": "episodic_v3", "episode_id": "EP_C", "semantic_refs": ["SEM_2"],
+              "created_at": "2026-01-03T00:00:00"}])
+        assert links.links("EP_C")["semantic_refs"] == ["SEM_2"] and not links.links("SEM_X00", direction="in")
+        put([{"type": "sensory_v1", "sensory_id": "SM_A1", "episode_id": "EP_B"}])
+        assert "sensory_refs" not in links.links("EP_A") and links.links("EP_B")["sensory_refs"] == ["SM_A1"]
+        assert links.links("SM_A1", direction="in") == {"sensory_refs": ["EP_B"]}
+        replayed = LinkIndex(test_dir / ".index")
+        assert replayed.links("EP_C") == {"semantic_refs": ["SEM_2"]}
+        assert replayed.links("SM_A1", direction="in") == {"sensory_refs": ["EP_B"]}
+        print("[PASS] Delta journal and stale edge removal")
+
+        print("\n=== LinkIndex verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_link_index()
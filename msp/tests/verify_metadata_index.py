@@ -0,0 +1,103 @@
+"""Verification script for the FileMemoryStore metadata indexes."""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.storage.segment_log_store import SegmentLogStore
+
+
+def _episode(i: int, session: str, user: str, tags):
+    return {
+        "id": f"EP_META_{i:03d}",
+        "episode_id": f"EP_META_{i:03d}",
+        "type": "episodic_v3",
+        "session_id": session,
+        "user_id": user,
+        "persona_id": "EVA",
+        "tags": tags,
+        "created_at": f"2026-01-{i + 1:02d}T10:00:00",
+    }
+
+
+def verify_metadata_index():
+    print("Verifying FileMemoryStore metadata indexes...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_meta_"))
+    try:
+        store = FileMemoryStore(base_dir=str(test_dir))
+        for i in range(10):
+            store.store(_episode(i, f"S{i % 2}", "alice" if i < 6 else "bob",
+                                 ["work"] if i % 3 == 0 else ["home"]))
+        store.store({"id": "TU_META_001", "turn_id": "TU_META_001", "type": "turn_user", "episode_id": "EP_META_000",
+                     "session_id": "S0", "created_at": "2026-01-05T11:00:00"})
+
+        # 1. Equality filters come from posting lists
+        ids = [r["id"] for r in store.query({"type": "episodic", "session_id": "S0"}, limit=50)]
+        assert ids == ["EP_META_008", "EP_META_006", "EP_META_004", "EP_META_002", "EP_META_000"], ids
+        assert [r["id"] for r in store.query({"user_id": "bob", "tags": "work"})] == ["EP_META_009", "EP_META_006"]
+        assert store.query({"type": "turn"})[0]["id"] == "TU_META_001"
+        print("[PASS] type/session/user/tags filters")
+
+        # 2. Date range and ordering
+        ranged = store.query({"type": "episodic", "since": "2026-01-03", "until": "2026-01-05T23:59:59"},
+                             limit=50, newest_first=False)
+        assert [r["id"] for r in ranged] == ["EP_META_002", "EP_META_003", "EP_META_004"]
+        print("[PASS] since/until range, oldest first")
+
+        # 3. Pagination
+        page1 = store.query({}, limit=4)
+        page2 = store.query({}, limit=4, offset=4)
+        assert [r["id"] for r in page1] == ["EP_META_009", "EP_META_008", "EP_META_007", "EP_META_006"]
+        assert [r["id"] for r in page2] == ["EP_META_005", "TU_META_001", "EP_META_004", "EP_META_003"]
+        print("[PASS] offset/limit pagination")
+
+        # 4. Unindexed keys are post-filtered
+        store.store({**_episode(20, "S9", "carol", []), "mood": "calm"})
+        assert [r["id"] for r in store.query({"mood": "calm"})] == ["EP_META_020"]
+        print("[PASS] Residual exact-match filter")
+
+        # 5. Overwrite and delete keep postings consistent
+        store.store(_episode(1, "S0", "alice", ["work"]))
+        assert "EP_META_001" in [r["id"] for r in store.query({"session_id": "S0", "tags": ["work"]}, limit=50)]
+        assert "EP_META_001" not in [r["id"] for r in store.query({"session_id": "S1"}, limit=50)]
+        store.delete("EP_META_001")
+        assert "EP_META_001" not in [r["id"] for r in store.query({"tags": "work"}, limit=50)]
+        print("[PASS] Overwrite/delete update postings")
+
+        # 6. Indexes survive a reopen
+        reopened = FileMemoryStore(base_dir=str(test_dir))
+        assert [r["id"] for r in reopened.query({"user_id": "bob", "tags": "work"})] == ["EP_META_009", "EP_META_006"]
+        print("[PASS] Metadata indexes persisted across instances")
+
+        # 7. A journal written before metadata indexing triggers a rebuild
+        journal = test_dir / ".index" / "record_index.jsonl"
+        legacy = []
+        for line in journal.read_text(encoding="utf-8").splitlines():
+            entry = json.loads(line)
+            entry.pop("meta", None)
+            legacy.append(json.dumps(entry))
+        journal.write_text("\n".join(legacy) + "\n", encoding="utf-8")
+        upgraded = FileMemoryStore(base_dir=str(test_dir))
+        assert not upgraded.index.missing_meta
+        assert [r["id"] for r in upgraded.query({"session_id": "S1", "user_id": "bob"})] == ["EP_META_009", "EP_META_007"]
+        print("[PASS] Legacy journal upgraded by rebuild")
+
+        # 8. SegmentLogStore accepts the same query shape
+        seg = SegmentLogStore(base_dir=str(test_dir / "seg"))
+        for i in range(5):
+            seg.store(_episode(i, "S0", "alice", ["work"]))
+        assert [r["id"] for r in seg.query({"type": "episodic", "since": "2026-01-02"}, limit=2, offset=1)] == \
+            ["EP_META_003", "EP_META_002"]
+        seg.close()
+        print("[PASS] SegmentLogStore query parity")
+
+        print("\n=== Metadata index verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_metadata_index()
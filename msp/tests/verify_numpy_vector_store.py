@@ -0,0 +1,113 @@
+"""Verification script for NumpyVectorStore (in-process vector backend)."""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from msp.msp_engine import MSPEngine
+from msp.schema.turn import TurnUser
+from msp.storage.hash_embedding import HashEmbeddingFunction
+from msp.storage.numpy_vector_store import NumpyVectorStore, VectorCollection
+from msp.storage.where_filter import matches_where
+
+
+def _turn(i: int, text: str, episode: str = "EP_NP_01"):
+    record = TurnUser(
+        turn_id=f"TU_NP_{i:03d}",
+        episode_id=episode,
+        text_excerpt=text,
+        intent="testing"
+    ).to_dict()
+    record["rank"] = i
+    return record
+
+
+def verify_numpy_vector_store():
+    print("Verifying NumpyVectorStore...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_numpy_vec_"))
+    try:
+        # 1. Chroma where semantics
+        meta = {"type": "turn_user", "rank": 3, "flag": True}
+        assert matches_where(meta, {"type": "turn_user"})
+        assert matches_where(meta, {"rank": {"$gte": 3, "$lt": 4}})
+        assert matches_where(meta, {"$or": [{"rank": {"$in": [1, 2]}}, {"flag": True}]})
+        assert not matches_where(meta, {"$and": [{"type": "turn_user"}, {"rank": {"$ne": 3}}]})
+        assert not matches_where(meta, {"missing": {"$ne": "x"}})
+        assert not matches_where(meta, {"flag": 1}) and not matches_where(meta, {"rank": {"$gt": "a"}})
+        print("[PASS] where operators")
+
+        # 2. Store, exact search with filters, upsert and delete
+        store = NumpyVectorStore(str(test_dir / "vec"), embedding_function=HashEmbeddingFunction(dim=64))
+        texts = ["guitar chords practice", "monthly budget review", "thai cooking tonight",
+                 "practice guitar scales", "budget spreadsheet"]
+        store.store_many([_turn(i, t) for i, t in enumerate(texts)])
+        assert store.turns_collection.count() == 5
+        hits = store.semantic_search("guitar chords", limit=2)
+        assert [h["_id"] for h in hits] == ["TU_NP_000", "TU_NP_003"], hits
+        assert 0.0 <= hits[0]["_distance"] < hits[1]["_distance"]
+        filtered = store.semantic_search("guitar chords", limit=2, filters={"rank": {"$gte": 1}})
+        assert filtered[0]["_id"] == "TU_NP_003" and all(h["rank"] >= 1 for h in filtered)
+        store.store_many([_turn(0, "budget for the new guitar")], upsert=True)
+        store.store(_turn(1, "ignored: add keeps existing ids"))
+        assert store.retrieve("TU_NP_000")["text_excerpt"] == "budget for the new guitar"
+        assert store.retrieve("TU_NP_001")["text_excerpt"] == "monthly budget review"
+        assert len(store.query({"rank": {"$lt": 2}}, limit=10)) == 2
+        store.delete("TU_NP_004")
+        assert store.retrieve("TU_NP_004") is None and store.turns_collection.count() == 4
+        print("[PASS] Exact search, filters, upsert, delete")
+
+        # 3. Reopen from the memory-mapped matrix + journal; deleted rows are reused
+        reopened = NumpyVectorStore(str(test_dir / "vec"), embedding_function=HashEmbeddingFunction(dim=64))
+        assert reopened.turns_collection.count() == 4
+        assert reopened.semantic_search("guitar practice", limit=1)[0]["_id"] == "TU_NP_003"
+        reopened.store(_turn(5, "weekend hiking plan"))
+        assert reopened.turns_collection._rows["TU_NP_005"] == 4
+        print("[PASS] Persistence and row reuse")
+
+        # 4. Approximate (IVF) search agrees with exact search on clustered data
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(20, 32))
+        vectors = centers[rng.integers(0, 20, 4000)] + 0.1 * rng.normal(size=(4000, 32))
+        ids = [f"V{i}" for i in range(4000)]
+        metas = [{"bucket": i % 4} for i in range(4000)]
+        exact = VectorCollection(test_dir / "exact", "c")
+        approx = VectorCollection(test_dir / "approx", "c", approximate=True, nprobe=8, ivf_min_rows=1000)
+        exact.add(ids, vectors.tolist(), metas)
+        approx.add(ids, vectors.tolist(), metas)
+        recall = 0
+        for q in vectors[:50]:
+            q = (q / np.linalg.norm(q)).astype(np.float32)
+            truth = {h[0] for h in exact.search(q, 10)}
+            recall += len(truth & {h[0] for h in approx.search(q, 10)})
+        assert approx._centroids is not None and recall / 500 >= 0.9, recall / 500
+        q = (vectors[0] / np.linalg.norm(vectors[0])).astype(np.float32)
+        assert [h[0] for h in approx.search(q, 5, {"bucket": 3})] == [h[0] for h in exact.search(q, 5, {"bucket": 3})]
+        print(f"[PASS] IVF recall@10 {recall / 500:.2f}")
+
+        # 5. Selectable at MSPEngine construction without importing chromadb
+        sys.modules.pop("chromadb", None)
+        engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                           vector_backend="numpy", embedding_function=HashEmbeddingFunction())
+        engine.store(_turn(7, "learning to bake sourdough bread"))
+        results = engine.semantic_search("sourdough bread", limit=1)
+        assert results[0]["turn_id"] == "TU_NP_007" and "_search_score" in results[0]
+        assert isinstance(engine.vector_store, NumpyVectorStore) and "chromadb" not in sys.modules
+        engine.close()
+        try:
+            MSPEngine(base_dir=str(test_dir / "bad"), vector_backend="faiss")
+            raise AssertionError("unknown vector_backend accepted")
+        except ValueError:
+            pass
+        print("[PASS] MSPEngine(vector_backend='numpy')")
+
+        print("\n=== NumpyVectorStore verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_numpy_vector_store()
@@ -0,0 +1,86 @@
+"""Verification script for recency/salience/resonance re-ranking."""
+
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from msp.modules.ranking import MemoryRanker, RankingWeights, decode_e9, e9_vector
+from msp.msp_engine import MSPEngine
+from msp.schema.episodic import EpisodicMemory, StructuredSummary
+from msp.storage.hash_embedding import HashEmbeddingFunction
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+def _hit(name: str, distance: float, age_days: float, **extra):
+    return {"id": name, "_search_score": distance,
+            "created_at": (NOW - timedelta(days=age_days)).isoformat(), **extra}
+
+
+def verify_ranking():
+    print("Verifying MemoryRanker...")
+
+    # 1. E9 decoding from tags, flat dicts and bus snapshots
+    assert decode_e9("[E9-4555M62575080601590]") == [0.45, 0.55, 1.0, 0.62, 0.57, 0.5, 0.8, 0.6, 0.15, 0.9]
+    assert decode_e9("no tag") is None
+    nested = e9_vector({"bus:psychological": {"stress_load": 0.7, "joy_level": 0.2}})
+    assert nested[1] == 0.7 and nested[5] == 0.2 and np.isnan(nested[0])
+    assert e9_vector({"bus:x": {"tag": "[E9-00000000000000000000]"}}).sum() == 0.0
+    print("[PASS] E9 state extraction")
+
+    # 2. Recency and salience reorder hits of similar relevance
+    ranker = MemoryRanker()
+    hits = [
+        _hit("stale", 0.30, 400, importance=0.2),
+        _hit("fresh", 0.32, 1, importance=0.9),
+        _hit("unknown", 0.31, 10),
+    ]
+    ranked = ranker.rerank(list(hits), limit=3, now=NOW)
+    assert [h["id"] for h in ranked] == ["fresh", "unknown", "stale"], [h["id"] for h in ranked]
+    assert ranked[0]["_rank_score"] > ranked[1]["_rank_score"]
+    relevance_only = MemoryRanker(RankingWeights(recency=0, salience=0, resonance=0))
+    assert [h["id"] for h in relevance_only.rerank(list(hits), limit=1, now=NOW)] == ["stale"]
+    print("[PASS] Recency and salience")
+
+    # 3. State resonance prefers memories formed in a similar state
+    calm = {"bus:psychological": {"stress_load": 0.1, "joy_level": 0.9}}
+    tense = {"bus:psychological": {"stress_load": 0.9, "joy_level": 0.1}}
+    pool = [_hit("tense", 0.3, 5, state_snapshot=tense), _hit("calm", 0.3, 5, state_snapshot=calm)]
+    assert ranker.rerank(list(pool), 1, state={"stress_load": 0.2, "joy_level": 0.8}, now=NOW)[0]["id"] == "calm"
+    assert ranker.rerank(list(pool), 1, state="[E9-00900000100000000000]", now=NOW)[0]["id"] == "tense"
+    assert ranker.rerank(list(pool), 1, now=NOW)[0]["id"] == "tense"  # no state: search order kept
+    print("[PASS] E9 resonance")
+
+    # 4. Vectorized over large pools
+    big = [_hit(f"m{i}", (i % 100) / 100, i % 365, importance=(i % 10) / 10) for i in range(20000)]
+    scores = ranker.score(big, state=calm, now=NOW)
+    assert scores.shape == (20000,) and np.isfinite(scores).all()
+    print("[PASS] Vectorized scoring")
+
+    # 5. MSPEngine.recall returns fewer, re-ranked items
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_ranking_"))
+    try:
+        engine = MSPEngine(base_dir=str(test_dir), background_distillation=False,
+                           vector_backend="numpy", embedding_function=HashEmbeddingFunction())
+        for i, age in enumerate((300, 2)):
+            engine.store(EpisodicMemory(
+                episode_id=f"EP_RANK_{i}",
+                created_at=datetime.now() - timedelta(days=age),
+                summary=StructuredSummary(content="we planned the garden beds together"),
+            ).to_dict())
+        results = engine.recall("planning the garden", limit=1)
+        assert len(results) == 1 and results[0]["episode_id"] == "EP_RANK_1"
+        assert "_rank_score" in results[0]
+        engine.close()
+        print("[PASS] MSPEngine.recall")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+    print("\n=== Ranking verification passed! ===")
+
+
+if __name__ == "__main__":
+    verify_ranking()
@@ -0,0 +1,105 @@
+"""Verification script for the record cache (CachedRecordStore in MSPEngine)."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.instrumentation import Instrumentation
+from msp.msp_engine import MSPEngine
+from msp.schema.episodic import EpisodicMemory, StructuredSummary
+from msp.schema.semantic import SemanticMemory
+from msp.schema.turn import TurnUser
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.storage.hash_embedding import HashEmbeddingFunction
+from msp.storage.record_cache import CachedRecordStore
+
+
+def _turn(i: int, text: str = "we talked about the garden"):
+    return TurnUser(turn_id=f"TU_CACHE_{i:03d}", episode_id="EP_CACHE_01", text_excerpt=text).to_dict()
+
+
+def _file_reads(metrics: Instrumentation) -> int:
+    return metrics.snapshot().get("file.read", {}).get("count", 0)
+
+
+def verify_record_cache():
+    print("Verifying CachedRecordStore...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_record_cache_"))
+    try:
+        # 1. Misses fill the cache; hits return independent copies
+        metrics = Instrumentation(enabled=True)
+        inner = FileMemoryStore(base_dir=str(test_dir / "store"), instrumentation=metrics)
+        inner.store_many([_turn(i) for i in range(3)])
+        cache = CachedRecordStore(inner, max_bytes=1 << 20, instrumentation=metrics)
+        first = cache.retrieve_many(["TU_CACHE_000", "TU_CACHE_001", "missing"])
+        assert first[2] is None and _file_reads(metrics) == 2
+        first[0]["_search_score"] = 0.1
+        again = cache.retrieve_many(["TU_CACHE_000", "TU_CACHE_001"])
+        assert "_search_score" not in again[0] and _file_reads(metrics) == 2
+        stats = cache.stats()
+        assert stats["hits"] == 2 and stats["misses"] == 3 and stats["entries"] == 2
+        print(f"[PASS] Read-through with copy isolation (hit rate {stats['hit_rate']:.2f})")
+
+        # 2. Byte budget evicts least recently used entries
+        size = stats["bytes"] // 2
+        small = CachedRecordStore(inner, max_bytes=2 * size + size // 2)
+        small.retrieve_many(["TU_CACHE_000", "TU_CACHE_001"])
+        small.retrieve("TU_CACHE_000")
+        small.retrieve("TU_CACHE_002")
+        stats = small.stats()
+        assert stats["entries"] == 2 and stats["evictions"] == 1 and stats["bytes"] <= stats["max_bytes"]
+        assert set(small._entries) == {"TU_CACHE_000", "TU_CACHE_002"}
+        print("[PASS] LRU eviction by size")
+
+        # 3. Engine: write-through on store, crosslink patches and delete
+        metrics = Instrumentation(enabled=True)
+        engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                           vector_backend="numpy", embedding_function=HashEmbeddingFunction(dim=64),
+                           instrumentation=metrics)
+        engine.store(EpisodicMemory(episode_id="EP_CACHE_01",
+                                    summary=StructuredSummary(content="garden day")).to_dict())
+        engine.store_many([_turn(i) for i in range(4)])
+        reads = _file_reads(metrics)
+        assert engine.retrieve("EP_CACHE_01")["semantic_refs"] == []
+        fact_id = engine.upsert_fact(SemanticMemory(subject="User", predicate="likes", object="gardens",
+                                                    episode_refs=["EP_CACHE_01"]).to_dict())
+        assert fact_id in engine.retrieve("EP_CACHE_01")["semantic_refs"]
+        engine.store(_turn(0, "we replanted the tomatoes"))
+        assert engine.retrieve("TU_CACHE_000")["text_excerpt"] == "we replanted the tomatoes"
+        assert _file_reads(metrics) == reads
+        assert engine.delete("TU_CACHE_001") and engine.retrieve("TU_CACHE_001") is None
+        print("[PASS] Write-through, back-link patches and delete invalidation")
+
+        # 4. Repeated hydration stays off the filesystem
+        ids = [f"TU_CACHE_{i:03d}" for i in (0, 2, 3)]
+        for _ in range(3):
+            engine.semantic_search("garden tomatoes", limit=5)
+            engine.related(["EP_CACHE_01"])
+            assert [r["turn_id"] for r in engine.retrieve_many(ids)] == ids
+        assert _file_reads(metrics) == reads
+        stats = engine.cache_metrics()
+        assert stats["hit_rate"] > 0.9 and stats["invalidations"] >= 1
+        cache_read = metrics.snapshot()["cache.read"]
+        assert cache_read["cache_hits"] == stats["hits"] and cache_read["bytes_cached"] > 0
+        assert cache_read["bytes_read"] == 0
+        engine.close()
+        print(f"[PASS] Hydration from cache ({stats['hits']} hits, {stats['bytes']} bytes)")
+
+        # 5. record_cache_bytes=0 reads the record store directly
+        engine = MSPEngine(base_dir=str(test_dir / "engine"), background_distillation=False,
+                           vector_backend="numpy", embedding_function=HashEmbeddingFunction(dim=64),
+                           record_cache_bytes=0)
+        assert engine.record_cache is None and isinstance(engine.record_store, FileMemoryStore)
+        assert engine.retrieve("TU_CACHE_000")["text_excerpt"] == "we replanted the tomatoes"
+        assert engine.cache_metrics()["hits"] == 0
+        engine.close()
+        print("[PASS] Cache disabled")
+
+        print("\n=== Record cache verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_record_cache()
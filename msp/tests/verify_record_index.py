@@ -0,0 +1,82 @@
+"""Verification script for the FileMemoryStore ID index."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.schema.turn import TurnUser
+from msp.schema.semantic import SemanticMemory
+
+
+def verify_record_index():
+    print("Verifying FileMemoryStore ID index...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_index_"))
+    try:
+        store = FileMemoryStore(base_dir=str(test_dir))
+
+        # 1. Store populates the index
+        turn = TurnUser(turn_id="TU_IDX_001", episode_id="EP_IDX_001", text_excerpt="Index me")
+        fact = SemanticMemory(id="SEM_IDX_001", subject="User", predicate="likes", object="tea")
+        store.store(turn.to_dict())
+        store.store(fact.to_dict())
+        assert store.index.get("TU_IDX_001").startswith("turns/user/")
+        assert store.index.get("SEM_IDX_001").startswith("semantic/")
+        print("[PASS] store() records relative paths")
+
+        # 2. Index survives a reopen (journal replay)
+        reopened = FileMemoryStore(base_dir=str(test_dir))
+        assert reopened.retrieve("TU_IDX_001")["text_excerpt"] == "Index me"
+        assert reopened.retrieve("SEM_IDX_001")["object"] == "tea"
+        print("[PASS] Index persisted across instances")
+
+        # 2b. Batch retrieval keeps input order and marks misses as None
+        batch = reopened.retrieve_many(["SEM_IDX_001", "MISSING", "TU_IDX_001"])
+        assert batch[0]["id"] == "SEM_IDX_001"
+        assert batch[1] is None
+        assert batch[2]["turn_id"] == "TU_IDX_001"
+        print("[PASS] retrieve_many() preserves order")
+
+        # 2c. The index is authoritative: files written behind its back are
+        # not found by a tree scan, only after rebuild_index()
+        stray = test_dir / "semantic" / "SEM_IDX_STRAY.json"
+        stray.write_bytes(b'{"type": "semantic", "id": "SEM_IDX_STRAY"}')
+        assert reopened.retrieve("SEM_IDX_STRAY") is None
+        reopened.rebuild_index()
+        assert reopened.retrieve("SEM_IDX_STRAY")["id"] == "SEM_IDX_STRAY"
+        assert reopened.delete("SEM_IDX_STRAY")
+        print("[PASS] Misses resolved from the index only")
+
+        # 3. Delete removes both file and index entry
+        assert reopened.delete("TU_IDX_001") is True
+        assert reopened.retrieve("TU_IDX_001") is None
+        assert "TU_IDX_001" not in FileMemoryStore(base_dir=str(test_dir)).index
+        print("[PASS] delete() keeps index in sync")
+
+        # 4. Recovery scan rebuilds a lost journal
+        shutil.rmtree(test_dir / FileMemoryStore.INDEX_DIR)
+        recovered = FileMemoryStore(base_dir=str(test_dir))
+        assert len(recovered.index) == 1
+        assert recovered.retrieve("SEM_IDX_001") is not None
+        print("[PASS] Index rebuilt by recovery scan")
+
+        # 5. Superseded entries (re-tagged re-stores) are compacted away on open
+        record = fact.to_dict()
+        for i in range(1100):
+            recovered.store({**record, "object": f"tea #{i}", "tags": [f"round-{i}"]})
+        journal = recovered.index.journal_path
+        assert sum(1 for _ in open(journal, encoding="utf-8")) > 1100
+        compacted = FileMemoryStore(base_dir=str(test_dir))
+        assert sum(1 for _ in open(journal, encoding="utf-8")) == len(compacted.index) == 1
+        assert compacted.retrieve("SEM_IDX_001")["object"] == "tea #1099"
+        assert compacted.index.find({"tags": "round-1099"}) == ["SEM_IDX_001"]
+        print("[PASS] Superseded journal entries compacted on open")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+    print("\n=== ID index verification passed! ===")
+
+
+if __name__ == "__main__":
+    verify_record_index()
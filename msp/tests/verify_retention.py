@@ -0,0 +1,149 @@
+"""Verification script for tiered session retention."""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from msp.modules.distiller import WisdomDistiller
+from msp.modules.retention import RetentionManager, RetentionPolicy
+
+
+def _tree_session(base: Path, i: int) -> Path:
+    path = base / "session_memory" / f"session_S{i:03d}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = {"session_id": f"S{i:03d}", "history": [{"role": "user", "content": f"turn of S{i:03d}"}]}
+    path.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+    return path
+
+
+def _tree(base: Path, sessions: int) -> WisdomDistiller:
+    for i in range(sessions):
+        _tree_session(base, i)
+    distiller = WisdomDistiller(SimpleNamespace(base_dir=str(base)))
+    distiller.check_and_distill()
+    return distiller
+
+
+def verify_retention():
+    print("Verifying tiered retention...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_retention_"))
+    try:
+        # 1. Invalid policies are rejected; spheres always stay hot
+        for bad in ({"sphere": RetentionPolicy("bundle")},
+                    {"session": RetentionPolicy("shred")},
+                    {"session": RetentionPolicy("bundle", compression="rar")}):
+            try:
+                RetentionManager(str(test_dir), bad)
+                raise AssertionError(f"accepted {bad}")
+            except ValueError:
+                pass
+        print("[PASS] Policy validation")
+
+        # 2. Dry run counts only consumed sessions and touches nothing
+        base = test_dir / "a"
+        _tree(base, 20)  # 16 consumed by core_001/core_002, 4 still pending
+        manager = RetentionManager(str(base))
+        before = manager.footprint()
+        report = manager.apply(dry_run=True)
+        assert report["session"]["eligible"] == 16 and report["session"]["bundled"] == 0
+        assert manager.footprint() == before
+        print("[PASS] Dry run")
+
+        # 3. min_age_days keeps recent units hot
+        report = RetentionManager(str(base), {"session": RetentionPolicy("bundle", min_age_days=1)}).apply()
+        assert report["session"]["eligible"] == 0
+        print("[PASS] Recent sessions stay hot")
+
+        # 4. Bundling: one zip per core, hot copies removed, still loadable
+        report = manager.apply()
+        assert report["session"]["bundled"] == 16
+        archive = base / "session_memory" / "archive"
+        assert sorted(p.name for p in archive.iterdir()) == ["core_001.zip", "core_002.zip"]
+        with zipfile.ZipFile(archive / "core_002.zip") as zf:
+            assert zf.namelist()[0] == "session_S008.json"
+        hot = sorted(p.stem for p in (base / "session_memory").glob("session_*.json"))
+        assert hot == ["session_S016", "session_S017", "session_S018", "session_S019"]
+        reopened = RetentionManager(str(base))
+        assert reopened.load("session_S003")["history"][0]["content"] == "turn of S003"
+        assert reopened.load("session_S017")["session_id"] == "S017"
+        assert reopened.load("session_S999") is None
+        after = reopened.footprint()
+        assert after["session"]["files"] < before["session"]["files"]
+        assert after["core"] == before["core"] and after["sphere"] == before["sphere"]
+        assert reopened.apply()["session"]["eligible"] == 0
+        print("[PASS] Distilled sessions bundled per core")
+
+        # 5. Late sessions join their core's existing bundle
+        distiller = WisdomDistiller(SimpleNamespace(base_dir=str(base)))
+        for i in range(20, 24):
+            path = base / "session_memory" / f"session_S{i:03d}.json"
+            path.write_text(json.dumps({"session_id": f"S{i:03d}", "history": []}), encoding="utf-8")
+            distiller.record_session(path)
+        distiller.check_and_distill()
+        old = time.time() - 3 * 86400
+        for path in (base / "session_memory").glob("session_*.json"):
+            os.utime(path, (old, old))
+        report = RetentionManager(str(base), {"session": RetentionPolicy("bundle", min_age_days=1)}).apply()
+        assert report["session"]["bundled"] == 8
+        assert (archive / "core_003.zip").exists()
+        print("[PASS] Age-based bundling of later cores")
+
+        # 6. Sessions can be deleted; cores can be aged once a sphere consumed them
+        base = test_dir / "b"
+        _tree(base, 64)
+        report = RetentionManager(str(base), {
+            "session": RetentionPolicy("delete"),
+            "core": RetentionPolicy("bundle", compression="lzma"),
+        }).apply()
+        assert report["session"]["deleted"] == 64
+        assert report["core"]["bundled"] == 8
+        assert list((base / "core_memory").glob("core_*.json")) == []
+        assert (base / "sphere_memory" / "sphere_001.json").exists()
+        assert RetentionManager(str(base)).load("core_005")["type"] == "core_narrative"
+        print("[PASS] Delete sessions, bundle cores, spheres stay hot")
+
+        # 7. In-place zstd compression (optional dependency)
+        base = test_dir / "c"
+        _tree(base, 8)
+        try:
+            manager = RetentionManager(str(base), {"session": RetentionPolicy("compress")})
+        except ImportError:
+            print("[SKIP] zstandard not installed")
+        else:
+            assert manager.apply()["session"]["compressed"] == 8
+            assert manager.apply()["session"]["eligible"] == 0
+            assert manager.load("session_S004")["session_id"] == "S004"
+            print("[PASS] zstd compression in place")
+
+        # 8. A session rewritten after it was bundled is never replaced by the archived copy
+        base = test_dir / "d"
+        distiller = _tree(base, 8)
+        manager = RetentionManager(str(base))
+        assert manager.apply()["session"]["bundled"] == 8
+        path = base / "session_memory" / "session_S000.json"
+        path.write_text(json.dumps({"session_id": "S000", "history": [], "version": 2}), encoding="utf-8")
+        assert manager.apply()["session"]["bundled"] == 0
+        assert path.exists() and manager.load("session_S000")["version"] == 2
+        distiller.record_session(path)
+        assert manager.apply()["session"]["eligible"] == 0
+        for i in range(8, 15):
+            distiller.record_session(_tree_session(base, i))
+        distiller.check_and_distill()
+        assert manager.apply()["session"]["bundled"] == 8
+        assert not path.exists()
+        assert RetentionManager(str(base)).load("session_S000")["version"] == 2
+        print("[PASS] Re-snapshotted sessions keep their latest content")
+
+        print("\n=== Retention verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_retention()
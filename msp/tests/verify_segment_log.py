@@ -0,0 +1,108 @@
+"""Verification script for SegmentLogStore (append-only segment backend)."""
+
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.storage.segment_log_store import SegmentLogStore, migrate_from_file_store
+from msp.schema.episodic import EpisodicMemory
+from msp.schema.turn import TurnUser
+
+
+def verify_segment_log():
+    print("Verifying SegmentLogStore...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_segments_"))
+    try:
+        # Tiny segments to force roll-over
+        store = SegmentLogStore(base_dir=str(test_dir), segment_max_bytes=600)
+
+        # 1. Store & retrieve
+        for i in range(10):
+            store.store(TurnUser(turn_id=f"TU_SEG_{i:03d}", episode_id="EP_SEG_001",
+                                 text_excerpt=f"Turn number {i}").to_dict())
+        ep = EpisodicMemory(episode_id="EP_SEG_001")
+        store.store(ep.to_dict())
+        assert store.retrieve("TU_SEG_004")["text_excerpt"] == "Turn number 4"
+        assert store.stats()["segments"] > 1
+        print(f"[PASS] Stored 11 records across {store.stats()['segments']} segments")
+
+        # 2. Rewrites supersede older versions
+        ep.sensory_refs.append("SM_SEG_001")
+        store.store(ep.to_dict())
+        assert store.retrieve("EP_SEG_001")["sensory_refs"] == ["SM_SEG_001"]
+        assert len(store.query({"type": "episodic"})) == 1
+        print("[PASS] Latest version wins")
+
+        # 3. Delete + reopen (index journal replay)
+        assert store.delete("TU_SEG_000") is True
+        store.close()
+        reopened = SegmentLogStore(base_dir=str(test_dir), segment_max_bytes=600)
+        assert reopened.retrieve("TU_SEG_000") is None
+        assert reopened.retrieve_many(["TU_SEG_009", "EP_SEG_001"])[1]["sensory_refs"] == ["SM_SEG_001"]
+        print("[PASS] Index persisted across instances")
+
+        # 4. Compaction reclaims superseded versions
+        before = reopened.stats()
+        reopened.compact(include_active=True)
+        after = reopened.stats()
+        assert after["total_bytes"] < before["total_bytes"]
+        assert after["garbage_ratio"] == 0.0
+        assert reopened.retrieve("EP_SEG_001")["sensory_refs"] == ["SM_SEG_001"]
+        print(f"[PASS] Compaction: {before['total_bytes']} -> {after['total_bytes']} bytes")
+
+        # 5. Recovery scan from segments alone
+        reopened.close()
+        (test_dir / SegmentLogStore.SEGMENT_DIR / SegmentLogStore.INDEX_NAME).unlink()
+        recovered = SegmentLogStore(base_dir=str(test_dir))
+        assert len(recovered.query({}, limit=100)) == 10
+        recovered.close()
+        print("[PASS] Index rebuilt from segments")
+
+        # 6. Migration from the file-per-record layout
+        file_dir = test_dir / "legacy"
+        legacy = FileMemoryStore(base_dir=str(file_dir))
+        legacy.store(TurnUser(turn_id="TU_LEGACY_001", episode_id="EP_X", text_excerpt="old").to_dict())
+        legacy.store(EpisodicMemory(episode_id="EP_LEGACY_001").to_dict())
+        assert migrate_from_file_store(str(file_dir), str(test_dir / "migrated")) == 2
+        migrated = SegmentLogStore(base_dir=str(test_dir / "migrated"))
+        assert migrated.retrieve("TU_LEGACY_001")["text_excerpt"] == "old"
+        migrated.close()
+        print("[PASS] Migration from FileMemoryStore")
+
+        # 7. query() orders by created_at like FileMemoryStore, not by append order
+        file_store = FileMemoryStore(base_dir=str(test_dir / "order_file"))
+        seg_store = SegmentLogStore(base_dir=str(test_dir / "order_seg"))
+        for day in (5, 1, 9, 3, 7):  # written out of order
+            turn = TurnUser(turn_id=f"TU_ORD_{day}", episode_id="EP_ORD", text_excerpt=f"day {day}",
+                            created_at=datetime(2026, 1, day)).to_dict()
+            file_store.store(turn)
+            seg_store.store(turn)
+        for args in ({}, {"newest_first": False}, {"offset": 2, "limit": 2},
+                     {"offset": 1, "limit": 2, "newest_first": False}):
+            filters = {"type": "turn", "since": "2026-01-02T00:00:00"}
+            expected = [r["turn_id"] for r in file_store.query(filters, **args)]
+            assert [r["turn_id"] for r in seg_store.query(filters, **args)] == expected, (args, expected)
+        assert [r["turn_id"] for r in seg_store.query({}, limit=2)] == ["TU_ORD_9", "TU_ORD_7"]
+
+        # Indexes written before created_at was tracked are backfilled on open
+        seg_store.close()
+        index_path = test_dir / "order_seg" / SegmentLogStore.SEGMENT_DIR / SegmentLogStore.INDEX_NAME
+        lines = [json.loads(line)[:6] for line in index_path.read_text(encoding="utf-8").splitlines()]
+        index_path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+        backfilled = SegmentLogStore(base_dir=str(test_dir / "order_seg"))
+        assert [r["turn_id"] for r in backfilled.query({}, limit=1)] == ["TU_ORD_9"]
+        assert len(json.loads(index_path.read_text(encoding="utf-8").splitlines()[0])) == 7
+        backfilled.close()
+        print("[PASS] Date-ordered query parity with FileMemoryStore")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+    print("\n=== SegmentLogStore verification passed! ===")
+
+
+if __name__ == "__main__":
+    verify_segment_log()
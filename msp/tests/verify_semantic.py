@@ -28,5 +28,12 @@ def verify_semantic():
     assert reconstructed.learned_at == fact.learned_at
     print("[PASS] Deserialization passed")
 
+    # 5. Content-addressed ID
+    assert SemanticMemory.content_id("User", "likes", "Sushi") == \
+        SemanticMemory.content_id("user", "likes", "  sushi ")
+    assert SemanticMemory.content_id("User", "likes", "Sushi") != \
+        SemanticMemory.content_id("User", "likes", "Ramen")
+    print("[PASS] Content ID normalization passed")
+
 if __name__ == "__main__":
     verify_semantic()
@@ -0,0 +1,134 @@
+"""Verification script for streaming session distillation."""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from msp.modules.distiller import WisdomDistiller
+from msp.modules.session_distill import (
+    LLMSummarizer,
+    StreamingSessionDistiller,
+    stream_session,
+)
+from msp.storage.codecs import RecordCodec, get_codec
+from orchestrator.llm_bridge.mock_llm import MockLLM
+
+
+def _session(i: int, turns: int = 20):
+    return {
+        "session_id": f"S{i:03d}",
+        "context": {"mood": "calm", "score": 12345678901234},
+        "history": [
+            {
+                "role": "user" if t % 2 == 0 else "assistant",
+                "content": f"สวัสดี session {i} turn {t} about gardening tomatoes",
+                "timestamp": f"2026-01-{i:02d}T10:{t:02d}:00",
+                "extra": {"weight": 3.14159 * t},
+            }
+            for t in range(turns)
+        ] + [{"role": "user", "content": "   "}],
+        "closed_at": 1234567.5,
+    }
+
+
+def _write(base: Path, i: int, codec=None, turns: int = 20) -> Path:
+    path = base / "session_memory" / f"session_S{i:03d}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = _session(i, turns)
+    if codec is None:
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        path.write_bytes(codec.encode(data))
+    return path
+
+
+def verify_session_distill():
+    print("Verifying streaming session distillation...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_session_distill_"))
+    try:
+        # 1. Incremental parse matches json.load, even with tiny chunks
+        path = _write(test_dir, 1)
+        expected = _session(1)
+        for chunk_size in (1, 7, 64 * 1024):
+            events = list(stream_session(path, chunk_size=chunk_size))
+            turns = [v for k, v in events if k == "history"]
+            others = {k: v for k, v in events if k != "history"}
+            assert turns == expected["history"], chunk_size
+            assert others == {k: v for k, v in expected.items() if k != "history"}
+        print("[PASS] Incremental parse (multi-byte text, split numbers)")
+
+        # 2. Non-JSON codecs fall back to a whole-record decode
+        compact = _write(test_dir, 2, codec=get_codec("json"))
+        assert [v for k, v in stream_session(compact) if k == "history"] == _session(2)["history"]
+        for name in ("msgpack", "cbor"):
+            try:
+                codec = RecordCodec(name)
+                codec.encode({})
+            except ImportError:
+                print(f"[SKIP] {name} not installed")
+                continue
+            binary = _write(test_dir, 3, codec=codec)
+            assert [v for k, v in stream_session(binary) if k == "history"] == _session(3)["history"]
+        print("[PASS] Codec fallback")
+
+        # 3. Pillars: clean / summary / index / relation
+        paths = [_write(test_dir, i) for i in range(1, 4)]
+        pillars = StreamingSessionDistiller(chunk_turns=8).distill(paths)
+        assert pillars["clean"]["sessions"] == 3
+        assert pillars["clean"]["turns"] == 60
+        assert pillars["clean"]["skipped_turns"] == 3
+        assert "tomatoes" in pillars["index"]
+        assert pillars["summary"].count("\n") == 4  # 5 excerpts
+        relation = pillars["relation"]["sessions"]
+        assert [r["session"] for r in relation] == ["session_S001", "session_S002", "session_S003"]
+        assert relation[0]["first_at"] == "2026-01-01T10:00:00"
+        assert relation[0]["last_at"] == "2026-01-01T10:19:00"
+        print("[PASS] Pillar outputs")
+
+        # 4. LLM summarizer is fed bounded chunks of turns
+        llm = MockLLM(default_response="A calm arc about gardening.")
+        pipeline = StreamingSessionDistiller(LLMSummarizer(llm), chunk_turns=8)
+        pillars = pipeline.distill(paths)
+        history = llm.get_call_history()
+        assert len(history) == 8  # ceil(60 / 8)
+        assert all(m[1].content.count("\nuser: ") + m[1].content.count("\nassistant: ") <= 8 for m in history)
+        assert "A calm arc" in history[1][1].content  # running summary carried forward
+        assert pillars["summary"] == "A calm arc about gardening."
+        assert pillars["summarizer"] == "llm:mock-llm"
+        print("[PASS] LLM summarizer with bounded chunks")
+
+        # 5. Unreadable sessions are skipped, not fatal
+        broken = test_dir / "session_memory" / "session_S099.json"
+        broken.write_text('{"history": [{"role": "user", "content": "cut', encoding="utf-8")
+        pillars = StreamingSessionDistiller().distill([paths[0], broken])
+        assert pillars["clean"]["unreadable_sessions"] == ["session_S099"]
+        assert pillars["clean"]["sessions"] == 1
+        print("[PASS] Truncated snapshot skipped")
+
+        # 6. WisdomDistiller writes the pillars into the core
+        broken.unlink()
+        engine = SimpleNamespace(base_dir=str(test_dir))
+        distiller = WisdomDistiller(engine, summarizer=LLMSummarizer(MockLLM("Core arc.")))
+        for i in range(4, 9):
+            _write(test_dir, i)
+        for p in sorted((test_dir / "session_memory").glob("session_*.json")):
+            distiller.record_session(p)
+        distiller.check_and_distill()
+        core = json.loads((test_dir / "core_memory" / "core_001.json").read_text(encoding="utf-8"))
+        distillation = core["distillation"]
+        assert distillation["summary"] == "Core arc."
+        assert distillation["clean"]["turns"] == 160
+        assert len(distillation["relation"]["sessions"]) == 8
+        assert distillation["index"]
+        print("[PASS] Core memory carries pillar outputs")
+
+        print("\n=== All session distillation checks passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_session_distill()
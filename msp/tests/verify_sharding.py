@@ -0,0 +1,164 @@
+"""Verification script for per-tenant sharding (MSPEngine(shard_by=...))."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.msp_engine import MSPEngine
+from msp.schema.episodic import EpisodicMemory, StructuredSummary
+from msp.schema.semantic import SemanticMemory
+from msp.schema.turn import TurnUser
+from msp.storage.hash_embedding import HashEmbeddingFunction
+
+
+def _engine(base_dir: Path, **kwargs) -> MSPEngine:
+    return MSPEngine(base_dir=str(base_dir), background_distillation=False, vector_backend="numpy",
+                     embedding_function=HashEmbeddingFunction(dim=64), shard_by=("user_id",), **kwargs)
+
+
+def _episode(episode_id: str, user_id: str, text: str):
+    return EpisodicMemory(
+        episode_id=episode_id, user_id=user_id, turn_refs=[f"TU_{episode_id}"],
+        summary=StructuredSummary(content=text)
+    ).to_dict()
+
+
+def _turn(episode_id: str, text: str):
+    # No user_id: the turn inherits its episode's tenant
+    return TurnUser(turn_id=f"TU_{episode_id}", episode_id=episode_id, text_excerpt=text).to_dict()
+
+
+def verify_sharding():
+    print("Verifying tenant sharding...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_shards_"))
+    try:
+        # 1. Records are routed to their tenant's tree; children follow their episode
+        engine = _engine(test_dir)
+        engine.store_many([
+            _episode("EP_ALICE", "alice", "alice plays jazz piano"),
+            _turn("EP_ALICE", "I practiced jazz piano today"),
+            _episode("EP_BOB", "bob", "bob plays jazz guitar"),
+            _turn("EP_BOB", "I practiced jazz guitar today"),
+        ])
+        fact_id = engine.upsert_fact(SemanticMemory(subject="alice", predicate="plays", object="piano",
+                                                    episode_refs=["EP_ALICE"]).to_dict())
+        engine.store(TurnUser(turn_id="TU_ORPHAN", episode_id="EP_NONE", text_excerpt="no tenant").to_dict())
+        alice_dir = test_dir / "tenants" / "alice"
+        assert list(alice_dir.rglob("EP_ALICE.json")) and list(alice_dir.rglob("TU_EP_ALICE.json"))
+        assert list(alice_dir.rglob(f"{fact_id}.json"))
+        assert not list((test_dir / "episodes").rglob("EP_*.json"))
+        assert list((test_dir / "turns").rglob("TU_ORPHAN.json"))
+        print("[PASS] Routing by user_id with episode inheritance")
+
+        # 2. Reads and deletes find the owning shard by ID
+        assert engine.retrieve("TU_EP_BOB")["text_excerpt"] == "I practiced jazz guitar today"
+        found = engine.retrieve_many(["EP_BOB", "TU_ORPHAN", "EP_ALICE", "missing"])
+        assert [r and (r.get("episode_id") if r["type"] == "episodic_v3" else r["turn_id"]) for r in found] == \
+            ["EP_BOB", "TU_ORPHAN", "EP_ALICE", None]
+        assert {r.get("turn_id") for r in engine.related(["EP_ALICE"])} >= {"TU_EP_ALICE"}
+        print("[PASS] retrieve/retrieve_many/related by owner")
+
+        # 3. Tenant-filtered search touches one shard only
+        engine.close()
+        engine = _engine(test_dir)
+        hits = engine.semantic_search("jazz", limit=10, filters={"user_id": "alice"})
+        assert hits and all(h.get("user_id") == "alice" for h in hits)
+        assert engine.shards.stats()["opened"] == 1
+        assert engine.semantic_search("jazz", filters={"user_id": "nobody"}) == []
+        assert not (test_dir / "tenants" / "nobody").exists()
+        everyone = engine.semantic_search("jazz practiced", limit=10)
+        assert {"TU_EP_ALICE", "TU_EP_BOB"} <= {h.get("turn_id") for h in everyone}
+        assert [r["episode_id"] for r in engine.query({"type": "episodic_v3"}, limit=10)] != []
+        assert engine.delete("TU_EP_BOB") and engine.retrieve("TU_EP_BOB") is None
+
+        # Fan-out hits are fused globally, not interleaved by per-shard rank
+        engine.store_many([
+            TurnUser(turn_id=f"TU_SAX_{i}", episode_id="EP_ALICE",
+                     text_excerpt=f"saxophone quartet rehearsal notes part {i}").to_dict()
+            for i in range(3)
+        ] + [_episode("EP_CAROL", "carol", "a string quartet")])
+        top = engine.semantic_search("saxophone quartet rehearsal", limit=3)
+        assert sorted(h.get("turn_id") or h["episode_id"] for h in top) == ["TU_SAX_0", "TU_SAX_1", "TU_SAX_2"], top
+        print("[PASS] Tenant-scoped and fan-out search")
+
+        # 4. LRU of open shard handles
+        engine.close()
+        engine = _engine(test_dir, max_open_shards=2)
+        for i in range(5):
+            engine.store(_episode(f"EP_U{i}", f"user{i}", f"user {i} likes hiking"))
+        stats = engine.shards.stats()
+        assert stats["open"] <= 2 and stats["evicted"] >= 3, stats
+        assert engine.retrieve("EP_U0")["user_id"] == "user0"  # reopened after eviction
+        assert len(engine.shards.tenants()) == 8
+        engine.close()
+        print(f"[PASS] LRU handles (opened {stats['opened']}, evicted {stats['evicted']})")
+
+        # 5. Key values cannot escape the tenants directory
+        engine = _engine(test_dir / "unsafe")
+        engine.store(_episode("EP_DOTS", "..", "dots"))
+        engine.store(_episode("EP_SLASH", "a/b", "slash"))
+        tenants = engine.shards.tenants()
+        assert tenants == ["%2E%2E", "a%2Fb"], tenants
+        assert engine.shards.describe("a%2Fb") == ["a/b"]
+        engine.close()
+        print("[PASS] Path-safe tenant directories")
+
+        # 6. Scans, index rebuilds and reindex cover every shard
+        records = []
+        for day, (ep_id, user) in enumerate([("EP_M1", "alice"), ("EP_M2", "bob"), ("EP_M3", "alice"), ("EP_M4", "bob")]):
+            records += [{**_episode(ep_id, user, f"{user} hums a tune"), "created_at": f"2026-03-0{day + 1}T10:00:00"},
+                        _turn(ep_id, f"{user} hummed a tune on day {day + 1}")]
+        counts = {}
+        for name, kwargs in (("flat", {}), ("sharded", {"shard_by": ("user_id",)})):
+            engine = MSPEngine(base_dir=str(test_dir / name), background_distillation=False, vector_backend="numpy",
+                               embedding_function=HashEmbeddingFunction(dim=64), **kwargs)
+            engine.store_many(records)
+            assert [e["episode_id"] for e in engine.scan_episodes()] == ["EP_M4", "EP_M3", "EP_M2", "EP_M1"]
+            assert [e["episode_id"] for e in engine.scan_episodes(newest_first=False, limit=2)] == ["EP_M1", "EP_M2"]
+            engine.close()
+            engine = MSPEngine(base_dir=str(test_dir / name), background_distillation=False, vector_backend="numpy",
+                               embedding_function=HashEmbeddingFunction(dim=64), **kwargs)
+            counts[name] = (engine.rebuild_links(), engine.rebuild_lexical(), engine.reindex()["records"])
+            engine.close()
+        assert counts["sharded"] == counts["flat"] and counts["flat"][0] > 0, counts
+        assert counts["flat"][2] == len(records)
+
+        engine = _engine(test_dir / "sharded", write_behind=True, write_behind_max_delay=30.0)
+        engine.store(_turn("EP_M1", "a queued turn"))
+        assert engine.has_pending("TU_EP_M1")
+        assert engine.flush() and not engine.has_pending("TU_EP_M1")
+        engine.close()
+        print("[PASS] scan_episodes, rebuilds, reindex and has_pending across shards")
+
+        # 7. Turning sharding on for an existing tree: migrate_to_shards() moves tenant records
+        legacy = test_dir / "legacy"
+        engine = MSPEngine(base_dir=str(legacy), background_distillation=False, vector_backend="numpy",
+                           embedding_function=HashEmbeddingFunction(dim=64))
+        engine.store_many([
+            _episode("EP_L", "alice", "alice plays jazz"),
+            {**_turn("EP_L", "jazz night"), "turn_id": "TU_L", "user_id": "alice"},
+            {**_turn("EP_L", "more jazz"), "turn_id": "TU_L2"},
+            TurnUser(turn_id="TU_FREE", episode_id="EP_NONE", text_excerpt="jazz for nobody").to_dict(),
+        ])
+        engine.close()
+        engine = _engine(legacy)
+        assert engine.query({"user_id": "alice"}) == []
+        assert engine.migrate_to_shards() == 3 and engine.migrate_to_shards() == 0
+        assert {r.get("turn_id") or r["episode_id"] for r in engine.query({"user_id": "alice"})} == {"EP_L", "TU_L"}
+        hits = engine.semantic_search("jazz", limit=10, filters={"user_id": "alice"})
+        assert {"TU_L", "EP_L"} <= {h.get("turn_id") or h["episode_id"] for h in hits}
+        assert engine.shards.owner("TU_L2") == "alice" and engine.retrieve("TU_L2")["text_excerpt"] == "more jazz"
+        assert engine.shards.owner("TU_FREE") is None and engine.retrieve("TU_FREE") is not None
+        assert not list((legacy / "episodes").rglob("EP_L.json"))
+        assert engine.related(["EP_L"], hydrate=False)
+        engine.close()
+        print("[PASS] Root records migrated into their tenant shards")
+
+        print("\n=== Sharding verification passed! ===")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    verify_sharding()
@@ -0,0 +1,81 @@
+"""Verification script for the resumable vector index rebuild."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from msp.modules.vector_rebuilder import VectorIndexRebuilder
+from msp.storage.file_memory_store import FileMemoryStore
+from msp.schema.episodic import EpisodicMemory
+from msp.schema.semantic import SemanticMemory
+from msp.schema.turn import TurnUser
+
+
+class RecordingVectorStore:
+    """Stands in for ChromaMemoryStore; fails once on a chosen batch."""
+
+    def __init__(self, fail_on_call=None):
+        self.ids = []
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def store_many(self, records, upsert=False, batch_size=512):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("simulated embedding failure")
+        self.ids.extend(r["turn_id"] for r in records)
+
+
+def verify_vector_rebuild():
+    print("Verifying VectorIndexRebuilder...")
+
+    test_dir = Path(tempfile.mkdtemp(prefix="msp_rebuild_"))
+    try:
+        store = FileMemoryStore(base_dir=str(test_dir))
+        store.store_many([
+            TurnUser(turn_id=f"TU_RB_{i:03d}", episode_id="EP_RB", text_excerpt=f"turn {i}").to_dict()
+            for i in range(50)
+        ])
+        checkpoint = test_dir / ".index" / "vector_rebuild.json"
+
+        # 1. A failing batch leaves a checkpoint behind the failure
+        broken = RecordingVectorStore(fail_on_call=3)
+        report = VectorIndexRebuilder(store, broken, str(checkpoint), batch_size=10, workers=1).run()
+        assert report["failed_batches"] == 1 and not report["complete"]
+        assert checkpoint.exists()
+        print(f"[PASS] Crash simulated; {report['records']} records indexed, checkpoint kept")
+
+        # 2. Resume picks up from the watermark and completes
+        healthy = RecordingVectorStore()
+        report = VectorIndexRebuilder(store, healthy, str(checkpoint), batch_size=10, workers=2).run()
+        assert report["complete"] and report["resumed_from"]
+        assert set(broken.ids) | set(healthy.ids) == {f"TU_RB_{i:03d}" for i in range(50)}
+        assert len(healthy.ids) == 30
+        assert not checkpoint.exists()
+        print(f"[PASS] Resumed rebuild indexed remaining {len(healthy.ids)} records "
+              f"({report['records_per_s']} rec/s)")
+
+        # 3. A watermark in one root does not skip records in the other roots
+        store.store_many([
+            EpisodicMemory(episode_id="EP_RB").to_dict(),
+            SemanticMemory(subject="User", predicate="likes", object="tea").to_dict(),
+            {"type": "note", "id": "NOTE_RB", "text": "misc record"},
+        ])
+        keys = [key for key, _ in store.iter_keyed_records()]
+        assert len(keys) == 53 and keys == sorted(keys, key=lambda k: tuple(k.split("/")))
+        for i, key in enumerate(keys):
+            assert [k for k, _ in store.iter_keyed_records(after_key=key)] == keys[i + 1:], key
+        turn_key = next(k for k in keys if k.startswith("turns/"))
+        assert {k.split("/")[0] for k, _ in store.iter_keyed_records(after_key=turn_key)} == {"turns"}
+        episode_key = next(k for k in keys if k.startswith("episodes/"))
+        resumed = {k.split("/")[0] for k, _ in store.iter_keyed_records(after_key=episode_key)}
+        assert resumed == {"misc", "semantic", "turns"}, resumed
+        print("[PASS] Resume across record roots")
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+    print("\n=== Vector rebuild verification passed! ===")
+
+
+if __name__ == "__main__":
+    verify_vector_rebuild()
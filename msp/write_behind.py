@@ -0,0 +1,270 @@
+"""Write-Behind Queue - Asynchronous group commit for MSPEngine.store."""
+
+import atexit
+import copy
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Barrier:
+    """Marker placed in the queue; set once everything before it is committed."""
+
+    def __init__(self, durable: bool):
+        self.durable = durable
+        # False if records before the barrier could not be committed
+        self.ok = True
+        self.done = threading.Event()
+
+
+class WriteBehindQueue:
+    """
+    Moves MSPEngine persistence off the caller's thread.
+
+    ``submit()`` only snapshots the record and enqueues it. A single worker
+    thread drains the queue into batches (up to ``batch_size`` records or
+    ``max_delay`` seconds after the first one) and hands each batch to
+    ``commit_fn`` as one group commit (file writes, vector indexing,
+    crosslink sync).
+
+    Submitted records stay visible through ``get_pending()`` until their
+    batch is committed, so MSPEngine.retrieve keeps read-your-writes.
+
+    Barriers:
+        flush()   - returns once everything submitted before it is committed
+        barrier() - flush() plus ``sync_fn`` (fsync) over the records
+                    committed since the previous durable barrier
+
+    Failed commits: a batch whose ``commit_fn`` raises is retried record
+    by record, so one bad record does not hold back the rest. Records that
+    still fail stay pending (readable, not lost) and are retried before
+    every later batch or barrier; until they succeed, flush() and
+    barrier() return False.
+    """
+
+    def __init__(
+        self,
+        commit_fn,
+        sync_fn=None,
+        batch_size: int = 64,
+        max_delay: float = 0.05,
+        max_unsynced: int = 1024
+    ):
+        """
+        Initialize queue and start the worker.
+
+        Args:
+            commit_fn: Callable(List[Dict]) that persists a batch
+            sync_fn: Callable(List[str]) that fsyncs committed record IDs
+            batch_size: Max records per group commit
+            max_delay: Max seconds to wait for a batch to fill
+            max_unsynced: Committed IDs tracked before the worker syncs on its own
+        """
+        self._commit_fn = commit_fn
+        self._sync_fn = sync_fn
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_unsynced = max_unsynced
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._seq = 0
+        self._unsynced: List[str] = []
+        self._failed: List[Tuple[int, str, Dict[str, Any]]] = []
+        self._closed = False
+
+        self._stats = {"submitted": 0, "committed": 0, "batches": 0, "errors": 0, "retried": 0}
+
+        self._worker = threading.Thread(target=self._run, name="msp-write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, memory_id: str, memory_data: Dict[str, Any]):
+        """Snapshots and enqueues a record for the next group commit."""
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+        record = copy.deepcopy(memory_data)
+        with self._lock:
+            self._seq += 1
+            self._pending[memory_id] = (self._seq, record)
+            self._stats["submitted"] += 1
+            self._queue.put((self._seq, memory_id, record))
+
+    def get_pending(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a copy of a submitted-but-uncommitted record, if any."""
+        with self._lock:
+            entry = self._pending.get(memory_id)
+        return copy.deepcopy(entry[1]) if entry else None
+
+    def has_pending(self, memory_id: str) -> bool:
+        with self._lock:
+            return memory_id in self._pending
+
+    def discard(self, memory_id: str):
+        """Drops a pending record (e.g. deleted while its commit keeps failing)."""
+        with self._lock:
+            # A failed copy is skipped at its next retry (no pending entry)
+            self._pending.pop(memory_id, None)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every record submitted so far is committed.
+
+        Returns:
+            False if the timeout expired first or some records failed to commit
+        """
+        return self._wait_barrier(_Barrier(durable=False), timeout)
+
+    def barrier(self, timeout: Optional[float] = None) -> bool:
+        """
+        Durability barrier: flush() and fsync everything committed so far.
+
+        Returns:
+            False if the timeout expired first or some records failed to commit
+        """
+        return self._wait_barrier(_Barrier(durable=True), timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Flushes durably and stops the worker. Safe to call twice."""
+        if self._closed:
+            return
+        if not self.barrier(timeout):
+            with self._lock:
+                failed = len(self._failed)
+            if failed:
+                logger.error(f"Write-behind closed with {failed} records that could not be committed")
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and commit counters."""
+        with self._lock:
+            return {**self._stats, "queue_depth": len(self._pending), "failed": len(self._failed)}
+
+    def _wait_barrier(self, marker: _Barrier, timeout: Optional[float]) -> bool:
+        if self._closed or threading.current_thread() is self._worker:
+            # Nothing to wait for, or called from a commit (would deadlock)
+            return True
+        self._queue.put(marker)
+        return marker.done.wait(timeout) and marker.ok
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = []
+            markers = []
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                if isinstance(item, _Barrier):
+                    # Commit what precedes the barrier, never what follows it
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+
+            if self._failed:
+                self._retry_failed()
+            if batch:
+                self._commit(batch)
+
+            durable = any(m.durable for m in markers)
+            if durable or len(self._unsynced) >= self.max_unsynced:
+                self._sync()
+            with self._lock:
+                ok = not self._failed
+            for marker in markers:
+                marker.ok = ok
+                marker.done.set()
+
+    def _commit(self, batch: List[Tuple[int, str, Dict[str, Any]]]):
+        # Coalesce repeated writes of the same ID within the batch (last one wins)
+        latest: Dict[str, Tuple[int, str, Dict[str, Any]]] = {}
+        for item in batch:
+            latest[item[1]] = item
+        items = list(latest.values())
+
+        try:
+            self._commit_fn([record for _, _, record in items])
+        except Exception as e:
+            logger.error(f"Write-behind group commit of {len(items)} records failed: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            if len(items) == 1:
+                self._failed.extend(items)
+                return
+            # Isolate the records that keep failing
+            for item in items:
+                self._commit_one(item)
+            return
+        with self._lock:
+            self._stats["batches"] += 1
+        self._committed(items)
+
+    def _commit_one(self, item: Tuple[int, str, Dict[str, Any]]) -> bool:
+        try:
+            self._commit_fn([item[2]])
+        except Exception as e:
+            logger.error(f"Write-behind commit of {item[1]} failed: {e}")
+            self._failed.append(item)
+            return False
+        self._committed([item])
+        return True
+
+    def _retry_failed(self):
+        failed, self._failed = self._failed, []
+        for item in failed:
+            with self._lock:
+                current = self._pending.get(item[1], (None,))[0]
+            if current != item[0]:
+                # Discarded, or superseded by a newer submit
+                continue
+            with self._lock:
+                self._stats["retried"] += 1
+            self._commit_one(item)
+
+    def _committed(self, items: List[Tuple[int, str, Dict[str, Any]]]):
+        with self._lock:
+            self._stats["committed"] += len(items)
+            for seq, memory_id, _ in items:
+                # Keep the overlay if a newer version was submitted meanwhile
+                if self._pending.get(memory_id, (None,))[0] == seq:
+                    del self._pending[memory_id]
+            self._unsynced.extend(memory_id for _, memory_id, _ in items)
+
+    def _sync(self):
+        ids, self._unsynced = self._unsynced, []
+        if not self._sync_fn:
+            return
+        try:
+            self._sync_fn(ids)
+        except Exception as e:
+            logger.error(f"Write-behind sync failed: {e}")
@@ -3,4 +3,4 @@ CIM - Context Injection Manager
 
 Assembles context bundle for LLM consumption.
 """
-__version__ = "0.1.0"
+__version__ = "0.1.1"
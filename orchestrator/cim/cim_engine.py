@@ -44,7 +44,10 @@ class CIMEngine:
         system_identity: str = "",
         max_memory_items: int = 5,
         max_context_tokens: int = 4000,
-        library_path: str = "consciousness"
+        library_path: str = "consciousness",
+        max_related_items: int = 0,
+        related_hops: int = 2,
+        memory_candidates: Optional[int] = None
     ):
         """
         Initialize CIM.
@@ -54,8 +57,17 @@ class CIMEngine:
             max_memory_items: Max memories to include
             max_context_tokens: Token budget for context
             library_path: Path to context_library folder
+            max_related_items: Linked memories (facts, sensory, other
+                episodes) to add around the search hits (0 = off)
+            related_hops: Link distance followed for related memories
+            memory_candidates: Search hits re-ranked (recency, salience,
+                state resonance) down to max_memory_items when the MSP
+                supports recall() (default: 4 * max_memory_items)
         """
         self._max_memory_items = max_memory_items
+        self._max_related_items = max_related_items
+        self._related_hops = related_hops
+        self._memory_candidates = memory_candidates
         self._max_context_tokens = max_context_tokens
         self._msp = None
         self._bus = None
@@ -99,10 +111,26 @@ class CIMEngine:
             system_identity=self._system_identity
         )
 
+        # Current state, also used to rank memories by resonance
+        state = self._gather_state() if self._bus else {}
+
         # 1. Add Memories (Personal)
         if self._msp:
             try:
-                memories = self._msp.semantic_search(user_input, limit=self._max_memory_items)
+                if hasattr(self._msp, "recall"):
+                    # Re-ranked: fewer items, but fresh, salient and in tune with the state
+                    memories = self._msp.recall(
+                        user_input, limit=self._max_memory_items,
+                        state=state or None, candidates=self._memory_candidates
+                    )
+                else:
+                    memories = self._msp.semantic_search(user_input, limit=self._max_memory_items)
+                if self._max_related_items and hasattr(self._msp, "related"):
+                    # Pull linked context from the adjacency index, not N file reads
+                    seed_ids = [m_id for m_id in map(self._memory_id, memories) if m_id]
+                    memories = list(memories) + self._msp.related(
+                        seed_ids, hops=self._related_hops, limit=self._max_related_items
+                    )
                 bundle.memory_context = [self._format_memory(m) for m in memories]
             except Exception:
                 pass
@@ -119,10 +147,18 @@ class CIMEngine:
 
         # 3. Add State (Body, Mind, Perception)
         if self._bus:
-            bundle.state_context.update(self._gather_state())
+            bundle.state_context.update(state)
         
         return bundle
 
+    @staticmethod
+    def _memory_id(memory: Any) -> Optional[str]:
+        """Primary ID of a hydrated memory record, if it has one."""
+        if not isinstance(memory, dict):
+            return None
+        return (memory.get("turn_id") or memory.get("sensory_id") or
+                memory.get("episode_id") or memory.get("id") or memory.get("_id"))
+
     def _format_memory(self, memory: Any) -> Dict[str, Any]:
         """Format a memory for context injection."""
         if hasattr(memory, 'to_dict'):
@@ -118,7 +118,8 @@ class MSPIntegration:
                     if episode_id:
                         fact.episode_refs.append(episode_id)
                     
-                    fact_id = self._msp.store(fact.to_dict())
+                    # Keyed by the triple: repeats reinforce one fact instead of adding duplicates
+                    fact_id = self._msp.upsert_fact(fact.to_dict())
                     extracted_ids.append(fact_id)
                     logger.info(f"Extracted fact: User {predicate} {obj} ({fact_id})")
 
@@ -40,6 +40,9 @@ def test_888_protocol():
         print(f"   - Processing Session {sess_id}...")
         orch.process(f"Message in session {i}")
         orch.finalize_session(sess_id)
+
+    # Distillation runs on a background worker
+    assert msp.wait_for_distillation(timeout=10)
         
     # Check Session Memory
     session_count = len(list((mem_path / "session_memory").glob("session_*.json")))